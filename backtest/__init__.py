@@ -1,13 +1,20 @@
 from .fetcher import MarketDataFetcher
 from .strategy import SimpleMovingAverageStrategy,BaseStrategy
-from .simulator import TradeSimulator
+from .simulator import TradeSimulator, TradeLog
 from .pnl import PnLCalculator
+from .cache import OHLCVCache
+from .grid import SMAGridSweep
+from .indicators import IndicatorEngine
 
 __all__ = [
     "MarketDataFetcher",
     "SimpleMovingAverageStrategy",
     "TradeSimulator",
+    "TradeLog",
     "PnLCalculator",
-    "BaseStrategy"
+    "BaseStrategy",
+    "OHLCVCache",
+    "SMAGridSweep",
+    "IndicatorEngine",
 ]
 __version__ = "0.1.0"
\ No newline at end of file
@@ -0,0 +1,241 @@
+import io
+import logging
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.cache import OHLCVCache, OHLCV_COLUMNS
+from backtest.fetcher import EXTENDED_COLUMNS, interval_to_ms
+
+# data.binance.vision kline CSV layout (no header on spot dumps, a header on some others)
+KLINE_CSV_COLUMNS = [
+    OHLCVCache.TIME_COLUMN,
+    *OHLCV_COLUMNS,
+    "close_time",
+    *(name for name, _ in EXTENDED_COLUMNS.values()),
+    "ignore",
+]
+_CSV_DTYPES = {
+    OHLCVCache.TIME_COLUMN: np.int64,
+    **{name: np.float64 for name in OHLCV_COLUMNS},
+    **{name: dtype for name, dtype in EXTENDED_COLUMNS.values()},
+}
+
+# e.g. BTCUSDT-1m-2024-01.zip (monthly) or BTCUSDT-1m-2024-01-15.zip (daily)
+ARCHIVE_NAME = re.compile(
+    r"^(?P<symbol>[A-Z0-9]+)-(?P<interval>\d+[smhdwM])-"
+    r"(?P<year>\d{4})-(?P<month>\d{2})(?:-(?P<day>\d{2}))?\.(?:zip|csv)$"
+)
+
+# open times above this are microseconds (Binance spot dumps from 2025 on)
+_MICROSECOND_THRESHOLD = 10 ** 14
+
+
+@dataclass(frozen=True)
+class ArchiveFile:
+    """One daily or monthly dump and the inclusive ms range of bars it covers."""
+    path: Path
+    symbol: str
+    interval: str
+    start_ms: int
+    end_ms: int
+
+
+@dataclass
+class IngestReport:
+    """
+    Outcome of ArchiveLoader.load.
+
+    duplicates counts rows sharing an open_time (e.g. a daily file inside a
+    monthly one); conflicting_duplicates those whose values differ. gaps
+    lists inclusive ms ranges of missing bars inside the loaded data.
+    """
+    symbol: str
+    interval: str
+    files: int = 0
+    rows: int = 0
+    duplicates: int = 0
+    conflicting_duplicates: int = 0
+    gaps: List[Tuple[int, int]] = field(default_factory=list)
+    covered: List[Tuple[int, int]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def missing_bars(self) -> int:
+        if self.interval == "1M":
+            return 0
+        step = interval_to_ms(self.interval)
+        return sum((hi - lo) // step + 1 for lo, hi in self.gaps)
+
+
+def parse_kline_csv(data: bytes) -> Dict[str, np.ndarray]:
+    """
+    Parse one kline CSV into typed columns (open_time as int64 epoch-ms).
+
+    Handles dumps with or without a header row and converts microsecond
+    timestamps to milliseconds.
+    """
+    has_header = not data[:1].isdigit()
+    frame = pd.read_csv(
+        io.BytesIO(data),
+        header=0 if has_header else None,
+        names=KLINE_CSV_COLUMNS,
+        usecols=list(_CSV_DTYPES),
+        dtype=_CSV_DTYPES,
+        engine="c",
+    )
+    columns = {name: frame[name].to_numpy() for name in _CSV_DTYPES}
+    open_time = columns[OHLCVCache.TIME_COLUMN]
+    if len(open_time) and open_time.max() >= _MICROSECOND_THRESHOLD:
+        columns[OHLCVCache.TIME_COLUMN] = open_time // 1000
+    return columns
+
+
+def read_archive(path: Path) -> Dict[str, np.ndarray]:
+    """Decompress a .zip dump (or read a plain .csv) and parse it."""
+    path = Path(path)
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            members = [m for m in archive.namelist() if m.endswith(".csv")]
+            if len(members) != 1:
+                raise ValueError(f"{path} should contain exactly one CSV, found {members}")
+            data = archive.read(members[0])
+    else:
+        data = path.read_bytes()
+    return parse_kline_csv(data)
+
+
+class ArchiveLoader:
+    """
+    Bulk loader for Binance public kline dumps (data.binance.vision) into an OHLCVCache.
+
+    Archives are decompressed and parsed in parallel worker processes with
+    pandas' C CSV parser, concatenated in time order, de-duplicated,
+    checked for gaps and written into the same columnar store the
+    MarketDataFetcher cache reads. The period covered by each archive is
+    marked as downloaded, so the fetcher will not request it again.
+
+    Usage:
+        loader = ArchiveLoader(OHLCVCache("data/cache"))
+        report = loader.load("downloads/", "BTCUSDT", "1m")
+    """
+
+    def __init__(self, cache: OHLCVCache, workers: Optional[int] = None):
+        """
+        Parameters:
+            workers: parser processes (default: os.cpu_count()); 1 parses in-process
+        """
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def discover(
+        self,
+        directory: str,
+        symbol: Optional[str] = None,
+        interval: Optional[str] = None,
+    ) -> List[ArchiveFile]:
+        """Dumps under `directory` (recursively) named like Binance archives, sorted by start."""
+        files = []
+        for path in Path(directory).rglob("*"):
+            match = ARCHIVE_NAME.match(path.name)
+            if match is None or not path.is_file():
+                continue
+            if symbol is not None and match["symbol"] != symbol.upper():
+                continue
+            if interval is not None and match["interval"] != interval:
+                continue
+            start_ms, end_ms = self._coverage(match)
+            files.append(ArchiveFile(path, match["symbol"], match["interval"], start_ms, end_ms))
+        return sorted(files, key=lambda f: (f.start_ms, f.end_ms, f.path.name))
+
+    def load(self, directory: str, symbol: str, interval: str, strict: bool = False) -> IngestReport:
+        """
+        Ingest every matching archive under `directory` into the cache.
+
+        With strict=True, gaps or conflicting duplicate rows raise ValueError
+        before anything is written.
+        """
+        t0 = time.perf_counter()
+        files = self.discover(directory, symbol, interval)
+        report = IngestReport(symbol=symbol.upper(), interval=interval, files=len(files))
+        if not files:
+            self.logger.warning(f"No {symbol} {interval} archives found in {directory}")
+            return report
+
+        self.logger.info(f"Parsing {len(files)} archives with {self.workers} workers")
+        paths = [f.path for f in files]
+        if self.workers == 1:
+            parts = [read_archive(p) for p in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parts = list(pool.map(read_archive, paths))
+
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in _CSV_DTYPES}
+        columns = self._deduplicate(columns, report)
+        report.rows = len(columns[OHLCVCache.TIME_COLUMN])
+        report.gaps = self._gaps(columns[OHLCVCache.TIME_COLUMN], interval)
+        report.covered = OHLCVCache._merge_ranges([(f.start_ms, f.end_ms) for f in files])
+
+        if strict and (report.gaps or report.conflicting_duplicates):
+            raise ValueError(
+                f"{len(report.gaps)} gaps and {report.conflicting_duplicates} conflicting "
+                f"duplicates in {symbol} {interval} archives"
+            )
+
+        self.cache.write(symbol, interval, columns, covered=report.covered)
+        report.seconds = time.perf_counter() - t0
+        self.logger.info(
+            f"Ingested {report.rows} {symbol} {interval} bars from {report.files} archives "
+            f"in {report.seconds:.1f}s ({report.duplicates} duplicates, "
+            f"{report.missing_bars} missing bars in {len(report.gaps)} gaps)"
+        )
+        return report
+
+    @staticmethod
+    def _coverage(match: re.Match) -> Tuple[int, int]:
+        year, month, day = int(match["year"]), int(match["month"]), match["day"]
+        if day is not None:
+            start = pd.Timestamp(year=year, month=month, day=int(day), tz="UTC")
+            end = start + pd.Timedelta(days=1)
+        else:
+            start = pd.Timestamp(year=year, month=month, day=1, tz="UTC")
+            end = start + pd.offsets.MonthBegin(1)
+        return start.value // 1_000_000, end.value // 1_000_000 - 1
+
+    @staticmethod
+    def _deduplicate(columns: Dict[str, np.ndarray], report: IngestReport) -> Dict[str, np.ndarray]:
+        """Sort by open_time and keep the last row of every duplicated timestamp."""
+        open_time = columns[OHLCVCache.TIME_COLUMN]
+        order = np.argsort(open_time, kind="stable")
+        sorted_time = open_time[order]
+        last = np.r_[sorted_time[1:] != sorted_time[:-1], True]
+        report.duplicates = int((~last).sum())
+
+        if report.duplicates:
+            # a dropped row conflicts if it differs from the next row at the same time
+            dropped = np.flatnonzero(~last)
+            differs = np.zeros(len(dropped), dtype=bool)
+            for name in OHLCV_COLUMNS:
+                values = columns[name][order]
+                differs |= values[dropped] != values[dropped + 1]
+            report.conflicting_duplicates = int(differs.sum())
+
+        keep = order[last]
+        return {name: values[keep] for name, values in columns.items()}
+
+    @staticmethod
+    def _gaps(open_time: np.ndarray, interval: str) -> List[Tuple[int, int]]:
+        if interval == "1M" or len(open_time) < 2:
+            return []
+        step = interval_to_ms(interval)
+        jumps = np.flatnonzero(np.diff(open_time) != step)
+        return [(int(open_time[i] + step), int(open_time[i + 1] - step)) for i in jumps]
@@ -0,0 +1,270 @@
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters describing how much work the cache saved.
+
+    - requests: number of range lookups served
+    - hits: lookups served entirely from disk
+    - partial_hits: lookups where only some gaps had to be fetched
+    - misses: lookups with nothing usable on disk
+    - bars_from_cache: bars read from disk that did not need to be fetched
+    - bars_fetched: bars downloaded and written to disk
+    - bytes_read / bytes_written: column bytes moved to and from disk
+    """
+    requests: int = 0
+    hits: int = 0
+    partial_hits: int = 0
+    misses: int = 0
+    bars_from_cache: int = 0
+    bars_fetched: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+    def requests_saved(self, page_size: int = 1000) -> int:
+        """Approximate number of kline API calls avoided thanks to the cache."""
+        return math.ceil(self.bars_from_cache / page_size) if page_size > 0 else 0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+class OHLCVCache:
+    """
+    On-disk columnar OHLCV store keyed by (symbol, interval).
+
+    Every series lives in its own directory holding one memory-mappable
+    ``.npy`` file per column (``open_time`` as int64 epoch-ms, prices and
+    volume as float64, optional extended Binance fields) plus a ``meta.json`` describing which millisecond
+    ranges have already been downloaded. Ranges are tracked separately from
+    the rows themselves so that genuine exchange gaps are not re-requested.
+
+    Layout:
+        <root>/<SYMBOL>/<interval>/open_time.npy
+        <root>/<SYMBOL>/<interval>/open.npy ... volume.npy
+        <root>/<SYMBOL>/<interval>/meta.json
+    """
+
+    TIME_COLUMN = "open_time"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    # ------------------------------------------------------------------ paths
+
+    def _series_dir(self, symbol: str, interval: str) -> Path:
+        return self.root / symbol.upper() / interval
+
+    def _meta_path(self, symbol: str, interval: str) -> Path:
+        return self._series_dir(symbol, interval) / "meta.json"
+
+    def _column_path(self, symbol: str, interval: str, column: str) -> Path:
+        return self._series_dir(symbol, interval) / f"{column}.npy"
+
+    # ---------------------------------------------------------------- ranges
+
+    def covered_ranges(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        """Return the sorted, merged list of inclusive [start_ms, end_ms] ranges on disk."""
+        meta_path = self._meta_path(symbol, interval)
+        if not meta_path.exists():
+            return []
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return [tuple(r) for r in meta.get("ranges", [])]
+
+    def missing_ranges(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> List[Tuple[int, int]]:
+        """
+        Return the inclusive sub-ranges of [start_ms, end_ms] that are not yet on disk.
+        """
+        gaps = []
+        cursor = start_ms
+        for lo, hi in self.covered_ranges(symbol, interval):
+            if hi < cursor:
+                continue
+            if lo > end_ms:
+                break
+            if lo > cursor:
+                gaps.append((cursor, lo - 1))
+            cursor = max(cursor, hi + 1)
+            if cursor > end_ms:
+                break
+        if cursor <= end_ms:
+            gaps.append((cursor, end_ms))
+        return gaps
+
+    @staticmethod
+    def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged: List[List[int]] = []
+        for lo, hi in sorted(ranges):
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        return [tuple(r) for r in merged]
+
+    # ------------------------------------------------------------------- read
+
+    def open_columns(self, symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Memory-map every stored column for (symbol, interval).
+
+        Returns None if nothing has been stored yet. Arrays are read-only views
+        backed by the files on disk.
+        """
+        time_path = self._column_path(symbol, interval, self.TIME_COLUMN)
+        if not time_path.exists():
+            return None
+
+        columns = {self.TIME_COLUMN: np.load(time_path, mmap_mode="r")}
+        for col in self._stored_columns(symbol, interval):
+            columns[col] = np.load(self._column_path(symbol, interval, col), mmap_mode="r")
+        return columns
+
+    def _stored_columns(self, symbol: str, interval: str) -> List[str]:
+        meta_path = self._meta_path(symbol, interval)
+        if not meta_path.exists():
+            return list(OHLCV_COLUMNS)
+        with open(meta_path) as f:
+            return json.load(f).get("columns", list(OHLCV_COLUMNS))
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read all stored rows with start_ms <= open_time <= end_ms as in-memory columns.
+        """
+        columns = self.open_columns(symbol, interval)
+        if columns is None:
+            return {}
+
+        open_time = columns[self.TIME_COLUMN]
+        lo = int(np.searchsorted(open_time, start_ms, side="left"))
+        hi = int(np.searchsorted(open_time, end_ms, side="right"))
+
+        out = {name: np.array(arr[lo:hi]) for name, arr in columns.items()}
+        self.stats.bytes_read += sum(a.nbytes for a in out.values())
+        return out
+
+    # ------------------------------------------------------------------ write
+
+    def write(
+        self,
+        symbol: str,
+        interval: str,
+        columns: Dict[str, np.ndarray],
+        covered: Optional[Union[Tuple[int, int], List[Tuple[int, int]]]] = None,
+    ) -> None:
+        """
+        Merge freshly fetched rows into the store and mark `covered` as downloaded.
+
+        `covered` is one inclusive (start_ms, end_ms) range or a list of them.
+        Pass covered=None to store rows without marking their range as complete.
+
+        Rows sharing an open_time with existing data replace the stored values,
+        so a candle that was still forming at the previous fetch gets updated.
+        """
+        series_dir = self._series_dir(symbol, interval)
+        series_dir.mkdir(parents=True, exist_ok=True)
+
+        new_time = np.asarray(columns.get(self.TIME_COLUMN, []), dtype=np.int64)
+        existing = self.open_columns(symbol, interval)
+
+        value_columns = [c for c in columns if c != self.TIME_COLUMN] or list(OHLCV_COLUMNS)
+        if existing is not None:
+            value_columns += [c for c in existing if c != self.TIME_COLUMN and c not in value_columns]
+
+        if existing is not None and len(new_time):
+            # later entries win in np.unique(return_index) on the reversed array
+            merged_time = np.concatenate([existing[self.TIME_COLUMN], new_time])
+            rev_unique, rev_idx = np.unique(merged_time[::-1], return_index=True)
+            keep = len(merged_time) - 1 - rev_idx
+            merged = {self.TIME_COLUMN: rev_unique}
+            old_len = len(existing[self.TIME_COLUMN])
+            for col in value_columns:
+                old = self._column_or_nan(existing, col, old_len)
+                new = self._column_or_nan(columns, col, len(new_time))
+                merged[col] = np.concatenate([old, new])[keep]
+        elif existing is not None:
+            merged = {}
+        else:
+            order = np.argsort(new_time, kind="stable")
+            merged = {self.TIME_COLUMN: new_time[order]}
+            for col in value_columns:
+                merged[col] = self._column_or_nan(columns, col, len(new_time))[order]
+
+        for name, arr in merged.items():
+            self._atomic_save(self._column_path(symbol, interval, name), arr)
+            self.stats.bytes_written += arr.nbytes
+
+        ranges = self.covered_ranges(symbol, interval)
+        if covered is not None:
+            new_ranges = covered if isinstance(covered, list) else [covered]
+            ranges = self._merge_ranges(ranges + [tuple(r) for r in new_ranges])
+        meta = {
+            "symbol": symbol.upper(),
+            "interval": interval,
+            "columns": value_columns,
+            "ranges": [list(r) for r in ranges],
+        }
+        tmp = self._meta_path(symbol, interval).with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(symbol, interval))
+
+    @staticmethod
+    def _column_or_nan(columns: Dict[str, np.ndarray], name: str, length: int) -> np.ndarray:
+        """Column as an in-memory array, or NaNs if this batch did not carry it."""
+        if name in columns:
+            return np.asarray(columns[name])
+        return np.full(length, np.nan)
+
+    @staticmethod
+    def _atomic_save(path: Path, arr: np.ndarray) -> None:
+        tmp = path.with_suffix(".tmp.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, path)
+
+    def nbytes(self, symbol: Optional[str] = None, interval: Optional[str] = None) -> int:
+        """Total size on disk of the whole cache, or of one (symbol, interval) series."""
+        base = self.root
+        if symbol is not None:
+            base = base / symbol.upper()
+            if interval is not None:
+                base = base / interval
+        if not base.exists():
+            return 0
+        return sum(p.stat().st_size for p in base.rglob("*") if p.is_file())
+
+    def clear(self, symbol: str, interval: str) -> None:
+        series_dir = self._series_dir(symbol, interval)
+        if not series_dir.exists():
+            return
+        for p in series_dir.iterdir():
+            p.unlink()
+        series_dir.rmdir()
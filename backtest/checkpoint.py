@@ -0,0 +1,89 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict
+
+from backtest.simulator import SimulatorState, TradeSimulator
+from backtest.strategy import BaseStrategy
+
+
+@dataclass
+class Checkpoint:
+    """
+    End state of a backtest, enough to continue it over bars appended later.
+
+    - strategy / strategy_state: strategy class and its get_state() snapshot
+      (for SimpleMovingAverageStrategy the RollingMean ring buffers and sums)
+    - simulator: SimulatorState.to_dict() (realized equity, open position,
+      last target)
+    - initial_cash / risk_per_trade: simulator settings the state belongs to
+    - last_open_time: epoch ms of the last processed bar
+    - bars: number of bars processed since the first one
+
+    Everything is plain JSON; floats round-trip exactly, so a resumed run
+    produces the same trades and equity as a full rerun.
+    """
+    strategy: str
+    strategy_state: Dict
+    simulator: Dict
+    initial_cash: float
+    risk_per_trade: float
+    last_open_time: int
+    bars: int
+
+    @classmethod
+    def capture(
+        cls,
+        strategy: BaseStrategy,
+        simulator: TradeSimulator,
+        state: SimulatorState,
+        last_open_time: int,
+        bars: int,
+    ) -> "Checkpoint":
+        return cls(
+            strategy=_class_path(strategy),
+            strategy_state=strategy.get_state(),
+            simulator=state.to_dict(),
+            initial_cash=float(simulator.initial_cash),
+            risk_per_trade=float(simulator.risk_per_trade),
+            last_open_time=int(last_open_time),
+            bars=int(bars),
+        )
+
+    def restore(self, strategy: BaseStrategy, simulator: TradeSimulator) -> SimulatorState:
+        """
+        Load the strategy state into `strategy` and return the simulator state.
+
+        Raises ValueError if the strategy class or the simulator settings
+        differ from the ones the checkpoint was taken with.
+        """
+        if _class_path(strategy) != self.strategy:
+            raise ValueError(f"checkpoint is for {self.strategy}, not {_class_path(strategy)}")
+        if (float(simulator.initial_cash), float(simulator.risk_per_trade)) != (
+            self.initial_cash, self.risk_per_trade,
+        ):
+            raise ValueError(
+                f"checkpoint is for initial_cash={self.initial_cash}, risk_per_trade={self.risk_per_trade}"
+            )
+        strategy.set_state(self.strategy_state)
+        return SimulatorState.from_dict(self.simulator)
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint as JSON, atomically replacing any previous one."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def _class_path(obj) -> str:
+    cls = obj.__class__
+    return f"{cls.__module__}.{cls.__qualname__}"
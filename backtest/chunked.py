@@ -0,0 +1,204 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest import profiling
+from backtest.cache import OHLCVCache
+from backtest.checkpoint import Checkpoint
+from backtest.fetcher import to_epoch_ms
+from backtest.simulator import SimulatorState, TradeLog, TradeSimulator
+from backtest.strategy import BaseStrategy
+
+
+@dataclass
+class ChunkedResult:
+    """
+    Output of ChunkedBacktest.
+
+    equity is aligned with open_time (epoch ms); both may be memory-mapped
+    files, so equity_series() is the only step that loads them into RAM.
+    checkpoint is the end state to resume from once more bars are appended
+    (None if the strategy does not implement get_state).
+    """
+    trades: TradeLog
+    equity: np.ndarray
+    open_time: np.ndarray
+    state: SimulatorState
+    checkpoint: Optional[Checkpoint] = None
+
+    def equity_series(self) -> pd.Series:
+        index = pd.DatetimeIndex(pd.to_datetime(self.open_time, unit="ms", utc=True), name="timestamp")
+        return pd.Series(np.asarray(self.equity), index=index)
+
+
+class ChunkedBacktest:
+    """
+    Out-of-core backtest over memory-mapped OHLCV columns.
+
+    Bars are read from the OHLCVCache files in blocks of `chunk_bars`; each
+    block goes through strategy.on_chunk (which carries the rolling-window
+    state) and TradeSimulator.run_chunk (which carries the realized equity
+    and any open position), and its equity values are written straight
+    into an .npy file. Memory use depends on the block size, not on the
+    length of the history, and the trades and equity are identical to
+    generate_target_positions + run_vectorized on the whole frame.
+
+    Passing the checkpoint of an earlier run continues it over the bars
+    after that run's last bar only: the trades and equity of the resumed
+    run are exactly the tail of a full rerun over the extended history.
+
+    Usage:
+        runner = ChunkedBacktest(SimpleMovingAverageStrategy(10, 30), TradeSimulator(10_000))
+        result = runner.run(cache, "BTCUSDT", "1m", "2018-01-01", "2025-01-01",
+                            equity_path="runs/btc_equity.npy")
+        result.checkpoint.save("runs/btc.ckpt.json")
+        ...
+        tail = runner.run(cache, "BTCUSDT", "1m", "2018-01-01", "2025-01-02",
+                          checkpoint=Checkpoint.load("runs/btc.ckpt.json"))
+    """
+
+    def __init__(
+        self,
+        strategy: BaseStrategy,
+        simulator: TradeSimulator,
+        chunk_bars: int = 1_000_000,
+    ):
+        """
+        Parameters:
+            strategy: must implement the streaming interface (reset / on_bar or on_chunk)
+            chunk_bars: bars per block; bounds the working memory
+        """
+        if chunk_bars < 1:
+            raise ValueError("chunk_bars must be >= 1")
+        self.strategy = strategy
+        self.simulator = simulator
+        self.chunk_bars = chunk_bars
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def run(
+        self,
+        cache: OHLCVCache,
+        symbol: str,
+        interval: str,
+        start: str,
+        end: str,
+        equity_path: Optional[str] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> ChunkedResult:
+        """
+        Backtest the cached bars of (symbol, interval) with start <= open time <= end.
+
+        With a checkpoint, only the bars after its last_open_time are run.
+        """
+        columns = cache.open_columns(symbol, interval)
+        if columns is None:
+            raise ValueError(f"No cached {symbol} {interval} data")
+        open_time = columns[OHLCVCache.TIME_COLUMN]
+        lo = int(np.searchsorted(open_time, to_epoch_ms(start), side="left"))
+        if checkpoint is not None:
+            lo = max(lo, int(np.searchsorted(open_time, checkpoint.last_open_time, side="right")))
+        hi = int(np.searchsorted(open_time, to_epoch_ms(end), side="right"))
+        return self.run_columns(
+            {name: values[lo:hi] for name, values in columns.items()}, equity_path, checkpoint
+        )
+
+    def run_frame(
+        self,
+        df: pd.DataFrame,
+        equity_path: Optional[str] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> ChunkedResult:
+        """
+        Backtest an in-memory OHLCV frame (DatetimeIndex, or an epoch-ms
+        index as in compact frames).
+
+        With a checkpoint, bars at or before its last_open_time are skipped,
+        so the full appended frame can be passed.
+        """
+        if isinstance(df.index, pd.DatetimeIndex):
+            open_time = df.index.asi8 // 10 ** 6
+        else:
+            open_time = np.asarray(df.index, dtype=np.int64)
+        lo = 0
+        if checkpoint is not None:
+            lo = int(np.searchsorted(open_time, checkpoint.last_open_time, side="right"))
+        columns = {OHLCVCache.TIME_COLUMN: open_time[lo:]}
+        columns.update({name: df[name].to_numpy()[lo:] for name in df.columns})
+        return self.run_columns(columns, equity_path, checkpoint)
+
+    def run_columns(
+        self,
+        columns: Dict[str, np.ndarray],
+        equity_path: Optional[str] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> ChunkedResult:
+        """
+        Backtest typed columns (open_time in epoch ms plus OHLCV), e.g. from OHLCVCache.open_columns.
+
+        With equity_path the equity curve is written to that .npy file as a
+        memory map; without it, it is kept in memory. With a checkpoint the
+        run continues from its state; every bar must come after the
+        checkpoint's last bar.
+        """
+        open_time = columns[OHLCVCache.TIME_COLUMN]
+        value_names = [name for name in columns if name != OHLCVCache.TIME_COLUMN]
+        n = len(open_time)
+
+        if equity_path is not None:
+            equity = np.lib.format.open_memmap(equity_path, mode="w+", dtype=np.float64, shape=(n,))
+        else:
+            equity = np.empty(n)
+
+        self.strategy.reset()
+        if checkpoint is not None:
+            if n and open_time[0] <= checkpoint.last_open_time:
+                raise ValueError("bars overlap the checkpoint; pass only bars after its last_open_time")
+            state = checkpoint.restore(self.strategy, self.simulator)
+        else:
+            state = SimulatorState(equity=self.simulator.initial_cash)
+        logs = []
+        for lo in range(0, n, self.chunk_bars):
+            hi = min(lo + self.chunk_bars, n)
+            with profiling.stage("chunked.block", bars=hi - lo):
+                index = pd.DatetimeIndex(
+                    pd.to_datetime(open_time[lo:hi], unit="ms", utc=True), name="timestamp"
+                )
+                block = pd.DataFrame(
+                    {name: np.asarray(columns[name][lo:hi]) for name in value_names}, index=index
+                )
+                target = self.strategy.on_chunk(block)
+                trades, curve = self.simulator.run_chunk(
+                    index, block["close"].to_numpy(dtype=np.float64), target, state
+                )
+                equity[lo:hi] = curve
+                if isinstance(equity, np.memmap):
+                    # write back now so dirty pages never pile up for the whole history
+                    equity.flush()
+                logs.append(trades)
+            self.logger.debug(f"Processed bars {lo}-{hi} of {n}, {len(trades)} trades closed")
+
+        self.logger.info(f"Backtested {n} bars in {len(logs)} blocks of up to {self.chunk_bars}")
+        trades = TradeLog.concat([log for log in logs if len(log)])
+        return ChunkedResult(trades, equity, open_time, state, self._checkpoint(state, open_time, checkpoint))
+
+    def _checkpoint(
+        self,
+        state: SimulatorState,
+        open_time: np.ndarray,
+        previous: Optional[Checkpoint],
+    ) -> Optional[Checkpoint]:
+        if len(open_time):
+            last_open_time = int(open_time[-1])
+        elif previous is not None:
+            last_open_time = previous.last_open_time
+        else:
+            return None
+        bars = len(open_time) + (previous.bars if previous is not None else 0)
+        try:
+            return Checkpoint.capture(self.strategy, self.simulator, state, last_open_time, bars)
+        except NotImplementedError:
+            return None
+
@@ -0,0 +1,94 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+import requests
+
+
+class BacktestClient:
+    """
+    Thin client of a running BacktestServer.
+
+    Usage:
+        client = BacktestClient("http://127.0.0.1:8765")
+        summary = client.backtest("BTCUSDT", "1h", "2024-01-01", "2024-06-01", fast_window=10, slow_window=30)
+        job_id = client.submit({"type": "sweep", ...})
+        rows = client.result(job_id)["rows"]
+    """
+
+    def __init__(self, url: str = "http://127.0.0.1:8765", timeout: float = 600.0):
+        """
+        Parameters:
+            timeout: seconds to wait for a job before giving up
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def submit(self, job: Dict) -> str:
+        """Queue a job and return its id without waiting for it."""
+        resp = self.session.post(f"{self.url}/jobs", json={**job, "wait": False}, timeout=30)
+        self._raise_for_status(resp)
+        return resp.json()["job_id"]
+
+    def job(self, job_id: str, wait: Optional[float] = None) -> Dict:
+        """Current state of a job; with `wait`, block server-side up to that many seconds."""
+        params = {"wait": wait} if wait else None
+        resp = self.session.get(
+            f"{self.url}/jobs/{job_id}", params=params, timeout=(wait or 0) + 30
+        )
+        self._raise_for_status(resp)
+        return resp.json()
+
+    def result(self, job_id: str) -> Dict:
+        """Wait for a job and return its result; raises RuntimeError if it failed."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"job {job_id} did not finish within {self.timeout}s")
+            job = self.job(job_id, wait=min(remaining, 30.0))
+            if job["status"] == "done":
+                return job["result"]
+            if job["status"] == "failed":
+                raise RuntimeError(job["error"])
+
+    def run(self, job: Dict) -> Dict:
+        return self.result(self.submit(job))
+
+    def backtest(self, symbol: str, interval: str, start: str, end: str, **params) -> Dict:
+        """Summary of one SMA backtest; params as in the "backtest" job."""
+        return self.run(
+            {"type": "backtest", "symbol": symbol, "interval": interval, "start": start, "end": end, **params}
+        )
+
+    def sweep(
+        self,
+        symbol: str,
+        interval: str,
+        start: str,
+        end: str,
+        fast_windows: Iterable[int],
+        slow_windows: Iterable[int],
+        **params,
+    ) -> Dict:
+        """Ranked rows of an SMA parameter sweep; params as in the "sweep" job."""
+        return self.run({
+            "type": "sweep", "symbol": symbol, "interval": interval, "start": start, "end": end,
+            "fast_windows": list(fast_windows), "slow_windows": list(slow_windows), **params,
+        })
+
+    def status(self) -> Dict:
+        resp = self.session.get(f"{self.url}/status", timeout=30)
+        self._raise_for_status(resp)
+        return resp.json()
+
+    @staticmethod
+    def _raise_for_status(resp) -> None:
+        if resp.status_code >= 400:
+            try:
+                message = resp.json().get("error", resp.text)
+            except ValueError:
+                message = resp.text
+            raise ValueError(f"server returned {resp.status_code}: {message}")
@@ -0,0 +1,400 @@
+import logging
+import numbers
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest.indicators import IndicatorEngine
+from backtest.strategy import BaseStrategy
+
+# op -> (ufunc, result is boolean)
+_UFUNCS: Dict[str, Tuple[np.ufunc, bool]] = {
+    "add": (np.add, False),
+    "sub": (np.subtract, False),
+    "mul": (np.multiply, False),
+    "div": (np.true_divide, False),
+    "neg": (np.negative, False),
+    "abs": (np.absolute, False),
+    "gt": (np.greater, True),
+    "ge": (np.greater_equal, True),
+    "lt": (np.less, True),
+    "le": (np.less_equal, True),
+    "eq": (np.equal, True),
+    "ne": (np.not_equal, True),
+    "and": (np.logical_and, True),
+    "or": (np.logical_or, True),
+    "not": (np.logical_not, True),
+}
+
+_COMMUTATIVE = {"add", "mul", "eq", "ne", "and", "or"}
+
+_SYMBOLS = {
+    "add": "+", "sub": "-", "mul": "*", "div": "/", "gt": ">", "ge": ">=",
+    "lt": "<", "le": "<=", "eq": "==", "ne": "!=", "and": "&", "or": "|",
+}
+
+
+def _rolling(method: str, **kwargs) -> Callable[[np.ndarray, int], np.ndarray]:
+    def compute(values: np.ndarray, window: int) -> np.ndarray:
+        return getattr(pd.Series(values).rolling(window, **kwargs), method)().to_numpy()
+    return compute
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+# window op -> compute(values, window); identical to the pandas rolling / ewm results
+_WINDOW_OPS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "sma": _rolling("mean"),
+    "rolling_max": _rolling("max"),
+    "rolling_min": _rolling("min"),
+    "rolling_std": _rolling("std"),
+    "ema": _ema,
+}
+
+
+class Expr:
+    """
+    Node of a strategy expression, built with the helpers and operators of this module.
+
+    Nodes are immutable and identified by a structural key (operation,
+    parameters and the keys of their inputs, with the inputs of commutative
+    operations sorted), so equal subexpressions written twice compile to a
+    single node. Comparisons and &, |, ~ build boolean nodes; an Expr has
+    no truth value, so use & / | instead of and / or.
+    """
+
+    __slots__ = ("op", "args", "params", "key")
+
+    def __init__(self, op: str, args: Tuple["Expr", ...] = (), params: Tuple = ()):
+        self.op = op
+        self.args = args
+        self.params = params
+        child_keys = tuple(arg.key for arg in args)
+        if op in _COMMUTATIVE:
+            child_keys = tuple(sorted(child_keys, key=repr))
+        if op == "const":
+            # True == 1 == 1.0 in Python, but they produce different dtypes
+            params_key = (type(params[0]).__name__, *params)
+        else:
+            params_key = params
+        self.key = (op, params_key, child_keys)
+
+    @property
+    def is_bool(self) -> bool:
+        if self.op in _UFUNCS:
+            return _UFUNCS[self.op][1]
+        if self.op == "const":
+            return isinstance(self.params[0], (bool, np.bool_))
+        return False
+
+    def __add__(self, other): return _apply("add", self, other)
+    def __radd__(self, other): return _apply("add", other, self)
+    def __sub__(self, other): return _apply("sub", self, other)
+    def __rsub__(self, other): return _apply("sub", other, self)
+    def __mul__(self, other): return _apply("mul", self, other)
+    def __rmul__(self, other): return _apply("mul", other, self)
+    def __truediv__(self, other): return _apply("div", self, other)
+    def __rtruediv__(self, other): return _apply("div", other, self)
+    def __neg__(self): return _apply("neg", self)
+    def __abs__(self): return _apply("abs", self)
+    def __gt__(self, other): return _apply("gt", self, other)
+    def __ge__(self, other): return _apply("ge", self, other)
+    def __lt__(self, other): return _apply("lt", self, other)
+    def __le__(self, other): return _apply("le", self, other)
+    def __eq__(self, other): return _apply("eq", self, other)
+    def __ne__(self, other): return _apply("ne", self, other)
+    def __and__(self, other): return _apply("and", self, other)
+    def __rand__(self, other): return _apply("and", other, self)
+    def __or__(self, other): return _apply("or", self, other)
+    def __ror__(self, other): return _apply("or", other, self)
+    def __invert__(self): return _apply("not", self)
+
+    __hash__ = object.__hash__
+
+    def __bool__(self):
+        raise TypeError("an Expr has no truth value; combine conditions with & and |")
+
+    def __repr__(self) -> str:
+        if self.op == "col":
+            return self.params[0]
+        if self.op == "const":
+            return repr(self.params[0])
+        if self.op in _SYMBOLS:
+            return f"({self.args[0]!r} {_SYMBOLS[self.op]} {self.args[1]!r})"
+        if self.op == "neg":
+            return f"-{self.args[0]!r}"
+        if self.op == "not":
+            return f"~{self.args[0]!r}"
+        inner = ", ".join([*(repr(arg) for arg in self.args), *(repr(p) for p in self.params)])
+        return f"{self.op}({inner})"
+
+
+Operand = Union[Expr, float, int, bool]
+
+
+def col(name: str) -> Expr:
+    """Column `name` of the evaluated DataFrame."""
+    return Expr("col", (), (name,))
+
+
+def const(value: Union[float, int, bool]) -> Expr:
+    return Expr("const", (), (value,))
+
+
+open_ = col("open")
+high = col("high")
+low = col("low")
+close = col("close")
+volume = col("volume")
+
+
+def sma(x: Operand, window: int) -> Expr:
+    """Simple moving average, identical to Series.rolling(window).mean()."""
+    return _window("sma", x, window)
+
+
+def ema(x: Operand, span: int) -> Expr:
+    """Exponential moving average, identical to Series.ewm(span=span, adjust=False).mean()."""
+    return _window("ema", x, span)
+
+
+def rolling_max(x: Operand, window: int) -> Expr:
+    return _window("rolling_max", x, window)
+
+
+def rolling_min(x: Operand, window: int) -> Expr:
+    return _window("rolling_min", x, window)
+
+
+def rolling_std(x: Operand, window: int) -> Expr:
+    """Sample standard deviation (ddof=1), like Series.rolling(window).std()."""
+    return _window("rolling_std", x, window)
+
+
+def shift(x: Operand, periods: int = 1) -> Expr:
+    """Value `periods` bars earlier (NaN for the first bars); periods must be >= 1."""
+    if int(periods) < 1:
+        raise ValueError("periods must be >= 1 (shifting forward would look ahead)")
+    return Expr("shift", (_as_expr(x),), (int(periods),))
+
+
+def diff(x: Operand, periods: int = 1) -> Expr:
+    x = _as_expr(x)
+    return x - shift(x, periods)
+
+
+def where(condition: Operand, if_true: Operand, if_false: Operand) -> Expr:
+    """Elementwise if_true where condition holds, if_false elsewhere."""
+    return Expr("where", (_as_expr(condition), _as_expr(if_true), _as_expr(if_false)))
+
+
+def sma_crossover(fast_window: int, slow_window: int) -> Expr:
+    """SimpleMovingAverageStrategy(fast_window, slow_window) as an expression."""
+    return sma(close, fast_window) > sma(close, slow_window)
+
+
+def _as_expr(value: Operand) -> Expr:
+    if isinstance(value, Expr):
+        return value
+    if isinstance(value, (numbers.Number, np.bool_)):
+        return const(value)
+    raise TypeError(f"cannot use {type(value).__name__} in an expression")
+
+
+def _window(op: str, x: Operand, window: int) -> Expr:
+    if int(window) < 1:
+        raise ValueError("window must be >= 1")
+    return Expr(op, (_as_expr(x),), (int(window),))
+
+
+def _apply(op: str, *operands: Operand) -> Expr:
+    args = tuple(_as_expr(x) for x in operands)
+    if all(arg.op == "const" for arg in args):
+        # constant folding
+        ufunc, _ = _UFUNCS[op]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return const(ufunc(*(arg.params[0] for arg in args)).item())
+    return Expr(op, args)
+
+
+class Program:
+    """
+    Compiled DAG of one or more expressions.
+
+    Compilation deduplicates structurally equal nodes across all outputs
+    (common subexpression elimination) and orders them topologically.
+    Evaluation runs each node once with NumPy ufuncs writing into buffers
+    from a per-program pool; a buffer goes back to the pool after the last
+    node reading it, so a deep expression needs only a few bar-length
+    arrays, and repeated evaluations on frames of the same length allocate
+    nothing but the returned outputs. Given an IndicatorEngine, window
+    operations on raw columns are requested from it, so they are shared
+    with other strategies evaluated on the same data.
+    """
+
+    def __init__(self, outputs: Sequence[Expr], indicators: Optional[IndicatorEngine] = None):
+        """
+        Parameters:
+            outputs: expressions to evaluate together
+            indicators: engine caching window operations on columns
+                (None computes them on every evaluation)
+        """
+        self.outputs = [_as_expr(out) for out in outputs]
+        self.indicators = indicators
+        self.nodes: List[Expr] = []
+        self._slot: Dict[Tuple, int] = {}
+        self._inputs: List[Tuple] = []
+        for out in self.outputs:
+            self._visit(out)
+
+        # position of the last node reading each node; outputs stay live to the end
+        self._last_use = [-1] * len(self.nodes)
+        for i, inputs in enumerate(self._inputs):
+            for j in inputs:
+                if j is not None:
+                    self._last_use[j] = i
+        for out in self.outputs:
+            if out.key in self._slot:
+                self._last_use[self._slot[out.key]] = len(self.nodes)
+
+        self._pool: Dict[np.dtype, List[np.ndarray]] = {}
+        self._pool_len = -1
+        self.allocations = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.debug(f"Compiled {len(self.outputs)} expressions into {len(self.nodes)} nodes")
+
+    def _visit(self, node: Expr) -> Optional[int]:
+        """Slot of `node`, adding it (after its inputs) if new; None for constants."""
+        if node.op == "const":
+            return None
+        if node.key in self._slot:
+            return self._slot[node.key]
+        inputs = tuple(self._visit(arg) for arg in node.args)
+        self._slot[node.key] = len(self.nodes)
+        self.nodes.append(node)
+        self._inputs.append(inputs)
+        return self._slot[node.key]
+
+    def evaluate(self, df: pd.DataFrame) -> List[np.ndarray]:
+        """Values of every output for the bars of `df`, as new arrays."""
+        n = len(df)
+        engine = self.indicators
+        with self._lock:
+            if n != self._pool_len:
+                self._pool, self._pool_len = {}, n
+            values: List = [None] * len(self.nodes)
+            owned = [False] * len(self.nodes)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for i, node in enumerate(self.nodes):
+                    args = [
+                        arg.params[0] if slot is None else values[slot]
+                        for arg, slot in zip(node.args, self._inputs[i])
+                    ]
+                    values[i], owned[i] = self._run(node, args, i, df, engine, values, owned)
+
+            results = []
+            for out in self.outputs:
+                if out.op == "const":
+                    results.append(np.full(n, out.params[0]))
+                else:
+                    results.append(np.array(values[self._slot[out.key]], copy=True))
+            for i, value in enumerate(values):
+                if owned[i]:
+                    self._release(value)
+        return results
+
+    def _run(self, node: Expr, args: List, i: int, df: pd.DataFrame, engine: Optional[IndicatorEngine],
+             values: List, owned: List[bool]) -> Tuple[np.ndarray, bool]:
+        """Evaluate one node; returns its value and whether the value is a pool buffer."""
+        if node.op == "col":
+            return df[node.params[0]].to_numpy(), False
+
+        if node.op in _WINDOW_OPS:
+            compute = _WINDOW_OPS[node.op]
+            if engine is not None and node.args[0].op == "col":
+                return engine.get(node.op, args[0], node.params, compute), False
+            return compute(np.asarray(args[0], dtype=np.float64), *node.params), False
+
+        if node.op == "shift":
+            # the output may not alias the input, so take the buffer before releasing
+            periods = node.params[0]
+            out = self._acquire(np.float64)
+            out[:periods] = np.nan
+            out[periods:] = args[0][:-periods] if periods < len(out) else args[0][:0]
+            self._release_dead(i, values, owned)
+            return out, True
+
+        if node.op == "where":
+            # two passes over the output, so it must not alias an input either
+            out = self._acquire(np.bool_ if node.args[1].is_bool and node.args[2].is_bool else np.float64)
+            np.copyto(out, args[2])
+            np.copyto(out, args[1], where=np.asarray(args[0], dtype=bool))
+            self._release_dead(i, values, owned)
+            return out, True
+
+        # one elementwise ufunc: inputs dying here can donate their buffer to the output
+        self._release_dead(i, values, owned)
+        ufunc, is_bool = _UFUNCS[node.op]
+        out = self._acquire(np.bool_ if is_bool else np.float64)
+        ufunc(*args, out=out)
+        return out, True
+
+    def _release_dead(self, i: int, values: List, owned: List[bool]) -> None:
+        for j in set(self._inputs[i]):
+            if j is not None and self._last_use[j] == i and owned[j]:
+                self._release(values[j])
+                owned[j] = False
+
+    def _acquire(self, dtype) -> np.ndarray:
+        free = self._pool.setdefault(np.dtype(dtype), [])
+        if free:
+            return free.pop()
+        self.allocations += 1
+        return np.empty(self._pool_len, dtype=dtype)
+
+    def _release(self, buf: np.ndarray) -> None:
+        self._pool.setdefault(buf.dtype, []).append(buf)
+
+
+class ExpressionStrategy(BaseStrategy):
+    """
+    Strategy defined by a target-position expression instead of a subclass.
+
+    Boolean expressions map True / False to 1 / 0. Numeric ones must
+    evaluate to 0 or 1 on every bar, with NaN treated as flat; any other
+    value raises ValueError instead of being truncated, so threshold
+    explicitly (e.g. where(score > 0.5, 1, 0)). For example
+    ExpressionStrategy(sma(close, 10) > sma(close, 30)) is
+    SimpleMovingAverageStrategy(10, 30).
+    """
+
+    def __init__(self, position: Operand, indicators: Optional[IndicatorEngine] = None):
+        """
+        Parameters:
+            position: expression of the target position per bar
+            indicators: engine caching window operations on columns
+        """
+        self.position = _as_expr(position)
+        self.program = Program([self.position], indicators)
+
+    def generate_target_positions(self, df: pd.DataFrame) -> pd.Series:
+        (values,) = self.program.evaluate(df)
+        if values.dtype != np.bool_:
+            values[np.isnan(values)] = 0
+            invalid = (values != 0) & (values != 1)
+            if invalid.any():
+                raise ValueError(
+                    f"{self.position!r} must evaluate to 0 or 1 (or NaN), got "
+                    f"{float(values[invalid][0])} at {df.index[np.argmax(invalid)]}; "
+                    "compare against a threshold to get a position"
+                )
+        return pd.Series(values.astype(int), index=df.index, name="target_position")
+
+    def __repr__(self) -> str:
+        return f"ExpressionStrategy({self.position!r})"
@@ -1,28 +1,133 @@
 import time
 import logging
-from datetime import datetime
-from typing import Optional
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+from backtest import profiling
+from backtest.cache import OHLCVCache, OHLCV_COLUMNS
+from backtest.ratelimit import WeightRateLimiter
+
+
+_SECOND_MS = 1000
+_MINUTE_MS = 60 * _SECOND_MS
+_HOUR_MS = 60 * _MINUTE_MS
+_DAY_MS = 24 * _HOUR_MS
+
+# Binance kline intervals. "1M" is calendar-based, 31 days is used as an upper bound.
+INTERVAL_MS = {
+    "1s": _SECOND_MS,
+    "1m": _MINUTE_MS,
+    "3m": 3 * _MINUTE_MS,
+    "5m": 5 * _MINUTE_MS,
+    "15m": 15 * _MINUTE_MS,
+    "30m": 30 * _MINUTE_MS,
+    "1h": _HOUR_MS,
+    "2h": 2 * _HOUR_MS,
+    "4h": 4 * _HOUR_MS,
+    "6h": 6 * _HOUR_MS,
+    "8h": 8 * _HOUR_MS,
+    "12h": 12 * _HOUR_MS,
+    "1d": _DAY_MS,
+    "3d": 3 * _DAY_MS,
+    "1w": 7 * _DAY_MS,
+    "1M": 31 * _DAY_MS,
+}
+
+
+# optional Binance kline fields: row offset -> (column name, dtype)
+EXTENDED_COLUMNS = {
+    7: ("quote_volume", np.float64),
+    8: ("num_trades", np.int64),
+    9: ("taker_buy_base_volume", np.float64),
+    10: ("taker_buy_quote_volume", np.float64),
+}
+
+
+# dtype of price / volume columns in compact frames (see get_historical_ohlcv)
+COMPACT_FLOAT = np.float32
+
+
+def interval_to_ms(interval: str) -> int:
+    """Length of a Binance kline interval in milliseconds."""
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval: {interval!r}") from None
+
+
+def to_epoch_ms(value) -> int:
+    """
+    UTC epoch milliseconds of a date / time; values without a timezone are UTC.
+
+    Plain ISO strings ('2024-01-01', '2024-01-01 10:30') are parsed by
+    np.datetime64; anything else (offsets, 'Z', Timestamps) goes through
+    pd.Timestamp. The result never depends on the machine's local timezone.
+    """
+    if isinstance(value, str):
+        try:
+            with warnings.catch_warnings():
+                # numpy only warns about timezone designators; those take the pandas path
+                warnings.simplefilter("error")
+                return int(np.datetime64(value, "ms").astype(np.int64))
+        except (ValueError, UserWarning, DeprecationWarning):
+            pass
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value // 1_000_000)
 
 
 class MarketDataFetcher:
     BASE_URL = "https://api.binance.com"
+    # request weight of one /api/v3/klines call
+    KLINES_WEIGHT = 2
 
-    def __init__(self, max_retries: int = 3, backoff_factor: float = 1.5, timeout: float = 5.0):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 1.5,
+        timeout: float = 5.0,
+        cache: Optional[OHLCVCache] = None,
+        concurrency: int = 1,
+        rate_limiter: Optional[WeightRateLimiter] = None,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Parameters:
+            cache: optional on-disk OHLCV cache, see OHLCVCache
+            concurrency: number of pages downloaded in parallel; 1 keeps the
+                sequential start-after-last-timestamp pagination
+            rate_limiter: weight limiter shared by all requests of this fetcher
+                (and optionally other fetchers hitting the same IP)
+            base_url: override BASE_URL, e.g. to point at a LocalKlineServer
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
         self.timeout = timeout
+        self.cache = cache
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter or WeightRateLimiter()
+        self.base_url = base_url or self.BASE_URL
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    @profiling.profiled("fetch", bars_arg="return")
     def get_historical_ohlcv(
         self,
         symbol: str,
         interval: str,
         start: str,
         end: str,
-        limit: int = 1000
+        limit: int = 1000,
+        extended: bool = False,
+        compact: bool = False,
     ) -> pd.DataFrame:
         """
         Fetch historical OHLCV data for a symbol and interval from Binance.
@@ -33,9 +138,24 @@ class MarketDataFetcher:
             start: ISO date string or 'YYYY-MM-DD'
             end: ISO date string or 'YYYY-MM-DD'
             limit: max rows per API call (Binance max=1000)
+            extended: also return quote_volume, num_trades,
+                taker_buy_base_volume and taker_buy_quote_volume
+            compact: float32 prices / volumes and an int64 epoch-ms index
+                named 'open_time' instead of float64 and a DatetimeIndex
 
         Returns:
-            pandas DataFrame indexed by timestamp with OHLCV columns.
+            pandas DataFrame indexed by UTC timestamp with OHLCV columns.
+
+        Compact frames take 28 instead of 48 bytes per bar (OHLCV plus
+        index). Strategies, simulators and PnLCalculator accept them
+        directly and compute in float64, but the inputs are rounded to
+        float32's 24-bit mantissa: a relative error of up to 6e-8, i.e.
+        about 0.004 at a price of 60,000, so moving-average crossovers that
+        are closer than that can flip compared to a float64 run. Trade times
+        are epoch-ms integers.
+
+        If the fetcher was built with an OHLCVCache, only the parts of the
+        range that are not already on disk are downloaded.
         """
 
         start_ms = self._to_ms(start)
@@ -43,7 +163,72 @@ class MarketDataFetcher:
 
         self.logger.info(f"Fetching OHLCV for {symbol} {interval} {start} → {end}")
 
-        klines = []
+        if self.cache is not None:
+            return self._get_cached_ohlcv(
+                symbol, interval, start_ms, end_ms, limit, extended, compact
+            )
+
+        columns = self._fetch_range(symbol, interval, start_ms, end_ms, limit, extended)
+
+        if not len(columns[OHLCVCache.TIME_COLUMN]):
+            self.logger.warning(f"No OHLCV data returned for {symbol} in specified range.")
+            return pd.DataFrame()
+
+        df = self._columns_to_frame(columns, extended, compact)
+        return df
+
+    def get_price_panel(
+        self,
+        symbols: List[str],
+        interval: str,
+        start: str,
+        end: str,
+        field: str = "close",
+        limit: int = 1000,
+    ) -> pd.DataFrame:
+        """
+        Fetch one OHLCV field for many symbols as a time-aligned (bars x symbols) frame.
+
+        Rows are the union of all symbols' timestamps; a symbol has NaN
+        where it has no candle (e.g. before listing). Symbols without any
+        data in the range are dropped with a warning.
+        """
+        columns = {}
+        for symbol in symbols:
+            df = self.get_historical_ohlcv(symbol, interval, start, end, limit=limit)
+            if df.empty:
+                self.logger.warning(f"Skipping {symbol}: no data in range.")
+                continue
+            columns[symbol] = df[field]
+
+        if not columns:
+            return pd.DataFrame()
+
+        panel = pd.concat(columns, axis=1, join="outer").sort_index()
+        panel.index.name = "timestamp"
+        return panel
+
+    def _fetch_range(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        limit: int,
+        extended: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Page through /api/v3/klines from start_ms up to end_ms.
+
+        Each page is converted to typed columns as soon as it arrives, so the
+        raw JSON rows never accumulate for the whole range.
+        """
+        if self.concurrency > 1 and interval != "1M":
+            return self._fetch_range_concurrent(
+                symbol, interval, start_ms, end_ms, limit, extended
+            )
+
+        chunks = []
         req_start = start_ms
 
         while req_start < end_ms:
@@ -57,18 +242,142 @@ class MarketDataFetcher:
             if not batch:
                 break
 
-            klines.extend(batch)
+            chunks.append(self._klines_to_columns(batch, extended))
             last_ts = batch[-1][0]
 
             # Binance klines are inclusive of end, so increment to avoid duplication
             req_start = last_ts + 1
 
-        if not klines:
+        return self._concat_columns(chunks, extended)
+
+    def _fetch_range_concurrent(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        limit: int,
+        extended: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Download [start_ms, end_ms] as independent pages on a thread pool.
+
+        Each page spans exactly `limit` intervals, so page boundaries are known
+        up front instead of depending on the previous page's last timestamp.
+        All pages share one keep-alive session and the fetcher's rate limiter.
+        """
+        step = limit * interval_to_ms(interval)
+        pages = [(lo, min(lo + step - 1, end_ms)) for lo in range(start_ms, end_ms + 1, step)]
+        if len(pages) <= 1:
+            return self._fetch_page(None, symbol, interval, start_ms, end_ms, limit, extended)
+
+        self.logger.info(f"Downloading {len(pages)} pages with {self.concurrency} workers")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = [
+                    pool.submit(
+                        self._fetch_page, session, symbol, interval, lo, hi, limit, extended
+                    )
+                    for lo, hi in pages
+                ]
+                chunks = [f.result() for f in futures]
+        finally:
+            session.close()
+
+        return self._concat_columns(chunks, extended)
+
+    def _fetch_page(
+        self,
+        session: Optional[requests.Session],
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        limit: int,
+        extended: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """Fetch one precomputed page, topping up if the server returned a short page."""
+        interval_ms = interval_to_ms(interval)
+        chunks = []
+        req_start = start_ms
+        while req_start <= end_ms:
+            batch = self._fetch_klines(
+                symbol=symbol,
+                interval=interval,
+                start_ms=req_start,
+                end_ms=end_ms,
+                limit=limit,
+                session=session,
+            )
+            if not batch:
+                break
+            chunks.append(self._klines_to_columns(batch, extended))
+            if len(batch) < limit or batch[-1][0] + interval_ms > end_ms:
+                break
+            req_start = batch[-1][0] + 1
+        return self._concat_columns(chunks, extended)
+
+    def _get_cached_ohlcv(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        limit: int,
+        extended: bool = False,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Serve [start_ms, end_ms] from the cache, downloading only missing gaps.
+
+        A gap is only marked as covered up to the last closed candle, so a bar
+        that is still forming is fetched again on the next call. The extended
+        Binance fields are always stored when the API returns them.
+        """
+        stats = self.cache.stats
+        stats.requests += 1
+
+        gaps = self.cache.missing_ranges(symbol, interval, start_ms, end_ms)
+        if not gaps:
+            stats.hits += 1
+        elif gaps == [(start_ms, end_ms)]:
+            stats.misses += 1
+        else:
+            stats.partial_hits += 1
+
+        settled_until = self._now_ms() - interval_to_ms(interval)
+        fetched = 0
+        for gap_start, gap_end in gaps:
+            self.logger.info(f"Cache gap for {symbol} {interval}: {gap_start} → {gap_end}")
+            columns = self._fetch_range(symbol, interval, gap_start, gap_end, limit, True)
+            num_fetched = len(columns[OHLCVCache.TIME_COLUMN])
+            fetched += num_fetched
+
+            covered_end = min(gap_end, settled_until)
+            covered = (gap_start, covered_end) if covered_end >= gap_start else None
+            if not num_fetched and covered is None:
+                continue
+            self.cache.write(symbol, interval, columns, covered=covered)
+
+        stats.bars_fetched += fetched
+
+        with profiling.stage("fetch.cache") as stage:
+            columns = self.cache.read(symbol, interval, start_ms, end_ms)
+            stage.add_bars(len(columns.get(OHLCVCache.TIME_COLUMN, [])))
+        num_rows = len(columns.get(OHLCVCache.TIME_COLUMN, []))
+        stats.bars_from_cache += max(num_rows - fetched, 0)
+
+        if num_rows == 0:
             self.logger.warning(f"No OHLCV data returned for {symbol} in specified range.")
             return pd.DataFrame()
 
-        df = self._normalize_ohlcv_binance(klines)
-        return df
+        return self._columns_to_frame(columns, extended, compact)
 
     def _fetch_klines(
         self,
@@ -76,25 +385,40 @@ class MarketDataFetcher:
         interval: str,
         start_ms: int,
         end_ms: int,
-        limit: int
+        limit: int,
+        session: Optional[requests.Session] = None,
     ):
         url = (
-            f"{self.BASE_URL}/api/v3/klines"
+            f"{self.base_url}/api/v3/klines"
             f"?symbol={symbol}&interval={interval}&limit={limit}"
             f"&startTime={start_ms}&endTime={end_ms}"
         )
+        get = session.get if session is not None else requests.get
 
+        resp = None
         for attempt in range(1, self.max_retries + 1):
             try:
-                resp = requests.get(url, timeout=self.timeout)
+                self.rate_limiter.acquire(self.KLINES_WEIGHT)
+                with profiling.stage("fetch.http") as stage:
+                    profiling.count("fetch.http", requests=1, retries=int(attempt > 1))
+                    resp = get(url, timeout=self.timeout)
+                    self.rate_limiter.update_from_headers(getattr(resp, "headers", None))
 
-                if resp.status_code == 429:
-                    self.logger.warning(f"Rate limited on attempt {attempt}. Sleeping...")
-                    time.sleep(self.backoff_factor * attempt)
-                    continue
+                    if resp.status_code in (418, 429):
+                        profiling.count("fetch.http", rate_limited=1)
+                        retry_after = self._retry_after(resp)
+                        if retry_after is None:
+                            retry_after = self.backoff_factor * attempt
+                        self.logger.warning(
+                            f"Rate limited on attempt {attempt}. Sleeping {retry_after:.1f}s..."
+                        )
+                        self.rate_limiter.pause(retry_after)
+                        continue
 
-                resp.raise_for_status()
-                return resp.json()
+                    resp.raise_for_status()
+                    batch = resp.json()
+                    stage.add_bars(len(batch))
+                    return batch
 
             except Exception as e:
                 self.logger.error(f"Attempt {attempt}/{self.max_retries} failed: {e}")
@@ -104,9 +428,23 @@ class MarketDataFetcher:
                 self.logger.info(f"Retrying in {sleep_time:.1f}s...")
                 time.sleep(sleep_time)
 
-        return None
+        # every attempt was rate limited; returning nothing would let the
+        # cache mark the range as covered and leave a permanent hole
+        raise requests.HTTPError(
+            f"Rate limited on all {self.max_retries} attempts for {symbol} {interval} from {start_ms}",
+            response=resp,
+        )
+
+    def _retry_after(self, resp) -> Optional[float]:
+        headers = getattr(resp, "headers", None)
+        if not headers:
+            return None
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
 
-    def _normalize_ohlcv_binance(self, raw):
+    def _normalize_ohlcv_binance(self, raw, extended: bool = False) -> pd.DataFrame:
         """
         Normalizes Binance kline format to OHLCV DataFrame.
 
@@ -120,25 +458,111 @@ class MarketDataFetcher:
                 4 close,
                 5 volume,
                 6 close_time,
-                ...
+                7 quote_asset_volume,
+                8 number_of_trades,
+                9 taker_buy_base_asset_volume,
+                10 taker_buy_quote_asset_volume,
+                11 ignore
             ]
         ]
+
+        The rows are converted in bulk into typed NumPy columns; the index is
+        a UTC DatetimeIndex built directly from the int64 epoch-ms open times.
         """
-        records = []
-        for row in raw:
-            records.append({
-                "timestamp": datetime.fromtimestamp(row[0] / 1000),
-                "open": float(row[1]),
-                "high": float(row[2]),
-                "low": float(row[3]),
-                "close": float(row[4]),
-                "volume": float(row[5]),
-            })
-
-        df = pd.DataFrame(records)
-        df.set_index("timestamp", inplace=True)
-        return df
+        return self._columns_to_frame(self._klines_to_columns(raw, extended), extended)
+
+    def _klines_to_columns(self, raw, extended: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Convert raw Binance klines into typed columns.
+
+        open_time becomes int64 epoch-ms and prices / volume float64. With
+        extended=True the quote volume, trade count and taker buy volumes are
+        kept as well when the rows carry them.
+        """
+        if len(raw) == 0:
+            return self._empty_columns(extended)
+
+        with profiling.stage("fetch.normalize", bars=len(raw)):
+            arr = np.asarray(raw, dtype=object)
+            columns = {OHLCVCache.TIME_COLUMN: arr[:, 0].astype(np.int64)}
+            prices = arr[:, 1:6].astype(np.float64)
+            for offset, name in enumerate(OHLCV_COLUMNS):
+                columns[name] = np.ascontiguousarray(prices[:, offset])
+
+            if extended and arr.shape[1] > 10:
+                for offset, (name, dtype) in EXTENDED_COLUMNS.items():
+                    columns[name] = arr[:, offset].astype(dtype)
+        return columns
+
+    def _empty_columns(self, extended: bool = False) -> Dict[str, np.ndarray]:
+        columns = {OHLCVCache.TIME_COLUMN: np.empty(0, dtype=np.int64)}
+        for name in OHLCV_COLUMNS:
+            columns[name] = np.empty(0, dtype=np.float64)
+        if extended:
+            for name, dtype in EXTENDED_COLUMNS.values():
+                columns[name] = np.empty(0, dtype=dtype)
+        return columns
+
+    def _concat_columns(
+        self,
+        chunks: List[Dict[str, np.ndarray]],
+        extended: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Concatenate ordered page columns, dropping rows whose open_time does not
+        advance past everything before it (overlapping or duplicated pages).
+        """
+        chunks = [c for c in chunks if len(c[OHLCVCache.TIME_COLUMN])]
+        if not chunks:
+            return self._empty_columns(extended)
+        if len(chunks) == 1:
+            return chunks[0]
+
+        names = [n for n in chunks[0] if all(n in c for c in chunks)]
+        columns = {n: np.concatenate([c[n] for c in chunks]) for n in names}
+
+        open_time = columns[OHLCVCache.TIME_COLUMN]
+        keep = np.ones(len(open_time), dtype=bool)
+        keep[1:] = open_time[1:] > np.maximum.accumulate(open_time)[:-1]
+        if not keep.all():
+            columns = {n: arr[keep] for n, arr in columns.items()}
+        return columns
+
+    def _columns_to_frame(
+        self,
+        columns: Dict[str, np.ndarray],
+        extended: bool = False,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Build the OHLCV frame (UTC DatetimeIndex named 'timestamp') from typed columns.
+
+        With compact=True the index is the int64 epoch-ms open time (named
+        'open_time') and float columns are cast to COMPACT_FLOAT.
+        """
+        names = list(OHLCV_COLUMNS)
+        if extended:
+            names += [n for n, _ in EXTENDED_COLUMNS.values() if n in columns]
+
+        if compact:
+            index = pd.Index(
+                np.asarray(columns[OHLCVCache.TIME_COLUMN], dtype=np.int64), name=OHLCVCache.TIME_COLUMN
+            )
+            data = {
+                name: columns[name].astype(COMPACT_FLOAT) if columns[name].dtype.kind == "f" else columns[name]
+                for name in names
+            }
+            return pd.DataFrame(data, index=index, copy=False)
+
+        index = pd.DatetimeIndex(
+            pd.to_datetime(columns[OHLCVCache.TIME_COLUMN], unit="ms", utc=True),
+            name="timestamp",
+        )
+        return pd.DataFrame({name: columns[name] for name in names}, index=index, copy=False)
+
+    def _now_ms(self) -> int:
+        return int(time.time() * 1000)
 
     def _to_ms(self, dt_str: str) -> int:
-        return int(pd.Timestamp(dt_str).timestamp() * 1000)
+        return to_epoch_ms(dt_str)
     
\ No newline at end of file
@@ -0,0 +1,251 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def rolling_means(close: np.ndarray, windows: Iterable[int]) -> np.ndarray:
+    """
+    Simple moving averages of `close` for many windows from one cumulative sum.
+
+    Returns a (bars x len(windows)) float64 matrix with NaN where the window
+    is not yet full, i.e. the same layout as close.rolling(w).mean().
+    Prices are shifted by their first value before summing to keep the
+    running sum small and the rounding error close to pandas' rolling mean.
+    Like pandas (and RollingMean), a window holding one value repeated
+    returns that value exactly, so flat stretches give equal means for
+    every window instead of differing by the cumulative-sum rounding.
+    Other means agree with pandas to within a few ulps of the price, not
+    bit for bit. A window containing a NaN is NaN; later windows are not
+    affected.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    windows = [int(w) for w in windows]
+    n = len(close)
+    out = np.full((n, len(windows)), np.nan)
+    if n == 0:
+        return out
+
+    missing = np.isnan(close)
+    finite = np.flatnonzero(~missing)
+    base = close[finite[0]] if len(finite) else 0.0
+    csum = np.empty(n + 1)
+    csum[0] = 0.0
+    np.cumsum(np.where(missing, 0.0, close - base), out=csum[1:])
+    nan_count = np.r_[0, np.cumsum(missing)]
+
+    # length of the run of identical values ending at each bar
+    bars = np.arange(n)
+    run_start = np.where(np.r_[True, close[1:] != close[:-1]], bars, 0)
+    np.maximum.accumulate(run_start, out=run_start)
+    run_length = bars - run_start + 1
+
+    for j, w in enumerate(windows):
+        if w < 1:
+            raise ValueError("window must be >= 1")
+        if w > n:
+            continue
+        out[w - 1:, j] = (csum[w:] - csum[:-w]) / w + base
+        out[w - 1:, j][nan_count[w:] > nan_count[:-w]] = np.nan
+        flat = run_length >= w
+        out[flat, j] = close[flat]
+    return out
+
+
+def evaluate_positions(
+    prices: np.ndarray,
+    positions: np.ndarray,
+    initial_cash: float,
+    risk_per_trade: float,
+    return_equity: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Batched equivalent of TradeSimulator + PnLCalculator for long-only {0, 1} positions.
+
+    Parameters:
+        prices: (bars,) fill prices
+        positions: (bars x combos) target positions, one column per configuration
+        initial_cash, risk_per_trade: as in TradeSimulator
+
+    Equity follows the simulator's compounding: a trade entered at price e
+    with realized equity E holds E * r / e units, so its mark-to-market
+    equity is E * (1 + r * (p / e - 1)) and closing it multiplies E by the
+    same factor at the exit price. Results match the simulator up to
+    floating-point rounding.
+
+    Returns a dict of per-column arrays: end_equity, total_return_pct,
+    max_drawdown_pct, num_trades, win_rate_pct (and equity if requested).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    pos = np.asarray(positions) == 1
+    if pos.ndim == 1:
+        pos = pos[:, None]
+    n, k = pos.shape
+
+    if n == 0:
+        zeros = np.zeros(k)
+        out = {
+            "end_equity": zeros,
+            "total_return_pct": zeros,
+            "max_drawdown_pct": zeros,
+            "num_trades": np.zeros(k, dtype=np.int64),
+            "win_rate_pct": zeros,
+        }
+        if return_equity:
+            out["equity"] = np.empty((0, k))
+        return out
+
+    prev = np.zeros_like(pos)
+    prev[1:] = pos[:-1]
+    entry = pos & ~prev
+    exit_ = ~pos & prev
+
+    # price of the most recent entry, carried forward through the trade;
+    # the buffers below are reused in place to keep the working set small
+    entry_bar = np.where(entry, np.arange(n)[:, None], 0)
+    np.maximum.accumulate(entry_bar, axis=0, out=entry_bar)
+    growth = prices[entry_bar]
+    del entry_bar
+
+    np.divide(prices[:, None], growth, out=growth)
+    growth -= 1.0
+    wins = (exit_ & (growth > 0)).sum(axis=0)
+    growth *= risk_per_trade
+    growth += 1.0
+
+    realized = np.where(exit_, growth, 1.0)
+    np.cumprod(realized, axis=0, out=realized)
+    equity = np.where(pos, growth, 1.0)
+    del growth
+    equity *= realized
+    equity *= initial_cash
+    del realized
+
+    drawdown = np.maximum.accumulate(equity, axis=0)
+    np.divide(equity, drawdown, out=drawdown)
+    max_drawdown_pct = (drawdown.min(axis=0) - 1.0) * 100.0
+    del drawdown
+
+    num_trades = exit_.sum(axis=0)
+    win_rate_pct = np.divide(
+        wins * 100.0, num_trades, out=np.zeros(k), where=num_trades > 0
+    )
+
+    out = {
+        "end_equity": equity[-1],
+        "total_return_pct": (equity[-1] / equity[0] - 1.0) * 100.0,
+        "max_drawdown_pct": max_drawdown_pct,
+        "num_trades": num_trades,
+        "win_rate_pct": win_rate_pct,
+    }
+    if return_equity:
+        out["equity"] = equity
+    return out
+
+
+class SMAGridSweep:
+    """
+    Evaluate every (fast_window, slow_window) pair of SimpleMovingAverageStrategy at once.
+
+    All needed moving averages come from a single cumulative sum of `close`;
+    the crossover positions of each batch of combinations form a
+    (bars x combos) matrix that is simulated and scored in one pass.
+    Pairs with fast_window >= slow_window are skipped, as the strategy
+    rejects them.
+    """
+
+    # upper bound for bars * combos evaluated in one batch
+    MAX_CELLS = 1_000_000
+
+    def __init__(
+        self,
+        fast_windows: Iterable[int],
+        slow_windows: Iterable[int],
+        initial_cash: float = 10000.0,
+        risk_per_trade: float = 0.1,
+        batch_size: Optional[int] = None,
+    ):
+        self.fast_windows = sorted({int(w) for w in fast_windows})
+        self.slow_windows = sorted({int(w) for w in slow_windows})
+        self.initial_cash = initial_cash
+        self.risk_per_trade = risk_per_trade
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def combos(self) -> List[Tuple[int, int]]:
+        return [(f, s) for f in self.fast_windows for s in self.slow_windows if f < s]
+
+    def position_matrix(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """
+        Target positions for every combo as an int8 (bars x combos) matrix.
+
+        Column j follows combos[j] and equals
+        SimpleMovingAverageStrategy(*combos[j]).generate_target_positions(df)
+        except on bars where the two averages are within rounding distance
+        (a few ulps of the price) without being exactly equal: the
+        cumulative-sum means are not bit-identical to pandas', so such
+        near-ties can resolve either way. Exact ties on flat stretches
+        and NaN prices are handled as the strategy does.
+        """
+        combos = self.combos
+        means, col = self.means(df["close"].to_numpy())
+        return self.positions(means, col, combos).astype(np.int8), combos
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score every combo on `df`.
+
+        Returns a DataFrame indexed by (fast_window, slow_window) with
+        end_equity, total_return_pct, max_drawdown_pct, num_trades and
+        win_rate_pct columns.
+        """
+        combos = self.combos
+        close = df["close"].to_numpy(dtype=np.float64)
+        means, col = self.means(close)
+
+        batch = self.batch_size or max(1, self.MAX_CELLS // max(len(close), 1))
+        self.logger.info(
+            f"Sweeping {len(combos)} SMA combos over {len(close)} bars in batches of {batch}"
+        )
+
+        results: Dict[str, List[np.ndarray]] = {}
+        for lo in range(0, len(combos), batch):
+            chunk = combos[lo:lo + batch]
+            scores = evaluate_positions(
+                close,
+                self.positions(means, col, chunk),
+                self.initial_cash,
+                self.risk_per_trade,
+            )
+            for key, values in scores.items():
+                results.setdefault(key, []).append(values)
+
+        index = pd.MultiIndex.from_tuples(combos, names=["fast_window", "slow_window"])
+        if not combos:
+            return pd.DataFrame(index=index)
+        return pd.DataFrame({k: np.concatenate(v) for k, v in results.items()}, index=index)
+
+    def means(self, close: np.ndarray) -> Tuple[np.ndarray, Dict[int, int]]:
+        """
+        Every SMA the grid needs, as (windows x bars) and a window -> row map.
+
+        Stored window-major so each combo's series is contiguous; slicing
+        the bar axis gives the means of a sub-range with full warm-up.
+        """
+        windows = sorted(set(self.fast_windows) | set(self.slow_windows))
+        means = np.ascontiguousarray(rolling_means(close, windows).T)
+        return means, {w: j for j, w in enumerate(windows)}
+
+    @staticmethod
+    def positions(
+        means: np.ndarray,
+        col: Dict[int, int],
+        combos: List[Tuple[int, int]],
+    ) -> np.ndarray:
+        """Boolean (bars x combos) crossover positions from the output of means()."""
+        fast = means[[col[f] for f, _ in combos]]
+        slow = means[[col[s] for _, s in combos]]
+        # NaN compares False, so bars before the slow window fills stay flat
+        return (fast > slow).T
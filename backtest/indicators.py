@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest import profiling
+
+ArrayLike = Union[np.ndarray, pd.Series]
+
+
+@dataclass
+class IndicatorStats:
+    """Counters of an IndicatorEngine; `bytes` is the current in-memory size."""
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class _FingerprintMemo:
+    """
+    Fingerprints of arrays that are still alive, keyed by their memory location.
+
+    Views share the base array that owns the buffer, so every
+    df["close"].to_numpy() of the same frame maps to the same entry; an
+    entry is dropped when the owning array is garbage collected. Since ids
+    and addresses are reused once an array is freed, the key also holds the
+    first, middle and last values, so a new array at a recycled address (or
+    an in-place edit of those values) misses instead of returning a stale
+    digest. Other in-place edits of a cached input go unnoticed. Arrays
+    whose owner cannot be weakly referenced are hashed on every call.
+    """
+
+    def __init__(self):
+        self._digests: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, values: np.ndarray) -> str:
+        owner = values
+        while isinstance(owner.base, np.ndarray):
+            owner = owner.base
+        key = (
+            id(owner),
+            values.__array_interface__["data"][0],
+            values.shape,
+            values.strides,
+            values.dtype.str,
+            _sample(values),
+        )
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is not None:
+            return digest
+
+        digest = fingerprint(values)
+        try:
+            weakref.finalize(owner, self._forget, id(owner))
+        except TypeError:
+            return digest
+        with self._lock:
+            self._digests[key] = digest
+        return digest
+
+    def _forget(self, owner_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._digests if k[0] == owner_id]:
+                del self._digests[key]
+
+
+def _sample(values: np.ndarray) -> bytes:
+    """The first, middle and last values as bytes (b"" for empty arrays)."""
+    if values.size == 0:
+        return b""
+    return values.flat[[0, values.size // 2, values.size - 1]].tobytes()
+
+
+def fingerprint(values: np.ndarray) -> str:
+    """blake2b digest of an array's dtype, shape and contents."""
+    values = np.ascontiguousarray(values)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(values.dtype.str.encode())
+    h.update(str(values.shape).encode())
+    h.update(memoryview(values).cast("B"))
+    return h.hexdigest()
+
+
+class IndicatorEngine:
+    """
+    Memoizing source of indicators shared by strategies.
+
+    Each result is keyed by the indicator name, a fingerprint of the input
+    array and the parameters, so different strategies (or parameter sets
+    sharing a window) asking for sma(close, 20) on the same data compute it
+    once. Results are kept in an LRU bounded by `max_bytes` and, if
+    `disk_dir` is given, also saved as .npy files so later processes
+    (sweep reruns, notebook restarts) load instead of recomputing.
+
+    Returned arrays are read-only views of the cached data. Fingerprints
+    are memoized per live array together with a sample of its first,
+    middle and last values, so an input modified in place elsewhere after
+    it was cached keeps returning the old results; strategies only cache
+    when they are given an engine.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 ** 2, disk_dir: Optional[str] = None):
+        """
+        Parameters:
+            max_bytes: in-memory budget; least recently used results are
+                evicted beyond it and larger results are not kept in memory
+            disk_dir: optional directory for the on-disk tier
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = IndicatorStats()
+        self._entries: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._memo = _FingerprintMemo()
+        self._lock = threading.RLock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def sma(self, close: ArrayLike, window: int) -> np.ndarray:
+        """Simple moving average, identical to Series.rolling(window).mean()."""
+        return self.get("sma", close, (int(window),), _rolling_mean)
+
+    def get(
+        self,
+        name: str,
+        values: ArrayLike,
+        params: Tuple[Hashable, ...],
+        compute: Callable[..., np.ndarray],
+    ) -> np.ndarray:
+        """
+        Cached compute(values, *params).
+
+        `name` must identify `compute`: two different functions must not
+        share a name, or they would share cache entries. compute always
+        receives float64 values; float32 inputs (compact frames) are
+        fingerprinted as they are and only upcast on a miss.
+        """
+        values = _as_array(values)
+        key = (name, self._memo.get(values), params)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return cached
+
+        result = self._load(key)
+        if result is not None:
+            with self._lock:
+                self.stats.disk_hits += 1
+        else:
+            with profiling.stage(f"indicators.{name}", bars=len(values)):
+                result = np.asarray(compute(values.astype(np.float64, copy=False), *params))
+            with self._lock:
+                self.stats.misses += 1
+            self._save(key, result)
+
+        result.flags.writeable = False
+        self._insert(key, result)
+        return result
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop all in-memory entries (and the .npy files if disk=True)."""
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = 0
+        if disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.npy"):
+                path.unlink()
+
+    def _insert(self, key: Tuple, result: np.ndarray) -> None:
+        if result.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = result
+            self.stats.bytes += result.nbytes
+            while self.stats.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.stats.bytes -= evicted.nbytes
+                self.stats.evictions += 1
+
+    def _disk_path(self, key: Tuple) -> Path:
+        name, digest, params = key
+        params_digest = hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+        return self.disk_dir / f"{name}-{digest}-{params_digest}.npy"
+
+    def _load(self, key: Tuple) -> Optional[np.ndarray]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            return np.load(path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable indicator file {path}: {e}")
+            return None
+
+    def _save(self, key: Tuple, result: np.ndarray) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.npy")
+        np.save(tmp, result)
+        os.replace(tmp, path)
+
+
+def _as_array(values: ArrayLike) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        return values
+    return values.astype(np.float64, copy=False)
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def sma(close: ArrayLike, window: int) -> np.ndarray:
+    """Uncached simple moving average, identical to IndicatorEngine.sma."""
+    values = _as_array(close)
+    with profiling.stage("indicators.sma", bars=len(values)):
+        return _rolling_mean(values.astype(np.float64, copy=False), int(window))
+
+
+_DEFAULT_ENGINE: Optional[IndicatorEngine] = None
+
+
+def default_engine() -> IndicatorEngine:
+    """Process-wide engine to share between strategies (pass it as indicators=)."""
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        _DEFAULT_ENGINE = IndicatorEngine()
+    return _DEFAULT_ENGINE
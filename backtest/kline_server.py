@@ -0,0 +1,161 @@
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from backtest.fetcher import interval_to_ms
+
+
+def synthetic_kline(open_time: int, interval_ms: int) -> list:
+    """
+    Deterministic Binance-shaped kline for `open_time`.
+
+    Prices follow a slow sine wave so that strategies see trends and
+    crossovers; every field is a pure function of the timestamp.
+    """
+    phase = open_time / (interval_ms * 500.0)
+    close = 20000.0 + 2000.0 * math.sin(phase) + 150.0 * math.sin(phase * 7.3)
+    prev = 20000.0 + 2000.0 * math.sin(phase - 0.002) + 150.0 * math.sin((phase - 0.002) * 7.3)
+    high = max(prev, close) * 1.0005
+    low = min(prev, close) * 0.9995
+    volume = 10.0 + 5.0 * abs(math.sin(phase * 3.1))
+    return [
+        open_time,
+        f"{prev:.2f}",
+        f"{high:.2f}",
+        f"{low:.2f}",
+        f"{close:.2f}",
+        f"{volume:.5f}",
+        open_time + interval_ms - 1,
+        f"{volume * close:.5f}",
+        int(volume * 10),
+        f"{volume / 2:.5f}",
+        f"{volume * close / 2:.5f}",
+        "0",
+    ]
+
+
+class _KlineHandler(BaseHTTPRequestHandler):
+    server: "_KlineHTTPServer"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path != "/api/v3/klines":
+            self._reply(404, {"code": -1, "msg": "not found"})
+            return
+
+        owner = self.server.owner
+        if owner.latency > 0:
+            time.sleep(owner.latency)
+
+        used = owner._spend(owner.WEIGHT)
+        if used > owner.weight_limit:
+            self._reply(429, {"code": -1003, "msg": "Too many requests"},
+                        {"Retry-After": "1", owner.USED_WEIGHT_HEADER: str(used)})
+            return
+
+        query = parse_qs(parsed.query)
+        try:
+            interval_ms = interval_to_ms(query["interval"][0])
+            start = int(query.get("startTime", ["0"])[0])
+            end = int(query.get("endTime", [str(int(time.time() * 1000))])[0])
+            limit = min(int(query.get("limit", ["500"])[0]), 1000)
+        except (KeyError, ValueError) as e:
+            self._reply(400, {"code": -1100, "msg": str(e)})
+            return
+
+        first = -(-start // interval_ms) * interval_ms
+        rows = [
+            synthetic_kline(ts, interval_ms)
+            for ts in range(first, end + 1, interval_ms)[:limit]
+        ]
+        self._reply(200, rows, {owner.USED_WEIGHT_HEADER: str(used)})
+
+    def _reply(self, status: int, payload, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _KlineHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "LocalKlineServer"
+
+
+class LocalKlineServer:
+    """
+    Offline stand-in for Binance's /api/v3/klines endpoint.
+
+    Serves deterministic synthetic candles, simulates per-request network
+    latency and enforces a per-minute request-weight budget with the same
+    headers and 429 responses as Binance. Intended for tests and for
+    benchmarking sequential vs concurrent downloads without network access.
+
+    Usage:
+        with LocalKlineServer(latency=0.05) as server:
+            fetcher = MarketDataFetcher(base_url=server.url, concurrency=8)
+    """
+
+    USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+    WEIGHT = 2
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        weight_limit: int = 6000,
+    ):
+        self.latency = latency
+        self.weight_limit = weight_limit
+        self.request_count = 0
+        self._window_start = time.monotonic()
+        self._used = 0
+        self._lock = threading.Lock()
+
+        self._httpd = _KlineHTTPServer((host, port), _KlineHandler)
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _spend(self, weight: int) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60.0:
+                self._window_start = now
+                self._used = 0
+            self._used += weight
+            self.request_count += 1
+            return self._used
+
+    def start(self) -> "LocalKlineServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalKlineServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,438 @@
+import inspect
+import logging
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest.simulator import TradeSimulator
+from backtest.strategy import BaseStrategy
+from backtest.sweep import SweepConfig, SweepRunner
+
+# keys of PnLCalculator.summarize(extended=False); anything else needs extended=True
+_BASIC_METRICS = (
+    "start_equity", "end_equity", "total_return_pct", "max_drawdown_pct", "num_trades", "win_rate_pct",
+)
+
+
+@dataclass(frozen=True)
+class IntParam:
+    """Integer parameter in [low, high] on a grid of `step`, optionally log-uniform."""
+    low: int
+    high: int
+    step: int = 1
+    log: bool = False
+
+    def __post_init__(self):
+        if self.high < self.low or self.step < 1:
+            raise ValueError("IntParam needs low <= high and step >= 1")
+        if self.log and self.low < 1:
+            raise ValueError("log-scaled IntParam needs low >= 1")
+
+    def _bounds(self) -> Tuple[float, float]:
+        # half a step of slack on both ends so every grid point is equally likely
+        lo, hi = self.low - self.step / 2, self.high + self.step / 2
+        return (math.log(max(lo, 0.5)), math.log(hi)) if self.log else (lo, hi)
+
+    def to_unit(self, value: int) -> float:
+        lo, hi = self._bounds()
+        x = math.log(value) if self.log else value
+        return (x - lo) / (hi - lo)
+
+    def from_unit(self, u: float) -> int:
+        lo, hi = self._bounds()
+        x = lo + float(np.clip(u, 0.0, 1.0)) * (hi - lo)
+        x = math.exp(x) if self.log else x
+        snapped = self.low + self.step * round((x - self.low) / self.step)
+        return int(min(max(snapped, self.low), self.high))
+
+
+@dataclass(frozen=True)
+class FloatParam:
+    """Continuous parameter in [low, high], optionally log-uniform."""
+    low: float
+    high: float
+    log: bool = False
+
+    def __post_init__(self):
+        if self.high < self.low:
+            raise ValueError("FloatParam needs low <= high")
+        if self.log and self.low <= 0:
+            raise ValueError("log-scaled FloatParam needs low > 0")
+
+    def _bounds(self) -> Tuple[float, float]:
+        return (math.log(self.low), math.log(self.high)) if self.log else (self.low, self.high)
+
+    def to_unit(self, value: float) -> float:
+        lo, hi = self._bounds()
+        x = math.log(value) if self.log else value
+        return (x - lo) / (hi - lo) if hi > lo else 0.5
+
+    def from_unit(self, u: float) -> float:
+        lo, hi = self._bounds()
+        x = lo + float(np.clip(u, 0.0, 1.0)) * (hi - lo)
+        return float(math.exp(x) if self.log else x)
+
+
+@dataclass(frozen=True)
+class ChoiceParam:
+    """Categorical parameter drawn from a fixed list of values."""
+    values: Tuple
+
+    def __post_init__(self):
+        if not self.values:
+            raise ValueError("ChoiceParam needs at least one value")
+
+
+Param = Union[IntParam, FloatParam, ChoiceParam]
+
+
+@dataclass
+class OptimizationResult:
+    """
+    best_params: winning parameters (strategy and simulator ones together)
+    best_config: the same as a SweepConfig, ready for SweepRunner / a full backtest
+    best_summary: its PnLCalculator summary on the full history
+    trials: one row per evaluation with bracket, rung, bars, params and metrics
+    bars_evaluated: total bars backtested over all evaluations
+    full_equivalents: bars_evaluated / len(df), i.e. the cost in full backtests
+    """
+    best_params: Dict
+    best_config: SweepConfig
+    best_summary: Dict
+    trials: pd.DataFrame
+    bars_evaluated: int
+    full_equivalents: float
+
+
+class SuccessiveHalvingOptimizer:
+    """
+    Successive-halving / Hyperband search over BaseStrategy and TradeSimulator parameters.
+
+    Each bracket starts with many candidates evaluated on the most recent
+    `min_fraction` of the history, keeps the best 1 / eta of them, and
+    re-evaluates those on eta times more bars until the survivors run on the
+    full history. With hyperband=True the brackets of every starting
+    fraction between min_fraction and 1 are run in turn, hedging against
+    short slices ranking candidates badly. Only full-history scores decide
+    the winner.
+
+    Parameter names are routed by signature: names accepted by
+    TradeSimulator (initial_cash, risk_per_trade) configure the simulator,
+    everything else is passed to strategy_cls. Evaluations go through
+    SweepRunner, so workers > 1 spreads every rung over processes.
+
+    sampler="tpe" proposes the candidates of each bracket after the first
+    from a Parzen-estimator model (TPE / BOHB style) fitted on the results
+    so far: candidates are drawn around the best `gamma` share of the
+    observations and the one maximizing l(x) / g(x) is kept.
+    """
+
+    def __init__(
+        self,
+        strategy_cls: Type[BaseStrategy],
+        space: Dict[str, Param],
+        metric: str = "total_return_pct",
+        maximize: bool = True,
+        num_candidates: int = 81,
+        eta: int = 3,
+        min_fraction: float = 1 / 27,
+        hyperband: bool = False,
+        rounds: int = 1,
+        sampler: str = "random",
+        constraint: Optional[Callable[[Dict], bool]] = None,
+        fixed: Optional[Dict] = None,
+        min_trades: int = 0,
+        workers: int = 1,
+        chunk_size: int = 8,
+        seed: Optional[int] = None,
+    ):
+        """
+        Parameters:
+            space: parameter name -> IntParam / FloatParam / ChoiceParam
+            metric: key of PnLCalculator.summarize (extended keys such as
+                "sharpe" are computed automatically)
+            maximize: False to minimize the metric
+            num_candidates: candidates of the most exploratory bracket
+            eta: keep 1 / eta of the candidates per rung and grow the slice eta-fold
+            min_fraction: share of the bars used by the first rung
+            hyperband: run one bracket per starting fraction instead of only the smallest
+            rounds: repeat the bracket schedule (useful with sampler="tpe")
+            sampler: "random" or "tpe"
+            constraint: predicate on a candidate's params, e.g.
+                lambda p: p["fast_window"] < p["slow_window"]
+            fixed: extra constant parameters, routed like the searched ones
+            min_trades: candidates with fewer trades on a slice score worst
+            workers: worker processes per rung (1 runs in-process)
+            seed: seed for candidate proposal
+        """
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
+        if not 0 < min_fraction <= 1:
+            raise ValueError("min_fraction must be in (0, 1]")
+        if sampler not in ("random", "tpe"):
+            raise ValueError("sampler must be 'random' or 'tpe'")
+        if not space:
+            raise ValueError("space must name at least one parameter")
+
+        self.strategy_cls = strategy_cls
+        self.space = dict(space)
+        self.metric = metric
+        self.maximize = maximize
+        self.num_candidates = num_candidates
+        self.eta = eta
+        self.max_rung = int(math.floor(math.log(1 / min_fraction, eta) + 1e-9))
+        self.hyperband = hyperband
+        self.rounds = rounds
+        self.constraint = constraint
+        self.fixed = dict(fixed or {})
+        self.min_trades = min_trades
+        self.runner = SweepRunner(
+            workers=workers, chunk_size=chunk_size, extended=metric not in _BASIC_METRICS
+        )
+        self.rng = np.random.default_rng(seed)
+        self.sampler = _ParzenSampler(self.space, self.rng) if sampler == "tpe" else None
+        self.simulator_params = self._route([*self.space, *self.fixed])
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _route(self, names: Sequence[str]) -> Tuple[str, ...]:
+        """Names that configure the simulator; raises ValueError on unknown or ambiguous names."""
+        strategy = inspect.signature(self.strategy_cls.__init__).parameters
+        simulator = inspect.signature(TradeSimulator.__init__).parameters
+        open_kwargs = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in strategy.values())
+
+        routed = []
+        for name in names:
+            in_strategy, in_simulator = name in strategy and name != "self", name in simulator
+            if in_strategy and in_simulator:
+                raise ValueError(f"{name!r} is accepted by both the strategy and the simulator")
+            if in_simulator:
+                routed.append(name)
+            elif not (in_strategy or open_kwargs):
+                raise ValueError(f"{name!r} is neither a {self.strategy_cls.__name__} nor a TradeSimulator parameter")
+        return tuple(routed)
+
+    def config(self, params: Dict) -> SweepConfig:
+        """SweepConfig of one candidate (searched and fixed params together)."""
+        params = {**self.fixed, **params}
+        simulator = {k: v for k, v in params.items() if k in self.simulator_params}
+        strategy = {k: v for k, v in params.items() if k not in self.simulator_params}
+        return SweepConfig(self.strategy_cls, strategy, **simulator)
+
+    def brackets(self) -> List[Tuple[int, int]]:
+        """(candidates, starting rung) of every bracket of one round."""
+        if not self.hyperband:
+            return [(self.num_candidates, 0)]
+        out = []
+        for s in range(self.max_rung, -1, -1):
+            n = math.ceil(self.num_candidates * (self.max_rung + 1) / (s + 1) / self.eta ** (self.max_rung - s))
+            out.append((n, self.max_rung - s))
+        return out
+
+    def run(self, df: pd.DataFrame) -> OptimizationResult:
+        if df.empty:
+            raise ValueError("df is empty")
+        trials: List[Dict] = []
+        bars_evaluated = 0
+        finalists: List[Tuple[float, Dict, Dict]] = []
+
+        schedule = [bracket for _ in range(self.rounds) for bracket in self.brackets()]
+        for b, (n, first_rung) in enumerate(schedule):
+            candidates = self._propose(n, trials)
+            self.logger.info(f"Bracket {b}: {len(candidates)} candidates from rung {first_rung}")
+
+            for rung in range(first_rung, self.max_rung + 1):
+                bars = self._bars(len(df), rung)
+                rows = self._evaluate(df.iloc[len(df) - bars:], candidates)
+                scores = [self._score(row) for row in rows]
+                bars_evaluated += bars * len(candidates)
+                for params, row, score in zip(candidates, rows, scores):
+                    trials.append({"bracket": b, "rung": rung, "bars": bars, "params": params,
+                                   "score": score, "summary": row})
+
+                ranked = sorted(range(len(candidates)), key=scores.__getitem__, reverse=True)
+                if rung == self.max_rung:
+                    best = ranked[0]
+                    finalists.append((scores[best], candidates[best], rows[best]))
+                    break
+                keep = max(1, len(candidates) // self.eta)
+                candidates = [candidates[i] for i in ranked[:keep]]
+
+        score, params, summary = max(finalists, key=lambda f: f[0])
+        self.logger.info(
+            f"Best {self.metric}={summary.get(self.metric)} with {params} after "
+            f"{bars_evaluated / len(df):.1f} full-backtest equivalents"
+        )
+        return OptimizationResult(
+            best_params={**self.fixed, **params},
+            best_config=self.config(params),
+            best_summary=summary,
+            trials=self._trials_frame(trials),
+            bars_evaluated=bars_evaluated,
+            full_equivalents=bars_evaluated / len(df),
+        )
+
+    def _bars(self, num_bars: int, rung: int) -> int:
+        fraction = float(self.eta) ** (rung - self.max_rung)
+        return max(1, min(num_bars, int(math.ceil(num_bars * fraction))))
+
+    def _evaluate(self, df: pd.DataFrame, candidates: List[Dict]) -> List[Dict]:
+        configs = [self.config(params) for params in candidates]
+        rows = sorted(self.runner.run(df, configs), key=lambda row: row["config_id"])
+        return [{k: v for k, v in row.items() if k != "config_id"} for row in rows]
+
+    def _score(self, row: Dict) -> float:
+        """Larger is better; NaN and too-few-trades results rank last."""
+        value = row.get(self.metric)
+        if value is None or row.get("num_trades", 0) < self.min_trades:
+            return -math.inf
+        value = float(value)
+        if math.isnan(value):
+            return -math.inf
+        return value if self.maximize else -value
+
+    def _propose(self, n: int, trials: List[Dict]) -> List[Dict]:
+        """n distinct candidates satisfying the constraint (fewer if the space runs out)."""
+        model = self.sampler.fit(trials) if self.sampler is not None else None
+        seen, candidates = set(), []
+
+        def accept(params: Dict) -> bool:
+            if self.constraint is not None and not self.constraint({**self.fixed, **params}):
+                return False
+            return tuple(sorted(params.items())) not in seen
+
+        attempts = 0
+        while len(candidates) < n and attempts < 100 * n + 1000:
+            attempts += 1
+            params = model.propose(accept) if model is not None else self._sample()
+            if params is None or not accept(params):
+                continue
+            seen.add(tuple(sorted(params.items())))
+            candidates.append(params)
+        if not candidates:
+            raise ValueError("no candidate satisfies the constraint")
+        if len(candidates) < n:
+            self.logger.info(f"Search space exhausted: {len(candidates)} of {n} candidates")
+        return candidates
+
+    def _sample(self) -> Dict:
+        return {name: _draw(param, self.rng) for name, param in self.space.items()}
+
+    def _trials_frame(self, trials: List[Dict]) -> pd.DataFrame:
+        rows = [
+            {"bracket": t["bracket"], "rung": t["rung"], "bars": t["bars"], **t["summary"], "score": t["score"]}
+            for t in trials
+        ]
+        return pd.DataFrame(rows)
+
+
+def _draw(param: Param, rng: np.random.Generator):
+    if isinstance(param, ChoiceParam):
+        return param.values[rng.integers(len(param.values))]
+    return param.from_unit(rng.random())
+
+
+class _ParzenSampler:
+    """
+    Tree-structured Parzen estimator over independent parameters.
+
+    Fitted on the slice size with the most observations; a third of the
+    proposals stay uniformly random to keep exploring.
+    """
+
+    def __init__(
+        self,
+        space: Dict[str, Param],
+        rng: np.random.Generator,
+        gamma: float = 0.25,
+        draws: int = 24,
+        random_fraction: float = 1 / 3,
+        min_bandwidth: float = 0.03,
+    ):
+        self.space = space
+        self.rng = rng
+        self.gamma = gamma
+        self.draws = draws
+        self.random_fraction = random_fraction
+        self.min_bandwidth = min_bandwidth
+        self.min_observations = max(10, 2 * len(space) + 2)
+        self.good: Optional[Dict[str, np.ndarray]] = None
+        self.bad: Optional[Dict[str, np.ndarray]] = None
+
+    def fit(self, trials: List[Dict]) -> "_ParzenSampler":
+        self.good = self.bad = None
+        by_size: Dict[int, List[Dict]] = {}
+        for t in trials:
+            by_size.setdefault(t["bars"], []).append(t)
+        if not by_size:
+            return self
+
+        # the widest rung, not the longest slice: later rungs only hold survivors,
+        # which leaves no contrast between good and bad candidates
+        bars = max(by_size, key=lambda size: (len(by_size[size]), size))
+        observed = sorted(by_size[bars], key=lambda t: t["score"], reverse=True)
+        split = max(1, int(math.ceil(self.gamma * len(observed))))
+        if len(observed) >= self.min_observations and math.isfinite(observed[split - 1]["score"]):
+            self.good = self._encode([t["params"] for t in observed[:split]])
+            self.bad = self._encode([t["params"] for t in observed[split:]])
+        return self
+
+    def propose(self, accept: Callable[[Dict], bool]) -> Optional[Dict]:
+        """Best-ranked acceptable draw, or a uniform one; None if no draw is acceptable."""
+        if self.good is None or self.rng.random() < self.random_fraction:
+            return {name: _draw(param, self.rng) for name, param in self.space.items()}
+
+        draws = {name: self._sample_around(name) for name in self.space}
+        log_ratio = sum(
+            np.log(self._density(name, draws[name], self.good) + 1e-12)
+            - np.log(self._density(name, draws[name], self.bad) + 1e-12)
+            for name in self.space
+        )
+        for i in np.argsort(-log_ratio, kind="stable"):
+            params = {name: self._decode(name, draws[name][i]) for name in self.space}
+            if accept(params):
+                return params
+        return None
+
+    def _encode(self, params: List[Dict]) -> Dict[str, np.ndarray]:
+        encoded = {}
+        for name, param in self.space.items():
+            if isinstance(param, ChoiceParam):
+                encoded[name] = np.array([param.values.index(p[name]) for p in params], dtype=np.int64)
+            else:
+                encoded[name] = np.array([param.to_unit(p[name]) for p in params], dtype=np.float64)
+        return encoded
+
+    def _decode(self, name: str, value):
+        param = self.space[name]
+        if isinstance(param, ChoiceParam):
+            return param.values[int(value)]
+        return param.from_unit(float(value))
+
+    def _bandwidth(self, points: np.ndarray) -> float:
+        # Scott's rule, floored so a tight cluster still explores its neighbourhood
+        return max(float(points.std()) * len(points) ** -0.2, self.min_bandwidth)
+
+    def _sample_around(self, name: str) -> np.ndarray:
+        points = self.good[name]
+        centers = points[self.rng.integers(len(points), size=self.draws)]
+        if isinstance(self.space[name], ChoiceParam):
+            k = len(self.space[name].values)
+            resample = self.rng.random(self.draws) < 1 / (len(points) + 1)
+            return np.where(resample, self.rng.integers(k, size=self.draws), centers)
+        samples = centers + self.rng.normal(0.0, self._bandwidth(points), size=self.draws)
+        return np.clip(samples, 0.0, 1.0)
+
+    def _density(self, name: str, x: np.ndarray, observed: Dict[str, np.ndarray]) -> np.ndarray:
+        points = observed[name]
+        if isinstance(self.space[name], ChoiceParam):
+            k = len(self.space[name].values)
+            counts = np.bincount(points, minlength=k)
+            return (counts[x.astype(np.int64)] + 1.0) / (len(points) + k)
+        if len(points) == 0:
+            return np.ones_like(x)
+        h = self._bandwidth(points)
+        z = (x[:, None] - points[None, :]) / h
+        return np.exp(-0.5 * z * z).mean(axis=1) / h
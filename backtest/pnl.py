@@ -1,9 +1,135 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 
 import numpy as np
 import pandas as pd
 
-from backtest.simulator import Trade
+from backtest.cache import OHLCVCache
+from backtest.profiling import profiled
+from backtest.simulator import Trade, TradeLog
+
+TRADE_COLUMNS = ["entry_time", "exit_time", "entry_price", "exit_price", "qty"]
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+TradesLike = Union[TradeLog, List[Trade], pd.DataFrame]
+
+
+def trades_to_frame(trades: TradesLike) -> pd.DataFrame:
+    """
+    Columnar trade table: one row per closed trade with entry/exit time and
+    price, qty, pnl and return_pct. Accepts a TradeLog, a list of Trade
+    objects or a DataFrame that already has the Trade columns (e.g.
+    PortfolioResult.trades).
+    """
+    if isinstance(trades, TradeLog):
+        table = trades.to_frame()
+    elif isinstance(trades, pd.DataFrame):
+        table = trades.copy()
+    elif len(trades) == 0:
+        table = pd.DataFrame({c: np.empty(0) for c in TRADE_COLUMNS})
+    else:
+        table = pd.DataFrame({c: [getattr(t, c) for t in trades] for c in TRADE_COLUMNS})
+
+    entry = table["entry_price"].to_numpy(dtype=np.float64)
+    exit_ = table["exit_price"].to_numpy(dtype=np.float64)
+    table["pnl"] = (exit_ - entry) * table["qty"].to_numpy(dtype=np.float64)
+    table["return_pct"] = (exit_ / entry - 1.0) * 100.0 if len(table) else np.empty(0)
+    return table
+
+
+def infer_periods_per_year(index: pd.Index) -> float:
+    """
+    Bars per year from the median spacing of a DatetimeIndex (crypto trades
+    24/7, so a year is 365 days). An integer index named 'open_time' (the
+    compact frames of MarketDataFetcher) is read as epoch milliseconds.
+    Falls back to 365 (daily bars) when the index carries no time information.
+    """
+    if len(index) > 1:
+        step = None
+        if isinstance(index, pd.DatetimeIndex):
+            step = np.median(np.diff(index.asi8)) / 1e9
+        elif index.name == OHLCVCache.TIME_COLUMN and index.dtype.kind == "i":
+            step = np.median(np.diff(index.to_numpy())) / 1e3
+        if step is not None and step > 0:
+            return SECONDS_PER_YEAR / step
+    return 365.0
+
+
+def equity_metrics(equity: np.ndarray, periods_per_year: float) -> Dict[str, np.ndarray]:
+    """
+    Equity-curve metrics for a (bars x curves) matrix, one value per column.
+
+    - total_return_pct, cagr_pct, max_drawdown_pct (<= 0)
+    - volatility_pct: annualized std of bar returns
+    - sharpe: annualized mean / std of bar returns (risk-free rate 0)
+    - sortino: annualized mean / downside deviation of bar returns
+    - calmar: cagr / |max drawdown|
+    - longest_drawdown_bars: longest stretch spent below a previous peak
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.ndim == 1:
+        equity = equity[:, None]
+    n, k = equity.shape
+    nan = np.full(k, np.nan)
+    if n == 0:
+        return {
+            "total_return_pct": np.zeros(k), "cagr_pct": nan, "max_drawdown_pct": np.zeros(k),
+            "volatility_pct": nan, "sharpe": nan, "sortino": nan, "calmar": nan,
+            "longest_drawdown_bars": np.zeros(k, dtype=np.int64),
+        }
+
+    growth = equity[-1] / equity[0]
+    total_return_pct = (growth - 1.0) * 100.0
+    years = (n - 1) / periods_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.power(growth, 1.0 / years) - 1.0 if years > 0 else nan
+
+    peak = np.maximum.accumulate(equity, axis=0)
+    max_drawdown = (equity / peak - 1.0).min(axis=0)
+
+    # bars since the last peak; its maximum is the longest drawdown
+    bar = np.arange(n)[:, None]
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bar, 0), axis=0)
+    longest_drawdown = (bar - last_peak).max(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1.0
+        mean = returns.mean(axis=0) if n > 1 else nan
+        std = returns.std(axis=0, ddof=1) if n > 2 else nan
+        downside = np.sqrt((np.minimum(returns, 0.0) ** 2).mean(axis=0)) if n > 1 else nan
+
+        ann = np.sqrt(periods_per_year)
+        sharpe = np.where(std > 0, mean / std * ann, np.nan)
+        sortino = np.where(downside > 0, mean / downside * ann, np.nan)
+        calmar = np.where(max_drawdown < 0, cagr / -max_drawdown, np.nan)
+
+    return {
+        "total_return_pct": total_return_pct,
+        "cagr_pct": cagr * 100.0,
+        "max_drawdown_pct": max_drawdown * 100.0,
+        "volatility_pct": std * ann * 100.0,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "calmar": calmar,
+        "longest_drawdown_bars": longest_drawdown,
+    }
+
+
+def trade_metrics(table: pd.DataFrame) -> Dict[str, float]:
+    """Profit factor and average win / loss (in quote currency) from a trade table."""
+    pnl = table["pnl"].to_numpy(dtype=np.float64)
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    gross_profit, gross_loss = wins.sum(), -losses.sum()
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = np.inf if gross_profit > 0 else np.nan
+    return {
+        "profit_factor": float(profit_factor),
+        "avg_win": float(wins.mean()) if len(wins) else 0.0,
+        "avg_loss": float(losses.mean()) if len(losses) else 0.0,
+    }
 
 
 class PnLCalculator:
@@ -12,7 +138,21 @@ class PnLCalculator:
         self.summary_data = {}
 
         
-    def summarize(self, trades: List[Trade], equity_curve: pd.Series) -> Dict:
+    @profiled("pnl.summarize", bars_arg="equity_curve")
+    def summarize(
+        self,
+        trades: TradesLike,
+        equity_curve: pd.Series,
+        extended: bool = False,
+        periods_per_year: Optional[float] = None,
+    ) -> Dict:
+        """
+        Basic summary (returns, drawdown, trade count, win rate).
+
+        With extended=True the result also holds the metrics of `metrics()`:
+        CAGR, volatility, Sharpe, Sortino, Calmar, profit factor, average
+        win / loss, exposure and longest drawdown duration.
+        """
         if equity_curve.empty:
             return {
                 "start_equity": 0.0,
@@ -32,11 +172,9 @@ class PnLCalculator:
         max_drawdown_pct = float(drawdown.min())
 
         num_trades = len(trades)
+        table = trades_to_frame(trades)
         if num_trades > 0:
-            pnl = np.array(
-                [(t.exit_price - t.entry_price) * t.qty for t in trades]
-            )
-            win_rate_pct = float((pnl > 0).mean() * 100.0)
+            win_rate_pct = float((table["pnl"].to_numpy() > 0).mean() * 100.0)
         else:
             win_rate_pct = 0.0
         self.summary_data = {
@@ -48,7 +186,98 @@ class PnLCalculator:
             "win_rate_pct": win_rate_pct,
             "trades": trades
         }
+        if extended:
+            metrics = self.metrics(table, equity_curve, periods_per_year)
+            for key in ("total_return_pct", "max_drawdown_pct"):
+                metrics.pop(key)
+            self.summary_data.update(metrics)
         return self.summary_data
+
+    def metrics(
+        self,
+        trades: TradesLike,
+        equity_curve: pd.Series,
+        periods_per_year: Optional[float] = None,
+    ) -> Dict:
+        """
+        Extended performance metrics of one backtest, all computed with array ops.
+
+        periods_per_year defaults to infer_periods_per_year(equity_curve.index).
+        exposure_pct is the share of bars spent inside a closed trade.
+        """
+        table = trades_to_frame(trades)
+        ppy = periods_per_year or infer_periods_per_year(equity_curve.index)
+        values = equity_curve.to_numpy(dtype=np.float64)
+
+        metrics = {k: v[0].item() for k, v in equity_metrics(values, ppy).items()}
+        metrics.update(trade_metrics(table))
+
+        if len(table) and len(values):
+            index = equity_curve.index
+            entry = index.searchsorted(table["entry_time"].to_numpy())
+            exit_ = index.searchsorted(table["exit_time"].to_numpy())
+            metrics["exposure_pct"] = float((exit_ - entry).sum() / len(values) * 100.0)
+        else:
+            metrics["exposure_pct"] = 0.0
+        return metrics
+
+    def batch_metrics(
+        self,
+        equity_curves: Union[np.ndarray, pd.DataFrame],
+        periods_per_year: Optional[float] = None,
+        positions: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        """
+        Score many equity curves in one call.
+
+        equity_curves is a (bars x curves) array or DataFrame (e.g. the
+        equity matrix of a parameter sweep). periods_per_year is inferred
+        from a DataFrame's index and required for a bare array, which has
+        no bar spacing to infer it from. If `positions` of the same shape
+        is given, exposure_pct is the share of bars with a non-zero
+        position. Returns one row per curve.
+        """
+        columns = None
+        if isinstance(equity_curves, pd.DataFrame):
+            columns = equity_curves.columns
+            if periods_per_year is None:
+                periods_per_year = infer_periods_per_year(equity_curves.index)
+            equity_curves = equity_curves.to_numpy(dtype=np.float64)
+        elif periods_per_year is None:
+            raise ValueError("periods_per_year is required when equity_curves is an array")
+
+        result = pd.DataFrame(equity_metrics(equity_curves, periods_per_year), index=columns)
+        if positions is not None:
+            positions = np.asarray(positions)
+            if positions.ndim == 1:
+                positions = positions[:, None]
+            result["exposure_pct"] = (positions != 0).mean(axis=0) * 100.0
+        return result
+
+    def rolling_metrics(
+        self,
+        equity_curve: pd.Series,
+        window: int,
+        periods_per_year: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Rolling-window return, volatility, Sharpe and drawdown over `window` bars.
+
+        rolling_drawdown_pct is the drawdown from the highest equity seen in
+        the trailing window.
+        """
+        ppy = periods_per_year or infer_periods_per_year(equity_curve.index)
+        returns = equity_curve.pct_change()
+        mean = returns.rolling(window).mean()
+        std = returns.rolling(window).std()
+        peak = equity_curve.rolling(window, min_periods=1).max()
+
+        return pd.DataFrame({
+            "rolling_return_pct": (equity_curve / equity_curve.shift(window) - 1.0) * 100.0,
+            "rolling_volatility_pct": std * np.sqrt(ppy) * 100.0,
+            "rolling_sharpe": (mean / std.where(std > 0)) * np.sqrt(ppy),
+            "rolling_drawdown_pct": (equity_curve / peak - 1.0) * 100.0,
+        })
         
     def print_summary(self,print_trades) -> None:
         """
@@ -63,16 +292,10 @@ class PnLCalculator:
         """
   
         trades = self.summary_data.get("trades", [])
-        if trades and print_trades:
+        if len(trades) and print_trades:
             print("======================================\n")
             print("Trades:")
-            for t in trades:
-                pnl = (t.exit_price - t.entry_price) * t.qty
-                print(
-                    f"{t.entry_time} → {t.exit_time} | "
-                    f"entry={t.entry_price:.2f}, exit={t.exit_price:.2f}, "
-                    f"qty={t.qty:.5f}, pnl={pnl:.2f}"
-                )
+            print_trade_table(trades)
             
         print("\n========== BACKTEST SUMMARY ==========")
         print("--------------------------------------")
@@ -82,4 +305,35 @@ class PnLCalculator:
         print(f"Max drawdown     : {self.summary_data.get('max_drawdown_pct'):.2f}%")
         print(f"# of trades      : {self.summary_data.get('num_trades')}")
         print(f"Win rate         : {self.summary_data.get('win_rate_pct'):.2f}%")
+        if "sharpe" in self.summary_data:
+            print_extended_metrics(self.summary_data)
         print("======================================")
+
+
+def print_trade_table(trades: TradesLike) -> None:
+    """Print one line per trade, reading the columns of trades_to_frame."""
+    table = trades_to_frame(trades)
+    rows = zip(
+        table["entry_time"], table["exit_time"], table["entry_price"].tolist(),
+        table["exit_price"].tolist(), table["qty"].tolist(), table["pnl"].tolist(),
+    )
+    for entry_time, exit_time, entry_price, exit_price, qty, pnl in rows:
+        print(
+            f"{entry_time} → {exit_time} | "
+            f"entry={entry_price:.2f}, exit={exit_price:.2f}, "
+            f"qty={qty:.5f}, pnl={pnl:.2f}"
+        )
+
+
+def print_extended_metrics(summary: Dict) -> None:
+    """Print the keys added by summarize(extended=True)."""
+    print("--------------------------------------")
+    print(f"CAGR             : {summary.get('cagr_pct'):.2f}%")
+    print(f"Volatility       : {summary.get('volatility_pct'):.2f}%")
+    print(f"Sharpe           : {summary.get('sharpe'):.2f}")
+    print(f"Sortino          : {summary.get('sortino'):.2f}")
+    print(f"Calmar           : {summary.get('calmar'):.2f}")
+    print(f"Profit factor    : {summary.get('profit_factor'):.2f}")
+    print(f"Avg win / loss   : {summary.get('avg_win'):.2f} / {summary.get('avg_loss'):.2f}")
+    print(f"Exposure         : {summary.get('exposure_pct'):.2f}%")
+    print(f"Longest drawdown : {summary.get('longest_drawdown_bars')} bars")
@@ -0,0 +1,157 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PortfolioResult:
+    """
+    equity: portfolio equity (cash + marked-to-market holdings) per bar
+    symbol_pnl: cumulative realized + unrealized PnL per symbol; the row sum
+        plus initial cash equals `equity`
+    quantities: units held per symbol after each bar's fills
+    trades: one row per closed trade (symbol, entry/exit time and price, qty, pnl)
+    """
+    equity: pd.Series
+    symbol_pnl: pd.DataFrame
+    quantities: pd.DataFrame
+    trades: pd.DataFrame
+
+
+class PortfolioSimulator:
+    """
+    Long-only multi-symbol simulator over an aligned (bars x symbols) price panel.
+
+    All symbols draw from one shared cash balance. At every bar exits are
+    filled first, then each entering symbol is allocated `weight` of the
+    current portfolio equity (cash plus open positions marked at this bar).
+    If the requested allocations exceed the available cash they are scaled
+    down equally. Fills happen at the bar's price, as in TradeSimulator.
+
+    Targets follow the same convention as TradeSimulator: 0 -> 1 enters and
+    1 -> 0 exits; any value other than 1 counts as flat.
+
+    Only bars on which some symbol trades are visited in Python (with the
+    work per bar vectorized over symbols); quantities, cash, equity and
+    per-symbol PnL are then expanded to all bars with array operations, so
+    cost grows linearly with bars x symbols.
+    """
+
+    def __init__(
+        self,
+        initial_cash: float,
+        weight: Optional[float] = None,
+    ):
+        """
+        Parameters:
+            initial_cash: starting cash shared by all symbols
+            weight: fraction of portfolio equity per new position
+                (default: 1 / number of symbols)
+        """
+        self.initial_cash = initial_cash
+        self.weight = weight
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def run(self, price_panel: pd.DataFrame, target_panel: pd.DataFrame) -> PortfolioResult:
+        symbols = list(price_panel.columns)
+        index = price_panel.index
+        n, num_symbols = price_panel.shape
+        weight = self.weight if self.weight is not None else 1.0 / max(num_symbols, 1)
+
+        # gaps inside a symbol's history keep the last price; bars before its
+        # first price are "not listed" and can't hold a position
+        prices = price_panel.ffill().to_numpy(dtype=np.float64)
+        listed = ~np.isnan(prices)
+        prices = np.where(listed, prices, 0.0)
+
+        target = target_panel.reindex(index=index, columns=symbols).to_numpy()
+        long = (target == 1) & listed
+        prev = np.zeros_like(long)
+        prev[1:] = long[:-1]
+        entries = long & ~prev
+        exits = ~long & prev
+
+        event_bars = np.flatnonzero(entries.any(axis=1) | exits.any(axis=1))
+        self.logger.info(
+            f"Simulating {num_symbols} symbols over {n} bars ({len(event_bars)} trading bars)"
+        )
+
+        qty = np.zeros(num_symbols)
+        entry_price = np.zeros(num_symbols)
+        entry_bar = np.zeros(num_symbols, dtype=np.int64)
+        cash = float(self.initial_cash)
+
+        qty_rows = np.empty((len(event_bars), num_symbols))
+        cash_rows = np.empty(len(event_bars))
+        closed: Dict[str, list] = {k: [] for k in ("symbol", "entry", "exit", "entry_price", "exit_price", "qty")}
+
+        for i, t in enumerate(event_bars):
+            p = prices[t]
+
+            out = np.flatnonzero(exits[t])
+            if len(out):
+                cash += float(qty[out] @ p[out])
+                closed["symbol"].append(out)
+                closed["entry"].append(entry_bar[out])
+                closed["exit"].append(np.full(len(out), t))
+                closed["entry_price"].append(entry_price[out])
+                closed["exit_price"].append(p[out])
+                closed["qty"].append(qty[out])
+                qty[out] = 0.0
+
+            into = np.flatnonzero(entries[t])
+            if len(into):
+                equity = cash + float(qty @ p)
+                alloc = equity * weight
+                if alloc * len(into) > cash:
+                    alloc = max(cash, 0.0) / len(into)
+                qty[into] = alloc / p[into]
+                entry_price[into] = p[into]
+                entry_bar[into] = t
+                cash -= alloc * len(into)
+
+            qty_rows[i] = qty
+            cash_rows[i] = cash
+
+        # expand the per-event state to every bar
+        row = np.searchsorted(event_bars, np.arange(n), side="right") - 1
+        has_state = row >= 0
+        quantities = np.zeros((n, num_symbols))
+        quantities[has_state] = qty_rows[row[has_state]]
+        cash_curve = np.full(n, float(self.initial_cash))
+        cash_curve[has_state] = cash_rows[row[has_state]]
+
+        equity_curve = cash_curve + (quantities * prices).sum(axis=1)
+
+        # holding q units through a price move dp earns q * dp for that symbol
+        symbol_pnl = np.zeros((n, num_symbols))
+        if n > 1:
+            np.cumsum(quantities[:-1] * np.diff(prices, axis=0), axis=0, out=symbol_pnl[1:])
+
+        return PortfolioResult(
+            equity=pd.Series(equity_curve, index=index, name="equity"),
+            symbol_pnl=pd.DataFrame(symbol_pnl, index=index, columns=symbols),
+            quantities=pd.DataFrame(quantities, index=index, columns=symbols),
+            trades=self._trade_table(closed, symbols, index),
+        )
+
+    @staticmethod
+    def _trade_table(closed: Dict[str, list], symbols, index: pd.Index) -> pd.DataFrame:
+        if not closed["symbol"]:
+            return pd.DataFrame(
+                columns=["symbol", "entry_time", "exit_time", "entry_price", "exit_price", "qty", "pnl"]
+            )
+        cols = {k: np.concatenate(v) for k, v in closed.items()}
+        trades = pd.DataFrame({
+            "symbol": np.asarray(symbols, dtype=object)[cols["symbol"]],
+            "entry_time": index[cols["entry"]],
+            "exit_time": index[cols["exit"]],
+            "entry_price": cols["entry_price"],
+            "exit_price": cols["exit_price"],
+            "qty": cols["qty"],
+        })
+        trades["pnl"] = (trades["exit_price"] - trades["entry_price"]) * trades["qty"]
+        return trades
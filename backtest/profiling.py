@@ -0,0 +1,280 @@
+import cProfile
+import functools
+import inspect
+import logging
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+
+@dataclass
+class StageStats:
+    """
+    Accumulated measurements of one named stage.
+
+    Wall time of nested stages is included in their parents (e.g.
+    "strategy.signals" contains "strategy.positions"); stages running on
+    several threads at once add up their wall times.
+    """
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    bars: int = 0
+    peak_bytes: int = 0
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+
+    @property
+    def bars_per_s(self) -> float:
+        return self.bars / self.wall_s if self.wall_s > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "wall_s": self.wall_s,
+            "bars": self.bars,
+            "bars_per_s": self.bars_per_s,
+            "peak_mb": self.peak_bytes / 1e6,
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class _NullStage:
+    """Shared no-op stand-in returned while no profiler is active."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def add_bars(self, bars: int) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "bars", "_start", "_mem_start", "_mem_max")
+
+    def __init__(self, profiler: "Profiler", name: str, bars: int):
+        self.profiler = profiler
+        self.name = name
+        self.bars = bars
+
+    def add_bars(self, bars: int) -> None:
+        self.bars += bars
+
+    def __enter__(self) -> "_Stage":
+        self._mem_start = self._mem_max = 0
+        if self.profiler.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.profiler._push_peak(peak)
+            tracemalloc.reset_peak()
+            self._mem_start = self._mem_max = current
+        self.profiler._stack().append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        wall = time.perf_counter() - self._start
+        self.profiler._stack().pop()
+        peak_bytes = 0
+        if self.profiler.track_memory and tracemalloc.is_tracing():
+            self._mem_max = max(self._mem_max, tracemalloc.get_traced_memory()[1])
+            peak_bytes = self._mem_max - self._mem_start
+            self.profiler._push_peak(self._mem_max)
+        self.profiler._record(self.name, wall, self.bars, peak_bytes)
+
+
+class Profiler:
+    """
+    Opt-in stage profiler for the backtest pipeline.
+
+    While a Profiler is active (inside its `with` block) the instrumented
+    stages of MarketDataFetcher, BaseStrategy subclasses, TradeSimulator and
+    PnLCalculator record wall time, bars processed and peak traced memory,
+    and the fetcher adds HTTP request, retry and 429/418 counts. When no
+    profiler is active every hook returns a shared no-op object, so the
+    instrumentation costs one global lookup per call.
+
+    Usage:
+        with Profiler() as prof:
+            df = fetcher.get_historical_ohlcv(...)
+            ...
+        print(prof.format_report())
+        prof.report()            # DataFrame, one row per stage
+
+    Only one profiler can be active at a time; it sees stages from all threads.
+    """
+
+    def __init__(self, track_memory: bool = True, cprofile: bool = False):
+        """
+        Parameters:
+            track_memory: measure peak memory per stage with tracemalloc
+                (slows allocation-heavy code down noticeably)
+            cprofile: also run cProfile on the thread that enters the
+                profiler; see dump_stats
+        """
+        self.track_memory = track_memory
+        self.stats: Dict[str, StageStats] = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __enter__(self) -> "Profiler":
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError("another Profiler is already active")
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        _ACTIVE = self
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _ACTIVE
+        _ACTIVE = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def stage(self, name: str, bars: int = 0) -> _Stage:
+        return _Stage(self, name, bars)
+
+    def count(self, name: str, requests: int = 0, retries: int = 0, rate_limited: int = 0) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(name, StageStats(name))
+            stats.requests += requests
+            stats.retries += retries
+            stats.rate_limited += rate_limited
+
+    def report(self) -> pd.DataFrame:
+        """One row per stage in first-seen order."""
+        with self._lock:
+            rows = {name: s.as_dict() for name, s in self.stats.items()}
+        return pd.DataFrame.from_dict(rows, orient="index").rename_axis("stage")
+
+    def format_report(self) -> str:
+        lines = [
+            f"{'stage':<24} {'calls':>6} {'wall s':>9} {'bars':>11} {'bars/s':>13} "
+            f"{'peak MB':>9} {'requests':>8} {'retries':>7} {'429s':>5}"
+        ]
+        for name, s in self.stats.items():
+            lines.append(
+                f"{name:<24} {s.calls:>6} {s.wall_s:>9.4f} {s.bars:>11} {s.bars_per_s:>13,.0f} "
+                f"{s.peak_bytes / 1e6:>9.1f} {s.requests:>8} {s.retries:>7} {s.rate_limited:>5}"
+            )
+        return "\n".join(lines)
+
+    def dump_stats(self, path: str) -> None:
+        """Write the cProfile data (pstats format); requires cprofile=True."""
+        if self._cprofile is None:
+            raise RuntimeError("Profiler was created without cprofile=True")
+        self._cprofile.dump_stats(path)
+
+    def _stack(self) -> List[_Stage]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push_peak(self, peak: int) -> None:
+        # tracemalloc has a single peak counter; hand it to the enclosing stage
+        # before a nested stage resets it
+        stack = self._stack()
+        if stack:
+            stack[-1]._mem_max = max(stack[-1]._mem_max, peak)
+
+    def _record(self, name: str, wall: float, bars: int, peak_bytes: int) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(name, StageStats(name))
+            stats.calls += 1
+            stats.wall_s += wall
+            stats.bars += bars
+            stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+
+
+_ACTIVE: Optional[Profiler] = None
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _ACTIVE
+
+
+def stage(name: str, bars: int = 0):
+    """Context manager timing `name` on the active profiler; a no-op if there is none."""
+    profiler = _ACTIVE
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name, bars)
+
+
+def count(name: str, requests: int = 0, retries: int = 0, rate_limited: int = 0) -> None:
+    """Add request / retry / rate-limit counts to `name` on the active profiler."""
+    profiler = _ACTIVE
+    if profiler is not None:
+        profiler.count(name, requests, retries, rate_limited)
+
+
+def profiled(name: str, bars_arg: Optional[str] = None) -> Callable:
+    """
+    Decorator recording every call of a method as stage `name`.
+
+    bars_arg names the parameter whose len() is the number of bars
+    processed, or "return" to use len() of the return value. If func has
+    no such parameter, or the value has no len(), the stage is recorded
+    without a bar count; decorating never fails.
+    """
+    def decorator(func: Callable) -> Callable:
+        position = None
+        if bars_arg not in (None, "return"):
+            try:
+                names = list(inspect.signature(func).parameters)
+            except (TypeError, ValueError):
+                names = []
+            if bars_arg in names:
+                position = names.index(bars_arg)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE
+            if profiler is None:
+                return func(*args, **kwargs)
+
+            bars = 0
+            if position is not None:
+                value = args[position] if position < len(args) else kwargs.get(bars_arg)
+                bars = _length(value)
+            with profiler.stage(name, bars) as current:
+                result = func(*args, **kwargs)
+                if bars_arg == "return":
+                    current.add_bars(_length(result))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _length(value) -> int:
+    try:
+        return len(value)
+    except TypeError:
+        return 0
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from typing import Mapping, Optional
+
+
+def _parse_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class WeightRateLimiter:
+    """
+    Thread-safe token bucket over Binance request weight.
+
+    Binance allows `capacity` weight per rolling minute per IP and reports the
+    weight already used in the ``X-MBX-USED-WEIGHT-1M`` response header. The
+    bucket refills continuously at capacity / window_s tokens per second and
+    is pulled down whenever the server says more weight has been used than we
+    accounted for (e.g. other processes sharing the IP).
+
+    On 429 / 418 responses callers should call `pause` with the server's
+    ``Retry-After`` value; every thread sharing the limiter then waits.
+    """
+
+    USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+    def __init__(self, capacity: int = 6000, window_s: float = 60.0, headroom: float = 0.9):
+        if capacity <= 0 or window_s <= 0:
+            raise ValueError("capacity and window_s must be > 0")
+        self.capacity = capacity * headroom
+        self.window_s = window_s
+        self.refill_rate = self.capacity / window_s
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._updated = now
+
+    def acquire(self, weight: int = 1) -> float:
+        """
+        Block until `weight` tokens are available, then consume them.
+
+        Returns the total time spent waiting in seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= weight:
+                    self._tokens -= weight
+                    return waited
+                else:
+                    delay = (weight - self._tokens) / self.refill_rate
+            time.sleep(delay)
+            waited += delay
+
+    def update_from_headers(self, headers: Mapping) -> None:
+        """Reconcile the bucket with the server-reported used weight."""
+        used = _parse_int(headers.get(self.USED_WEIGHT_HEADER)) if headers is not None else None
+        if used is None:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, self.capacity - used)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+        self.logger.warning(f"Request weight exhausted, pausing all requests for {seconds:.1f}s")
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from backtest.simulator import StreamingTradeSimulator, Trade
+from backtest.strategy import BaseStrategy
+
+
+@dataclass
+class BarUpdate:
+    """State after one replayed bar; `trade` is set on bars that closed a trade."""
+    timestamp: pd.Timestamp
+    close: float
+    target_position: int
+    equity: float
+    trade: Optional[Trade] = None
+
+
+def replay(
+    df: pd.DataFrame,
+    strategy: BaseStrategy,
+    simulator: StreamingTradeSimulator,
+    reset: bool = True,
+) -> Iterator[BarUpdate]:
+    """
+    Feed a stored OHLCV DataFrame bar by bar through a streaming strategy and simulator.
+
+    Yields one BarUpdate per row, as a live feed would. With reset=False the
+    strategy and simulator continue from their current state, so several
+    frames can be replayed back to back.
+    """
+    if reset:
+        strategy.reset()
+        simulator.reset()
+
+    columns = list(df.columns)
+    rows = zip(*(df[c].tolist() for c in columns))
+    for ts, values in zip(df.index, rows):
+        bar = dict(zip(columns, values))
+        target = strategy.on_bar(ts, bar)
+
+        num_trades = len(simulator.trades)
+        equity = simulator.on_bar(ts, bar["close"], target)
+        trade = simulator.trades[-1] if len(simulator.trades) > num_trades else None
+
+        yield BarUpdate(
+            timestamp=ts,
+            close=bar["close"],
+            target_position=target,
+            equity=equity,
+            trade=trade,
+        )
@@ -0,0 +1,220 @@
+import logging
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtest.cache import OHLCVCache
+from backtest.fetcher import EXTENDED_COLUMNS, MarketDataFetcher, interval_to_ms
+
+_DAY_MS = 24 * 3600 * 1000
+# 1970-01-01 was a Thursday; Binance weekly bars open on Monday 00:00 UTC
+_WEEK_OFFSET_MS = 4 * _DAY_MS
+
+# how each column combines when bars are merged; unknown columns take the last value
+AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    **{name: "sum" for name, _ in EXTENDED_COLUMNS.values()},
+}
+
+
+def bar_open_times(open_ms: np.ndarray, interval: str) -> np.ndarray:
+    """
+    Open time (epoch ms) of the `interval` bar containing each timestamp.
+
+    Follows Binance's boundaries: intervals up to 3d are aligned to the
+    Unix epoch in UTC, 1w bars open on Monday 00:00 UTC and 1M bars on
+    the first day of the calendar month.
+    """
+    open_ms = np.asarray(open_ms, dtype=np.int64)
+    if interval == "1M":
+        months = open_ms.astype("datetime64[ms]").astype("datetime64[M]")
+        return months.astype("datetime64[ms]").astype(np.int64)
+    step = interval_to_ms(interval)
+    offset = _WEEK_OFFSET_MS if interval == "1w" else 0
+    return (open_ms - offset) // step * step + offset
+
+
+def bar_close_times(bar_open_ms: np.ndarray, interval: str) -> np.ndarray:
+    """Exclusive end (epoch ms) of bars opening at `bar_open_ms`, i.e. the next bar's open."""
+    bar_open_ms = np.asarray(bar_open_ms, dtype=np.int64)
+    if interval == "1M":
+        months = bar_open_ms.astype("datetime64[ms]").astype("datetime64[M]") + 1
+        return months.astype("datetime64[ms]").astype(np.int64)
+    return bar_open_ms + interval_to_ms(interval)
+
+
+def _index_ms(index: pd.Index) -> np.ndarray:
+    """
+    Epoch-ms open times of a frame's index: a DatetimeIndex, or the int64
+    'open_time' index of MarketDataFetcher's compact frames.
+    """
+    if isinstance(index, pd.DatetimeIndex):
+        return index.as_unit("ms").asi8
+    if index.name == OHLCVCache.TIME_COLUMN and index.dtype.kind == "i":
+        return index.to_numpy(dtype=np.int64)
+    raise ValueError("index must be a DatetimeIndex or an int64 'open_time' index")
+
+
+def resample_ohlcv(
+    df: pd.DataFrame,
+    interval: str,
+    source_interval: Optional[str] = None,
+    drop_partial: bool = False,
+) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into coarser `interval` bars in one vectorized pass.
+
+    Parameters:
+        df: bars indexed by UTC open time, as returned by MarketDataFetcher
+            (compact frames keep their int64 'open_time' index and dtypes)
+        interval: target Binance interval, e.g. "5m", "1h", "1d", "1w", "1M"
+        source_interval: interval of `df`; needed for drop_partial
+        drop_partial: drop the last bar if the source data ends before it closes
+
+    open is the first open, high / low the extremes, close the last close,
+    and volume (plus the extended Binance volume and trade-count fields)
+    the sum. Bars are labelled by their open time; gaps in the source only
+    shrink the affected bars, they never shift the boundaries.
+    """
+    if df.empty:
+        return df.copy()
+
+    open_ms = _index_ms(df.index)
+    buckets = bar_open_times(open_ms, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    columns = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        how = AGGREGATIONS.get(name, "last")
+        if how == "first":
+            columns[name] = values[starts]
+        elif how == "last":
+            columns[name] = values[ends]
+        elif how == "max":
+            columns[name] = np.maximum.reduceat(values, starts)
+        elif how == "min":
+            columns[name] = np.minimum.reduceat(values, starts)
+        else:
+            columns[name] = np.add.reduceat(values, starts)
+
+    if isinstance(df.index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(
+            pd.to_datetime(buckets[starts], unit="ms", utc=True), name=df.index.name
+        )
+    else:
+        index = pd.Index(buckets[starts], name=df.index.name)
+    out = pd.DataFrame(columns, index=index)
+
+    if drop_partial:
+        if source_interval is None:
+            raise ValueError("drop_partial needs source_interval")
+        covered_until = open_ms[-1] + interval_to_ms(source_interval)
+        if covered_until < bar_close_times(buckets[-1:], interval)[0]:
+            out = out.iloc[:-1]
+    return out
+
+
+class MultiTimeframeData:
+    """
+    Several timeframes of one symbol derived from a single fetch of the finest interval.
+
+    Coarser frames are aggregated locally with resample_ohlcv on first use
+    and kept for later calls. `aligned` maps any coarser frame onto the base
+    bars without look-ahead: each base bar only sees coarse bars that have
+    closed by the time the base bar closes.
+
+    Usage:
+        data = MultiTimeframeData.fetch(fetcher, "BTCUSDT", ["1m", "1h", "1d"], start, end)
+        hourly = data.get("1h")
+        df = data.frame_with(["1h", "1d"])   # 1m bars plus close_1h, close_1d
+        positions = strategy.generate_target_positions(df)
+    """
+
+    def __init__(self, base: pd.DataFrame, base_interval: str):
+        self.base = base
+        self.base_interval = base_interval
+        self._frames: Dict[str, pd.DataFrame] = {base_interval: base}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def fetch(
+        cls,
+        fetcher: MarketDataFetcher,
+        symbol: str,
+        intervals: Sequence[str],
+        start: str,
+        end: str,
+        **kwargs,
+    ) -> "MultiTimeframeData":
+        """Download only the finest of `intervals` (extra kwargs go to get_historical_ohlcv)."""
+        base_interval = min(intervals, key=interval_to_ms)
+        base = fetcher.get_historical_ohlcv(symbol, base_interval, start, end, **kwargs)
+        return cls(base, base_interval)
+
+    @property
+    def intervals(self):
+        return list(self._frames)
+
+    def get(self, interval: str) -> pd.DataFrame:
+        """Bars of `interval`, derived from the base frame and cached."""
+        frame = self._frames.get(interval)
+        if frame is None:
+            self._check_derivable(interval)
+            self.logger.info(f"Resampling {len(self.base)} {self.base_interval} bars to {interval}")
+            frame = resample_ohlcv(self.base, interval, self.base_interval)
+            self._frames[interval] = frame
+        return frame
+
+    def aligned(self, interval: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Bars of `interval` as seen from each base bar, indexed like the base frame.
+
+        Row i holds the latest `interval` bar whose close time is at or
+        before the close of base bar i (NaN before the first one closes).
+        The still-forming coarse bar is never visible.
+        """
+        frame = self.get(interval)
+        if columns is not None:
+            frame = frame[list(columns)]
+        if interval == self.base_interval:
+            return frame
+
+        coarse_close = bar_close_times(_index_ms(frame.index), interval)
+        base_close = _index_ms(self.base.index) + interval_to_ms(self.base_interval)
+        rows = np.searchsorted(coarse_close, base_close, side="right") - 1
+
+        values = frame.to_numpy(dtype=np.float64)
+        out = np.full((len(rows), values.shape[1]), np.nan)
+        visible = rows >= 0
+        out[visible] = values[rows[visible]]
+        return pd.DataFrame(out, index=self.base.index, columns=frame.columns)
+
+    def frame_with(
+        self,
+        intervals: Iterable[str],
+        columns: Sequence[str] = ("close",),
+    ) -> pd.DataFrame:
+        """Base frame plus `{column}_{interval}` columns of each aligned coarser interval."""
+        out = self.base.copy()
+        for interval in intervals:
+            aligned = self.aligned(interval, columns)
+            for name in columns:
+                out[f"{name}_{interval}"] = aligned[name].to_numpy()
+        return out
+
+    def _check_derivable(self, interval: str) -> None:
+        base_ms = interval_to_ms(self.base_interval)
+        if interval in ("1w", "1M"):
+            divides = _DAY_MS % base_ms == 0
+        else:
+            target_ms = interval_to_ms(interval)
+            divides = target_ms % base_ms == 0 and target_ms >= base_ms
+        if self.base_interval == "1M" or not divides:
+            raise ValueError(f"{interval} bars cannot be built from {self.base_interval} bars")
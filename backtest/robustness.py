@@ -0,0 +1,320 @@
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest import profiling
+from backtest.pnl import TradesLike, equity_metrics, infer_periods_per_year, trades_to_frame
+
+# metrics of the trade-level methods, computed on closed-trade equity
+TRADE_METRICS = ("total_return_pct", "max_drawdown_pct", "win_rate_pct")
+
+# metrics of the block bootstrap (a subset of pnl.equity_metrics)
+BAR_METRICS = ("total_return_pct", "cagr_pct", "max_drawdown_pct", "volatility_pct", "sharpe")
+
+
+@dataclass
+class RobustnessResult:
+    """
+    Distribution of metrics over the resamples of one method.
+
+    observed holds the same metrics for the actual backtest, computed the
+    same way (so for the trade methods the drawdown is also the closed-trade
+    drawdown); samples has one row per resample.
+    """
+    method: str
+    observed: Dict[str, float]
+    samples: pd.DataFrame
+
+    def interval(self, confidence: float = 0.95) -> pd.DataFrame:
+        """Percentile confidence interval, median and observed value of every metric."""
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be in (0, 1)")
+        alpha = (1.0 - confidence) / 2.0
+        table = self.samples.quantile([alpha, 0.5, 1.0 - alpha]).T
+        table.columns = ["lower", "median", "upper"]
+        table["observed"] = pd.Series(self.observed)
+        return table
+
+
+class RobustnessAnalyzer:
+    """
+    Monte Carlo robustness checks of one single-position backtest.
+
+    - trade_shuffle: the closed trades in random order. The final return is
+      unchanged (compounding is commutative); the drawdown distribution
+      shows how much of the observed drawdown was luck of the sequence.
+    - trade_bootstrap: trades drawn with replacement; return, drawdown and
+      win rate all vary.
+    - block_bootstrap: circular block bootstrap of the bar returns of the
+      equity curve, keeping short-range autocorrelation within blocks.
+    - entry_delays: every entry filled 0..max_delay bars late at that bar's
+      close, each trade keeping its exit and its share of equity.
+
+    Trades are reduced to per-trade returns relative to the equity before
+    the trade, so each resample is a row of a (resamples x trades) or
+    (resamples x bars) matrix and whole batches are scored with array
+    operations. Batches are bounded to `max_batch_elements` matrix cells
+    and spread over `workers` processes. Every batch draws from its own
+    SeedSequence child, so results depend on `seed` but not on `workers`.
+    """
+
+    def __init__(
+        self,
+        resamples: int = 10_000,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        max_batch_elements: int = 4_000_000,
+    ):
+        """
+        Parameters:
+            resamples: resamples per method
+            workers: worker processes (default: os.cpu_count()); 1 runs in-process
+            seed: seed of the SeedSequence all batches are spawned from
+            max_batch_elements: matrix cells per batch; bounds the memory per worker
+        """
+        if resamples < 1:
+            raise ValueError("resamples must be >= 1")
+        self.resamples = resamples
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.max_batch_elements = max_batch_elements
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def trade_shuffle(self, trades: TradesLike, equity_curve: pd.Series) -> RobustnessResult:
+        returns, _ = self._trade_returns(trades, equity_curve)
+        return self._run("trade_shuffle", {"returns": returns}, len(returns), _trade_observed(returns))
+
+    def trade_bootstrap(self, trades: TradesLike, equity_curve: pd.Series) -> RobustnessResult:
+        returns, _ = self._trade_returns(trades, equity_curve)
+        return self._run("trade_bootstrap", {"returns": returns}, len(returns), _trade_observed(returns))
+
+    def block_bootstrap(self, equity_curve: pd.Series, block_bars: Optional[int] = None) -> RobustnessResult:
+        """
+        Parameters:
+            block_bars: bars per block (default: n ** (1/3), at least 1)
+
+        Each block is reduced to a few summaries (log growth, highest and
+        lowest point, internal drawdown, sums of returns and squared
+        returns) precomputed for every circular start, and the resampled
+        paths are scored by combining those block by block. The cost grows
+        with the number of blocks, not bars, and gives the same metrics as
+        scoring the concatenated bar returns.
+        """
+        values = equity_curve.to_numpy(dtype=np.float64)
+        if len(values) < 2:
+            raise ValueError("equity_curve needs at least 2 bars")
+        returns = values[1:] / values[:-1] - 1.0
+        if (returns <= -1.0).any():
+            raise ValueError("equity_curve must stay positive")
+        m = len(returns)
+        block = int(min(block_bars or max(1, round(m ** (1 / 3))), m))
+        blocks = math.ceil(m / block)
+        full, tail = _block_summaries(returns, block, m - (blocks - 1) * block)
+
+        ppy = infer_periods_per_year(equity_curve.index)
+        payload = {"full": full, "tail": tail, "blocks": blocks, "bars": m, "periods_per_year": ppy}
+        observed = {k: float(v[0]) for k, v in equity_metrics(values, ppy).items() if k in BAR_METRICS}
+        return self._run("block_bootstrap", payload, blocks, observed)
+
+    def entry_delays(
+        self,
+        trades: TradesLike,
+        equity_curve: pd.Series,
+        prices: pd.Series,
+        max_delay: int = 3,
+    ) -> RobustnessResult:
+        """
+        Parameters:
+            prices: close prices the backtest was run on (index must contain
+                every entry time)
+            max_delay: largest delay in bars; a trade whose delayed entry
+                reaches its exit bar is skipped
+        """
+        if max_delay < 0:
+            raise ValueError("max_delay must be >= 0")
+        returns, table = self._trade_returns(trades, equity_curve)
+        entry_bar = prices.index.get_indexer(table["entry_time"])
+        exit_bar = prices.index.get_indexer(table["exit_time"])
+        if (entry_bar < 0).any() or (exit_bar < 0).any():
+            raise ValueError("every trade's entry and exit time must be in prices.index")
+
+        payload = {
+            "prices": prices.to_numpy(dtype=np.float64),
+            "entry_bar": entry_bar,
+            "exit_bar": exit_bar,
+            "exit_price": table["exit_price"].to_numpy(dtype=np.float64),
+            # share of equity put into each trade (risk_per_trade for TradeSimulator runs)
+            "fraction": table["qty"].to_numpy() * table["entry_price"].to_numpy() / table["equity_before"].to_numpy(),
+            "max_delay": int(max_delay),
+        }
+        return self._run("entry_delays", payload, len(returns), _trade_observed(returns))
+
+    def run(
+        self,
+        trades: TradesLike,
+        equity_curve: pd.Series,
+        prices: Optional[pd.Series] = None,
+        max_delay: int = 3,
+        block_bars: Optional[int] = None,
+    ) -> Dict[str, RobustnessResult]:
+        """Every method (entry_delays only if prices are given), keyed by method name."""
+        results = {
+            "trade_shuffle": self.trade_shuffle(trades, equity_curve),
+            "trade_bootstrap": self.trade_bootstrap(trades, equity_curve),
+            "block_bootstrap": self.block_bootstrap(equity_curve, block_bars),
+        }
+        if prices is not None:
+            results["entry_delays"] = self.entry_delays(trades, equity_curve, prices, max_delay)
+        return results
+
+    def _trade_returns(self, trades: TradesLike, equity_curve: pd.Series):
+        """Per-trade returns on the equity before each trade, and the trade table."""
+        table = trades_to_frame(trades)
+        if table.empty:
+            raise ValueError("no closed trades to resample")
+        pnl = table["pnl"].to_numpy(dtype=np.float64)
+        start = float(equity_curve.iloc[0])
+        table["equity_before"] = start + np.concatenate([[0.0], np.cumsum(pnl)[:-1]])
+        return pnl / table["equity_before"].to_numpy(), table
+
+    def _run(self, method: str, payload: Dict, width: int, observed: Dict[str, float]) -> RobustnessResult:
+        rows = max(1, min(self.resamples, self.max_batch_elements // max(width, 1)))
+        sizes = [min(rows, self.resamples - lo) for lo in range(0, self.resamples, rows)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+
+        with profiling.stage(f"robustness.{method}", bars=self.resamples * width):
+            if self.workers == 1 or len(sizes) == 1:
+                parts = [_run_batch(method, payload, size, seq) for size, seq in zip(sizes, seeds)]
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(sizes))) as pool:
+                    parts = list(pool.map(
+                        _run_batch, [method] * len(sizes), [payload] * len(sizes), sizes, seeds
+                    ))
+
+        samples = pd.DataFrame({k: np.concatenate([part[k] for part in parts]) for k in parts[0]})
+        self.logger.info(f"{method}: {self.resamples} resamples in {len(sizes)} batches of up to {rows}")
+        return RobustnessResult(method, observed, samples)
+
+
+def _run_batch(method: str, payload: Dict, rows: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+
+    if method == "trade_shuffle":
+        returns = np.broadcast_to(payload["returns"], (rows, len(payload["returns"])))
+        return _trade_path_metrics(rng.permuted(returns, axis=1))
+
+    if method == "trade_bootstrap":
+        returns = payload["returns"]
+        return _trade_path_metrics(returns[rng.integers(0, len(returns), size=(rows, len(returns)))])
+
+    if method == "block_bootstrap":
+        full, tail, m = payload["full"], payload["tail"], payload["bars"]
+        starts = rng.integers(0, m, size=(rows, payload["blocks"]))
+        log_growth, drawdown, below_peak = np.zeros(rows), np.zeros(rows), np.zeros(rows)
+        s1, s2 = np.zeros(rows), np.zeros(rows)
+        for k in range(payload["blocks"]):
+            summary = tail if k == payload["blocks"] - 1 else full
+            g, hi, lo, dd, r1, r2 = (summary[name][starts[:, k]] for name in _BLOCK_FIELDS)
+            # a drawdown either stays inside the block or runs from an earlier peak to the block's low
+            np.maximum(drawdown, np.maximum(dd, below_peak - lo), out=drawdown)
+            below_peak = np.maximum(below_peak, hi) - g
+            log_growth += g
+            s1 += r1
+            s2 += r2
+        return _bar_path_metrics(log_growth, drawdown, s1, s2, m, payload["periods_per_year"])
+
+    if method == "entry_delays":
+        entry_bar, exit_bar = payload["entry_bar"], payload["exit_bar"]
+        delayed = entry_bar + rng.integers(0, payload["max_delay"] + 1, size=(rows, len(entry_bar)))
+        taken = delayed < exit_bar
+        fill = payload["prices"][np.minimum(delayed, exit_bar)]
+        returns = np.where(taken, payload["fraction"] * (payload["exit_price"] / fill - 1.0), 0.0)
+        return _trade_path_metrics(returns, taken)
+
+    raise ValueError(f"unknown method {method!r}")
+
+
+_BLOCK_FIELDS = ("log_growth", "high", "low", "drawdown", "sum", "sum_sq")
+
+
+def _block_summaries(returns: np.ndarray, block: int, tail: int):
+    """
+    Summaries of the circular blocks of `block` and `tail` bars starting at every bar.
+
+    In log-equity units relative to the block start: total growth, highest
+    and lowest point (both include the start, so high >= 0 >= low) and the
+    largest fall from a running high; plus the sums of the simple returns
+    and their squares.
+    """
+    m = len(returns)
+    ext = np.concatenate([returns, returns[:block]])
+    log_prefix = np.concatenate([[0.0], np.cumsum(np.log1p(ext))])
+    sum_prefix = np.concatenate([[0.0], np.cumsum(ext)])
+    sq_prefix = np.concatenate([[0.0], np.cumsum(ext * ext)])
+    starts = np.arange(m)
+
+    level, high, low, drawdown = np.zeros(m), np.zeros(m), np.zeros(m), np.zeros(m)
+    out = {}
+    for j in range(1, block + 1):
+        level = log_prefix[starts + j] - log_prefix[starts]
+        np.maximum(high, level, out=high)
+        np.minimum(low, level, out=low)
+        np.maximum(drawdown, high - level, out=drawdown)
+        if j in (tail, block):
+            out[j] = {
+                "log_growth": level, "high": high.copy(), "low": low.copy(), "drawdown": drawdown.copy(),
+                "sum": sum_prefix[starts + j] - sum_prefix[starts],
+                "sum_sq": sq_prefix[starts + j] - sq_prefix[starts],
+            }
+    return out[block], out[tail]
+
+
+def _bar_path_metrics(
+    log_growth: np.ndarray,
+    drawdown: np.ndarray,
+    s1: np.ndarray,
+    s2: np.ndarray,
+    m: int,
+    periods_per_year: float,
+) -> Dict[str, np.ndarray]:
+    """BAR_METRICS from the log growth, log drawdown and return sums of m resampled bar returns."""
+    growth = np.exp(log_growth)
+    years = m / periods_per_year
+    mean = s1 / m
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.sqrt(np.maximum(s2 - m * mean * mean, 0.0) / (m - 1)) if m > 1 else np.full(len(s1), np.nan)
+        ann = np.sqrt(periods_per_year)
+        sharpe = np.where(std > 0, mean / std * ann, np.nan)
+    return {
+        "total_return_pct": (growth - 1.0) * 100.0,
+        "cagr_pct": (np.power(growth, 1.0 / years) - 1.0) * 100.0,
+        "max_drawdown_pct": np.expm1(-drawdown) * 100.0,
+        "volatility_pct": std * ann * 100.0,
+        "sharpe": sharpe,
+    }
+
+
+def _trade_path_metrics(returns: np.ndarray, taken: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Metrics of closed-trade equity paths, one row of per-trade returns per resample."""
+    rows = returns.shape[0]
+    paths = np.ones((rows, returns.shape[1] + 1))
+    np.cumprod(1.0 + returns, axis=1, out=paths[:, 1:])
+    peak = np.maximum.accumulate(paths, axis=1)
+    trades = taken.sum(axis=1) if taken is not None else np.full(rows, returns.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trades > 0, (returns > 0).sum(axis=1) / trades * 100.0, 0.0)
+    return {
+        "total_return_pct": (paths[:, -1] - 1.0) * 100.0,
+        "max_drawdown_pct": (paths / peak - 1.0).min(axis=1) * 100.0,
+        "win_rate_pct": win_rate,
+    }
+
+
+def _trade_observed(returns: np.ndarray) -> Dict[str, float]:
+    return {k: float(v[0]) for k, v in _trade_path_metrics(returns[None, :]).items()}
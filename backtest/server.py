@@ -0,0 +1,432 @@
+import itertools
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from backtest.fetcher import MarketDataFetcher
+from backtest.indicators import IndicatorEngine
+from backtest.pnl import PnLCalculator
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from backtest.sweep import SweepConfig, SweepRunner
+
+JOB_TYPES = ("backtest", "sweep")
+_DATA_FIELDS = ("symbol", "interval", "start", "end")
+
+
+@dataclass
+class Job:
+    """A submitted backtest or sweep request and, once finished, its result or error."""
+    job_id: str
+    request: Dict
+    status: str = "queued"  # queued -> running -> done | failed
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    done_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def as_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "type": self.request.get("type"),
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class BacktestService:
+    """
+    In-process job queue for backtests and sweeps over warm data.
+
+    OHLCV frames are fetched once per (symbol, interval, start, end) and
+    kept in an LRU of `max_datasets` frames; all strategies request their
+    moving averages from one shared IndicatorEngine, so repeated jobs on
+    the same data skip both the download and the indicator computation.
+    Jobs run on a thread pool of `workers` threads (the numerical work
+    happens in NumPy / pandas, which release the GIL for most of it).
+    A sweep job evaluates its grid in the job's thread against the shared
+    indicator cache unless `sweep_workers` > 1, in which case the grid is
+    handed to a SweepRunner process pool (no indicator sharing there).
+
+    Job requests are plain dicts (JSON over HTTP, see BacktestServer):
+
+        {"type": "backtest", "symbol": "BTCUSDT", "interval": "1h",
+         "start": "2024-01-01", "end": "2024-06-01",
+         "fast_window": 10, "slow_window": 30,
+         "initial_cash": 10000, "risk_per_trade": 0.1}
+
+        {"type": "sweep", ...same data fields...,
+         "fast_windows": [5, 10, 20], "slow_windows": [30, 50, 100],
+         "risk_per_trade": [0.1, 0.2], "sort_by": "total_return_pct", "top": 10}
+    """
+
+    def __init__(
+        self,
+        fetcher: MarketDataFetcher,
+        workers: int = 4,
+        indicators: Optional[IndicatorEngine] = None,
+        max_datasets: int = 16,
+        max_jobs: int = 1000,
+        sweep_workers: int = 1,
+    ):
+        """
+        Parameters:
+            fetcher: source of OHLCV data (give it an OHLCVCache to persist across restarts)
+            workers: jobs executed concurrently
+            indicators: shared indicator cache (default: a new IndicatorEngine)
+            max_datasets: OHLCV frames kept in memory
+            max_jobs: finished jobs kept for lookup before the oldest are dropped
+            sweep_workers: processes per sweep job; 1 evaluates in the job thread
+        """
+        self.fetcher = fetcher
+        self.indicators = indicators or IndicatorEngine()
+        self.max_datasets = max_datasets
+        self.max_jobs = max_jobs
+        self.sweep_workers = sweep_workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backtest-job")
+        self._datasets: "OrderedDict[Tuple, Future]" = OrderedDict()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    # ------------------------------------------------------------------ jobs
+
+    def submit(self, request: Dict) -> Job:
+        """Validate `request` and queue it; raises ValueError for malformed requests."""
+        self._validate(request)
+        job = Job(job_id=uuid.uuid4().hex[:12], request=request)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim_jobs()
+        self._pool.submit(self._execute, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """The job after it finished (or after `timeout` seconds); None if unknown."""
+        job = self.get(job_id)
+        if job is not None:
+            job.done_event.wait(timeout)
+        return job
+
+    def run(self, request: Dict) -> Dict:
+        """Submit and wait; returns the result or raises RuntimeError with the job's error."""
+        job = self.wait(self.submit(request).job_id)
+        if job.status == "failed":
+            raise RuntimeError(job.error)
+        return job.result
+
+    def status(self) -> Dict:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            datasets = [
+                {"symbol": k[0], "interval": k[1], "start": k[2], "end": k[3],
+                 "bars": len(f.result()) if f.done() and f.exception() is None else None}
+                for k, f in self._datasets.items()
+            ]
+        return {"jobs": counts, "datasets": datasets, "indicators": self.indicators.stats.as_dict()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _execute(self, job: Job) -> None:
+        job.status, job.started = "running", time.time()
+        try:
+            df = self.dataset(*(job.request[k] for k in _DATA_FIELDS))
+            if job.request["type"] == "backtest":
+                job.result = self._backtest(df, job.request)
+            else:
+                job.result = self._sweep(df, job.request)
+            job.status = "done"
+        except Exception as e:
+            self.logger.exception(f"Job {job.job_id} failed")
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+        finally:
+            job.finished = time.time()
+            job.done_event.set()
+
+    # ------------------------------------------------------------------ data
+
+    def dataset(self, symbol: str, interval: str, start: str, end: str) -> pd.DataFrame:
+        """
+        OHLCV frame for the range, fetched on first use and kept warm.
+
+        Concurrent jobs asking for the same range wait for one fetch.
+        """
+        key = (symbol.upper(), interval, start, end)
+        with self._lock:
+            future = self._datasets.get(key)
+            owner = future is None
+            if owner:
+                future = self._datasets[key] = Future()
+                while len(self._datasets) > self.max_datasets:
+                    self._datasets.popitem(last=False)
+            else:
+                self._datasets.move_to_end(key)
+
+        if owner:
+            try:
+                df = self.fetcher.get_historical_ohlcv(symbol, interval, start, end)
+                if df.empty:
+                    raise ValueError(f"No OHLCV data for {symbol} {interval} {start} → {end}")
+                future.set_result(df)
+            except Exception as e:
+                with self._lock:
+                    if self._datasets.get(key) is future:
+                        del self._datasets[key]
+                future.set_exception(e)
+        return future.result()
+
+    # ------------------------------------------------------------- execution
+
+    def _backtest(self, df: pd.DataFrame, request: Dict) -> Dict:
+        summary = self._evaluate(
+            df,
+            int(request.get("fast_window", 10)),
+            int(request.get("slow_window", 30)),
+            float(request.get("initial_cash", 10000.0)),
+            float(request.get("risk_per_trade", 0.1)),
+            extended=bool(request.get("extended", True)),
+        )
+        return {"bars": len(df), **summary}
+
+    def _sweep(self, df: pd.DataFrame, request: Dict) -> Dict:
+        risks = request.get("risk_per_trade", [0.1])
+        grid = [
+            (int(fast), int(slow), float(risk))
+            for fast, slow, risk in itertools.product(
+                request.get("fast_windows", [5, 10, 20]),
+                request.get("slow_windows", [30, 50, 100]),
+                risks if isinstance(risks, list) else [risks],
+            )
+            if fast < slow
+        ]
+        initial_cash = float(request.get("initial_cash", 10000.0))
+        if self.sweep_workers > 1:
+            rows = self._sweep_processes(df, grid, initial_cash)
+        else:
+            rows = [
+                {
+                    "fast_window": fast,
+                    "slow_window": slow,
+                    "risk_per_trade": risk,
+                    **self._evaluate(df, fast, slow, initial_cash, risk),
+                }
+                for fast, slow, risk in grid
+            ]
+        sort_by = request.get("sort_by", "total_return_pct")
+        rows.sort(key=lambda row: _sort_key(row.get(sort_by)), reverse=True)
+        if request.get("top") is not None:
+            rows = rows[:int(request["top"])]
+        return {"bars": len(df), "configs": len(rows), "sort_by": sort_by, "rows": rows}
+
+    def _sweep_processes(self, df: pd.DataFrame, grid, initial_cash: float) -> List[Dict]:
+        configs = [
+            SweepConfig(
+                SimpleMovingAverageStrategy,
+                {"fast_window": fast, "slow_window": slow},
+                initial_cash=initial_cash,
+                risk_per_trade=risk,
+            )
+            for fast, slow, risk in grid
+        ]
+        described = set(configs[0].describe()) | {"config_id"} if configs else set()
+        return [
+            {
+                "fast_window": row["fast_window"],
+                "slow_window": row["slow_window"],
+                "risk_per_trade": row["risk_per_trade"],
+                **{key: _to_json(value) for key, value in row.items() if key not in described},
+            }
+            for row in sorted(SweepRunner(workers=self.sweep_workers).run(df, configs),
+                              key=lambda row: row["config_id"])
+        ]
+
+    def _evaluate(
+        self,
+        df: pd.DataFrame,
+        fast_window: int,
+        slow_window: int,
+        initial_cash: float,
+        risk_per_trade: float,
+        extended: bool = False,
+    ) -> Dict:
+        strategy = SimpleMovingAverageStrategy(fast_window, slow_window, indicators=self.indicators)
+        simulator = TradeSimulator(initial_cash=initial_cash, risk_per_trade=risk_per_trade)
+        trades, equity = simulator.run_vectorized(df["close"], strategy.generate_target_positions(df))
+        summary = PnLCalculator().summarize(trades, equity, extended=extended)
+        summary.pop("trades", None)
+        return {key: _to_json(value) for key, value in summary.items()}
+
+    def _validate(self, request: Dict) -> None:
+        if not isinstance(request, dict):
+            raise ValueError("job must be a JSON object")
+        if request.get("type") not in JOB_TYPES:
+            raise ValueError(f"job type must be one of {JOB_TYPES}")
+        missing = [k for k in _DATA_FIELDS if k not in request]
+        if missing:
+            raise ValueError(f"missing fields: {', '.join(missing)}")
+        if request["type"] == "backtest":
+            if int(request.get("fast_window", 10)) >= int(request.get("slow_window", 30)):
+                raise ValueError("fast_window must be < slow_window")
+
+    def _trim_jobs(self) -> None:
+        finished = [k for k, j in self._jobs.items() if j.done_event.is_set()]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+
+def _to_json(value):
+    """Plain Python numbers for JSON; NaN / inf become None."""
+    if isinstance(value, (np.integer, int)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+
+def _sort_key(value) -> float:
+    return -math.inf if value is None else value
+
+
+class _JobHandler(BaseHTTPRequestHandler):
+    server: "_JobHTTPServer"
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/jobs":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"null")
+            job = self.server.service.submit(request)
+        except (ValueError, TypeError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+
+        if isinstance(request, dict) and request.get("wait"):
+            job.done_event.wait()
+            self._reply(200, job.as_dict())
+        else:
+            self._reply(202, {"job_id": job.job_id, "status": job.status})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        service = self.server.service
+        if parsed.path == "/status":
+            self._reply(200, service.status())
+            return
+        if parsed.path.startswith("/jobs/"):
+            job_id = parsed.path[len("/jobs/"):]
+            timeout = parse_qs(parsed.query).get("wait", [None])[0]
+            try:
+                timeout = float(timeout) if timeout else None
+                if timeout is not None and not math.isfinite(timeout):
+                    raise ValueError
+            except ValueError:
+                self._reply(400, {"error": f"wait must be a number of seconds, got {timeout!r}"})
+                return
+            job = service.wait(job_id, timeout) if timeout is not None else service.get(job_id)
+            if job is None:
+                self._reply(404, {"error": f"unknown job {job_id}"})
+            else:
+                self._reply(200, job.as_dict())
+            return
+        self._reply(404, {"error": "not found"})
+
+    def _reply(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.server.service.logger.debug(format % args)
+
+
+class _JobHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: BacktestService
+
+
+class BacktestServer:
+    """
+    Local JSON-over-HTTP front end of a BacktestService.
+
+    Endpoints:
+        POST /jobs              queue a job; 202 {"job_id", "status"}, or with
+                                "wait": true in the body, 200 and the finished job
+        GET  /jobs/<id>         job status and result (?wait=SECONDS blocks until done)
+        GET  /status            job counts, warm datasets and indicator cache stats
+
+    Usage:
+        server = BacktestServer(BacktestService(MarketDataFetcher(cache=cache)), port=8765)
+        server.serve_forever()
+
+        with BacktestServer(service, port=0) as server:   # background thread, e.g. in tests
+            client = BacktestClient(server.url)
+    """
+
+    def __init__(self, service: BacktestService, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Parameters:
+            port: 0 picks a free port (see `url`)
+        """
+        self.service = service
+        self._httpd = _JobHTTPServer((host, port), _JobHandler)
+        self._httpd.service = service
+        self._thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self.logger.info(f"Serving backtests on {self.url}")
+        self._httpd.serve_forever()
+
+    def start(self) -> "BacktestServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self.service.shutdown(wait=False)
+
+    def __enter__(self) -> "BacktestServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
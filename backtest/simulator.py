@@ -1,9 +1,11 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from backtest.strategy import Signal
+from backtest.profiling import profiled
+from backtest.strategy import SIGNAL_BUY, SIGNAL_SELL, Signal
 
 
 @dataclass
@@ -15,62 +17,737 @@ class Trade:
     qty: float
 
 
+TRADE_FIELDS = ("entry_time", "exit_time", "entry_price", "exit_price", "qty")
+
+# TradeLog.exit_reason codes, indexes into EXIT_REASONS
+EXIT_SIGNAL, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TRAILING_STOP = range(4)
+EXIT_REASONS = ("signal", "stop_loss", "take_profit", "trailing_stop")
+
+# times are stored as int64: UTC nanoseconds for datetime indexes, raw values otherwise
+TRADE_DTYPE = np.dtype([
+    ("entry_time", np.int64),
+    ("exit_time", np.int64),
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("qty", np.float64),
+])
+
+
+class TradeView:
+    """Read-only row of a TradeLog with the same attributes as Trade."""
+
+    __slots__ = ("_log", "_i")
+
+    def __init__(self, log: "TradeLog", i: int):
+        self._log = log
+        self._i = i
+
+    @property
+    def entry_time(self) -> pd.Timestamp:
+        return self._log._time(self._log.records["entry_time"][self._i])
+
+    @property
+    def exit_time(self) -> pd.Timestamp:
+        return self._log._time(self._log.records["exit_time"][self._i])
+
+    @property
+    def entry_price(self) -> float:
+        return float(self._log.records["entry_price"][self._i])
+
+    @property
+    def exit_price(self) -> float:
+        return float(self._log.records["exit_price"][self._i])
+
+    @property
+    def qty(self) -> float:
+        return float(self._log.records["qty"][self._i])
+
+    @property
+    def pnl(self) -> float:
+        return (self.exit_price - self.entry_price) * self.qty
+
+    @property
+    def exit_reason(self) -> Optional[str]:
+        reasons = self._log.exit_reason
+        return None if reasons is None else EXIT_REASONS[reasons[self._i]]
+
+    def to_trade(self) -> Trade:
+        return Trade(**{f: getattr(self, f) for f in TRADE_FIELDS})
+
+    def __eq__(self, other) -> bool:
+        try:
+            return all(getattr(self, f) == getattr(other, f) for f in TRADE_FIELDS)
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in TRADE_FIELDS)
+        return f"TradeView({fields})"
+
+
+class TradeLog:
+    """
+    Closed trades stored column-wise in one NumPy record array (TRADE_DTYPE).
+
+    Behaves like a read-only sequence of trades: len(), iteration and
+    integer indexing yield TradeView rows with Trade's attributes, and a
+    TradeLog compares equal to a list of Trade objects with the same values.
+    Column access (entry_price, qty, pnl, entry_time, ...) returns arrays
+    without materializing any per-trade objects.
+
+    Engines with protective exits also fill `exit_reason`, an int8 array
+    of EXIT_REASONS codes; it is None for signal-only engines.
+    """
+
+    def __init__(
+        self,
+        records: np.ndarray,
+        index_kind: str = "datetime",
+        tz: Optional[str] = None,
+        exit_reason: Optional[np.ndarray] = None,
+    ):
+        """
+        Parameters:
+            records: structured array with TRADE_DTYPE
+            index_kind: "datetime" if the times are UTC nanoseconds, "int" otherwise
+            tz: timezone of the original datetime index, if any
+            exit_reason: optional int8 EXIT_REASONS code per trade
+        """
+        self.records = records
+        self.index_kind = index_kind
+        self.tz = tz
+        self.exit_reason = exit_reason
+
+    @classmethod
+    def from_arrays(
+        cls,
+        entry_time: pd.Index,
+        exit_time: pd.Index,
+        entry_price: np.ndarray,
+        exit_price: np.ndarray,
+        qty: np.ndarray,
+    ) -> "TradeLog":
+        records = np.empty(len(entry_price), dtype=TRADE_DTYPE)
+        entry_time, exit_time = pd.Index(entry_time), pd.Index(exit_time)
+        index_kind, tz = "int", None
+        if isinstance(entry_time, pd.DatetimeIndex) or len(entry_time) == 0:
+            index_kind = "datetime"
+            if isinstance(entry_time, pd.DatetimeIndex) and entry_time.tz is not None:
+                tz = str(entry_time.tz)
+        records["entry_time"] = _time_values(entry_time, index_kind)
+        records["exit_time"] = _time_values(exit_time, index_kind)
+        records["entry_price"] = entry_price
+        records["exit_price"] = exit_price
+        records["qty"] = qty
+        return cls(records, index_kind, tz)
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> "TradeLog":
+        trades = list(trades)
+        return cls.from_arrays(
+            pd.Index([t.entry_time for t in trades]),
+            pd.Index([t.exit_time for t in trades]),
+            np.array([t.entry_price for t in trades], dtype=np.float64),
+            np.array([t.exit_price for t in trades], dtype=np.float64),
+            np.array([t.qty for t in trades], dtype=np.float64),
+        )
+
+    @classmethod
+    def concat(cls, logs: Sequence["TradeLog"]) -> "TradeLog":
+        """Join logs that share the same time representation."""
+        if not logs:
+            return cls(np.empty(0, dtype=TRADE_DTYPE))
+        reasons = None
+        if all(log.exit_reason is not None for log in logs):
+            reasons = np.concatenate([log.exit_reason for log in logs])
+        records = np.concatenate([log.records for log in logs])
+        return cls(records, logs[0].index_kind, logs[0].tz, reasons)
+
+    @property
+    def entry_time(self) -> pd.Index:
+        return self._times(self.records["entry_time"])
+
+    @property
+    def exit_time(self) -> pd.Index:
+        return self._times(self.records["exit_time"])
+
+    @property
+    def entry_price(self) -> np.ndarray:
+        return self.records["entry_price"]
+
+    @property
+    def exit_price(self) -> np.ndarray:
+        return self.records["exit_price"]
+
+    @property
+    def qty(self) -> np.ndarray:
+        return self.records["qty"]
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return (self.exit_price - self.entry_price) * self.qty
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per trade with the Trade columns (and exit_reason if known)."""
+        frame = pd.DataFrame({
+            "entry_time": self.entry_time,
+            "exit_time": self.exit_time,
+            "entry_price": self.entry_price,
+            "exit_price": self.exit_price,
+            "qty": self.qty,
+        })
+        if self.exit_reason is not None:
+            frame["exit_reason"] = np.asarray(EXIT_REASONS, dtype=object)[self.exit_reason]
+        return frame
+
+    def to_list(self) -> List[Trade]:
+        return [row.to_trade() for row in self]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[TradeView]:
+        return (TradeView(self, i) for i in range(len(self.records)))
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[TradeView, "TradeLog"]:
+        if isinstance(item, slice):
+            reasons = None if self.exit_reason is None else self.exit_reason[item]
+            return TradeLog(self.records[item], self.index_kind, self.tz, reasons)
+        n = len(self.records)
+        if not -n <= item < n:
+            raise IndexError("trade index out of range")
+        return TradeView(self, item % n)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TradeLog):
+            return (
+                len(self) == len(other)
+                and all(self.entry_time == other.entry_time)
+                and all(self.exit_time == other.exit_time)
+                and all(np.array_equal(self.records[f], other.records[f]) for f in TRADE_FIELDS[2:])
+            )
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} trades)"
+
+    def _times(self, values: np.ndarray) -> pd.Index:
+        if self.index_kind != "datetime":
+            return pd.Index(values)
+        times = pd.DatetimeIndex(values.view("M8[ns]"))
+        if self.tz is not None:
+            times = times.tz_localize("UTC").tz_convert(self.tz)
+        return times
+
+    def _time(self, value: np.int64):
+        if self.index_kind != "datetime":
+            return value.item()
+        ts = pd.Timestamp(int(value))
+        if self.tz is not None:
+            ts = ts.tz_localize("UTC").tz_convert(self.tz)
+        return ts
+
+
+def _time_values(times: pd.Index, index_kind: str) -> np.ndarray:
+    if index_kind == "datetime":
+        if len(times) == 0:
+            return np.empty(0, dtype=np.int64)
+        return pd.DatetimeIndex(times).as_unit("ns").asi8
+    return np.asarray(times, dtype=np.int64)
+
+
+@dataclass
+class SimulatorState:
+    """
+    Everything needed to continue a simulation after the last processed bar.
+
+    - equity: realized equity (cash after all closed trades)
+    - position_qty / entry_price / entry_time: the open position, if any
+    - prev_target: target position of the last bar, used to detect transitions
+    """
+    equity: float
+    position_qty: float = 0.0
+    entry_price: Optional[float] = None
+    entry_time: Optional[pd.Timestamp] = None
+    prev_target: float = 0
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form; from_dict restores it exactly (floats round-trip via repr)."""
+        entry_time, tz = self.entry_time, None
+        if isinstance(entry_time, pd.Timestamp):
+            tz = str(entry_time.tz) if entry_time.tz is not None else None
+            entry_time = {"ns": int(entry_time.value), "tz": tz}
+        elif entry_time is not None:
+            entry_time = int(entry_time)
+        return {
+            "equity": float(self.equity),
+            "position_qty": float(self.position_qty),
+            "entry_price": None if self.entry_price is None else float(self.entry_price),
+            "entry_time": entry_time,
+            "prev_target": float(self.prev_target),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SimulatorState":
+        entry_time = data["entry_time"]
+        if isinstance(entry_time, dict):
+            ts = pd.Timestamp(entry_time["ns"])
+            entry_time = ts if entry_time["tz"] is None else ts.tz_localize("UTC").tz_convert(entry_time["tz"])
+        return cls(
+            equity=data["equity"],
+            position_qty=data["position_qty"],
+            entry_price=data["entry_price"],
+            entry_time=entry_time,
+            prev_target=data["prev_target"],
+        )
+
+
 class TradeSimulator:
     def __init__(self, initial_cash: float, risk_per_trade: float = 0.1):
         self.initial_cash = initial_cash
         self.risk_per_trade = risk_per_trade
 
+    @profiled("simulator.run", bars_arg="price_series")
     def run(
         self,
         price_series: pd.Series,
-        signals: List[Signal],
-    ) -> Tuple[List[Trade], pd.Series]:
+        signals: Union[List[Signal], pd.Series, np.ndarray],
+    ) -> Tuple[TradeLog, pd.Series]:
+        """
+        Reference bar-by-bar execution loop driven by discrete signals.
+
+        Kept as the readable specification of the fill model; run_vectorized
+        produces the same trades and equity curve from target positions.
+
+        signals is either a list of Signal objects or an int8 signal array
+        aligned to price_series (BaseStrategy.generate_signal_array).
+        """
+        index = price_series.index
+        sides = self._signal_sides(index, signals)
+
         equity = self.initial_cash
         position_qty = 0.0
         entry_price = None
-        entry_time = None
-
-        trades: List[Trade] = []
-        equity_curve = []
-
-        signal_idx = {s.timestamp: s for s in signals}
-
-        for ts, price in price_series.items():
-         
-            if ts in signal_idx:
-                sig = signal_idx[ts]
-                if sig.side == "BUY" and position_qty == 0:
-                    alloc = equity * self.risk_per_trade
-                    position_qty = alloc / price
-                    entry_price = price
-                    entry_time = ts
-                elif sig.side == "SELL" and position_qty > 0:
-                    exit_price = price
-                    pnl = (exit_price - entry_price) * position_qty
-                    equity += pnl
-                    trades.append(
-                        Trade(
-                            entry_time=entry_time,
-                            exit_time=ts,
-                            entry_price=entry_price,
-                            exit_price=exit_price,
-                            qty=position_qty,
-                        )
-                    )
-                    position_qty = 0.0
-                    entry_price = None
-                    entry_time = None
+        entry_bar = None
+
+        trade_bars: List[Tuple[int, int]] = []
+        trade_values: List[Tuple[float, float, float]] = []
+        equity_curve = np.empty(len(price_series))
+
+        for i, (price, side) in enumerate(zip(price_series.tolist(), sides.tolist())):
+
+            if side == SIGNAL_BUY and position_qty == 0:
+                alloc = equity * self.risk_per_trade
+                position_qty = alloc / price
+                entry_price = price
+                entry_bar = i
+            elif side == SIGNAL_SELL and position_qty > 0:
+                exit_price = price
+                pnl = (exit_price - entry_price) * position_qty
+                equity += pnl
+                trade_bars.append((entry_bar, i))
+                trade_values.append((entry_price, exit_price, position_qty))
+                position_qty = 0.0
+                entry_price = None
+                entry_bar = None
 
             if position_qty > 0:
                 current_equity = equity + (price - entry_price) * position_qty
             else:
                 current_equity = equity
 
-            equity_curve.append((ts, current_equity))
+            equity_curve[i] = current_equity
+
+        bars = np.array(trade_bars, dtype=np.int64).reshape(-1, 2)
+        values = np.array(trade_values, dtype=np.float64).reshape(-1, 3)
+        trades = TradeLog.from_arrays(
+            index[bars[:, 0]], index[bars[:, 1]], values[:, 0], values[:, 1], values[:, 2]
+        )
+        return trades, pd.Series(equity_curve, index=index)
+
+    @staticmethod
+    def _signal_sides(
+        price_index: pd.Index,
+        signals: Union[List[Signal], pd.Series, np.ndarray],
+    ) -> np.ndarray:
+        """Per-bar SIGNAL_BUY / SIGNAL_SELL / 0 codes aligned to price_index."""
+        if isinstance(signals, pd.Series):
+            return signals.reindex(price_index, fill_value=0).to_numpy(dtype=np.int8)
+        if isinstance(signals, np.ndarray):
+            if len(signals) != len(price_index):
+                raise ValueError("signal array must be aligned to the price series")
+            return signals.astype(np.int8, copy=False)
+
+        sides = np.zeros(len(price_index), dtype=np.int8)
+        if signals:
+            bars = price_index.get_indexer([s.timestamp for s in signals])
+            codes = np.array([SIGNAL_BUY if s.side == "BUY" else SIGNAL_SELL for s in signals], np.int8)
+            # later signals for the same bar win, as in a timestamp -> signal dict
+            sides[bars[bars >= 0]] = codes[bars >= 0]
+        return sides
+
+    @profiled("simulator.run_vectorized", bars_arg="price_series")
+    def run_vectorized(
+        self,
+        price_series: pd.Series,
+        target_positions: pd.Series,
+    ) -> Tuple[TradeLog, pd.Series]:
+        """
+        Array-based execution engine driven by BaseStrategy.generate_target_positions.
+
+        Entries are 0 -> 1 transitions and exits 1 -> 0 transitions of the
+        target (exactly the BUY / SELL signals generate_signals would emit),
+        filled at the close of that bar. Sizing compounds like run: each entry
+        allocates risk_per_trade of the realized equity at that time.
+
+        Only the compounding recurrence is evaluated per trade, in the same
+        operation order as run, so trades and equity match the loop exactly;
+        everything per bar is done with NumPy.
+        """
+        n = len(price_series)
+        if n == 0:
+            return TradeLog.from_trades([]), pd.Series([], index=price_series.index, dtype=float)
+
+        prices = price_series.to_numpy(dtype=np.float64)
+        entries, exits = self._entry_exit_bars(price_series.index, target_positions)
+        return self._assemble(price_series.index, prices, entries, exits, prices[exits])
+
+    @profiled("simulator.run_with_stops", bars_arg="ohlc")
+    def run_with_stops(
+        self,
+        ohlc: pd.DataFrame,
+        target_positions: pd.Series,
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+        trailing_stop: Optional[float] = None,
+    ) -> Tuple[TradeLog, pd.Series]:
+        """
+        run_vectorized plus protective exits triggered by each bar's high / low.
+
+        Parameters:
+            ohlc: bars with 'close', 'high' and 'low' (and optionally 'open')
+            stop_loss: exit when low <= entry * (1 - stop_loss)
+            take_profit: exit when high >= entry * (1 + take_profit)
+            trailing_stop: exit when low <= highest price since entry * (1 - trailing_stop);
+                the highest price is the entry close and the highs of earlier
+                bars, since the order of high and low within a bar is unknown
+
+        Stops are checked from the bar after the entry up to and including
+        the strategy's exit bar. A stop fills at its level, or at the open
+        if the bar gaps through it; if a stop and the target are touched on
+        the same bar the stop is assumed to come first. After a protective
+        exit the position stays flat until the strategy's next entry.
+        The trade log's exit_reason says which rule closed each trade.
+
+        Only open trades are visited in Python; the search for the first
+        touching bar within a trade and the equity curve are array
+        operations.
+        """
+        n = len(ohlc)
+        if n == 0:
+            return TradeLog.from_trades([]), pd.Series([], index=ohlc.index, dtype=float)
+
+        prices = ohlc["close"].to_numpy(dtype=np.float64)
+        high = ohlc["high"].to_numpy(dtype=np.float64)
+        low = ohlc["low"].to_numpy(dtype=np.float64)
+        open_ = ohlc["open"].to_numpy(dtype=np.float64) if "open" in ohlc else None
+        entries, exits = self._entry_exit_bars(ohlc.index, target_positions)
+
+        exit_bars, exit_px, reasons = [], [], []
+        for k, entry in enumerate(entries):
+            signal_exit = exits[k] if k < len(exits) else None
+            last = signal_exit if signal_exit is not None else n - 1
+            hit = self._first_stop(
+                prices[entry], high[entry + 1:last + 1], low[entry + 1:last + 1],
+                None if open_ is None else open_[entry + 1:last + 1],
+                stop_loss, take_profit, trailing_stop,
+            )
+            if hit is not None:
+                offset, price, reason = hit
+                exit_bars.append(entry + 1 + offset)
+                exit_px.append(price)
+                reasons.append(reason)
+            elif signal_exit is not None:
+                exit_bars.append(signal_exit)
+                exit_px.append(prices[signal_exit])
+                reasons.append(EXIT_SIGNAL)
+
+        exits = np.array(exit_bars, dtype=np.int64)
+        trades, equity = self._assemble(
+            ohlc.index, prices, entries, exits, np.array(exit_px, dtype=np.float64)
+        )
+        trades.exit_reason = np.array(reasons, dtype=np.int8)
+        return trades, equity
+
+    @staticmethod
+    def _first_stop(
+        entry_price: float,
+        high: np.ndarray,
+        low: np.ndarray,
+        open_: Optional[np.ndarray],
+        stop_loss: Optional[float],
+        take_profit: Optional[float],
+        trailing_stop: Optional[float],
+    ) -> Optional[Tuple[int, float, int]]:
+        """(bar offset, fill price, reason) of the first protective exit, or None."""
+        if len(low) == 0:
+            return None
+
+        stop_level = None
+        stop_reason = np.full(len(low), EXIT_STOP_LOSS, dtype=np.int8)
+        if stop_loss is not None:
+            stop_level = np.full(len(low), entry_price * (1.0 - stop_loss))
+        if trailing_stop is not None:
+            peak = np.empty(len(high))
+            peak[0] = entry_price
+            np.maximum(np.maximum.accumulate(high[:-1]), entry_price, out=peak[1:])
+            trail = peak * (1.0 - trailing_stop)
+            if stop_level is None:
+                stop_level = trail
+                stop_reason[:] = EXIT_TRAILING_STOP
+            else:
+                stop_reason[trail > stop_level] = EXIT_TRAILING_STOP
+                stop_level = np.maximum(stop_level, trail)
+
+        first_stop = first_target = len(low)
+        if stop_level is not None:
+            touched = low <= stop_level
+            if touched.any():
+                first_stop = int(np.argmax(touched))
+        if take_profit is not None:
+            target = entry_price * (1.0 + take_profit)
+            touched = high >= target
+            if touched.any():
+                first_target = int(np.argmax(touched))
+
+        if first_stop <= first_target and first_stop < len(low):
+            level = stop_level[first_stop]
+            price = level if open_ is None else min(level, open_[first_stop])
+            return first_stop, float(price), int(stop_reason[first_stop])
+        if first_target < len(low):
+            price = target if open_ is None else max(target, open_[first_target])
+            return first_target, float(price), EXIT_TAKE_PROFIT
+        return None
+
+    @profiled("simulator.run_chunk", bars_arg="prices")
+    def run_chunk(
+        self,
+        index: pd.Index,
+        prices: np.ndarray,
+        target: np.ndarray,
+        state: SimulatorState,
+    ) -> Tuple[TradeLog, np.ndarray]:
+        """
+        run_vectorized over one block of bars, continuing from `state`.
+
+        Returns the trades closed in this block and the block's equity
+        values, and advances `state` (realized equity, open position, last
+        target) to the end of the block. Running consecutive blocks through
+        the same state yields exactly the trades and equity of one
+        run_vectorized call over all bars, including positions that stay
+        open across block boundaries.
+        """
+        target = np.asarray(target)
+        carried = state.position_qty > 0
+        buy, sell = self._transitions(target, state.prev_target)
+        entries, exits = self._executed(buy, sell, long=carried)
+        entry_px, qty, realized, curve = self._settle(
+            prices, entries, exits, prices[exits], state.equity,
+            state.entry_price if carried else None, state.position_qty,
+        )
+
+        entry_times = index[entries]
+        if carried:
+            entry_times = pd.Index([state.entry_time]).append(entry_times)
+        m = len(exits)
+        trades = TradeLog.from_arrays(entry_times[:m], index[exits], entry_px[:m], prices[exits], qty[:m])
 
-        equity_series = pd.Series(
-            [e for _, e in equity_curve],
-            index=[ts for ts, _ in equity_curve],
+        state.equity = realized[-1]
+        if len(entry_px) > m:
+            state.position_qty = qty[-1]
+            state.entry_price = entry_px[-1]
+            state.entry_time = entry_times[-1]
+        else:
+            state.position_qty, state.entry_price, state.entry_time = 0.0, None, None
+        if len(target):
+            last = target[-1]
+            state.prev_target = 0 if last != last else last
+        return trades, curve
+
+    def _assemble(
+        self,
+        index: pd.Index,
+        prices: np.ndarray,
+        entries: np.ndarray,
+        exits: np.ndarray,
+        exit_px: np.ndarray,
+    ) -> Tuple[TradeLog, pd.Series]:
+        """
+        Trades and mark-to-market equity from entry bars, exit bars and exit fills.
+
+        Entries and exits alternate (exits[k] closes entries[k]); a trailing
+        entry without exit is still open at the last bar.
+        """
+        entry_px, qty, _, curve = self._settle(prices, entries, exits, exit_px, self.initial_cash)
+        m = len(exits)
+        trades = TradeLog.from_arrays(
+            index[entries[:m]], index[exits], entry_px[:m], exit_px, qty[:m]
         )
+        return trades, pd.Series(curve, index=index)
+
+    def _settle(
+        self,
+        prices: np.ndarray,
+        entries: np.ndarray,
+        exits: np.ndarray,
+        exit_px: np.ndarray,
+        equity: float,
+        open_price: Optional[float] = None,
+        open_qty: float = 0.0,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Entry prices, sizes, realized equity after each exit and per-bar equity.
+
+        A position opened before these bars (open_price / open_qty) is
+        trade 0 and is closed by exits[0].
+        """
+        n = len(prices)
+        carried = open_price is not None
+
+        # per-trade compounding: realized[k] is the equity after k closed trades
+        entry_px = prices[entries]
+        if carried:
+            entry_px = np.concatenate([[open_price], entry_px])
+        qty = np.empty(len(entry_px))
+        realized = np.empty(len(exits) + 1)
+        realized[0] = equity
+        for k in range(len(entry_px)):
+            if carried and k == 0:
+                qty[k] = open_qty
+            else:
+                alloc = equity * self.risk_per_trade
+                qty[k] = alloc / entry_px[k]
+            if k < len(exits):
+                equity += (exit_px[k] - entry_px[k]) * qty[k]
+                realized[k + 1] = equity
+
+        # per-bar mark-to-market
+        opened = np.cumsum(np.bincount(entries, minlength=n)) + int(carried)
+        closed = np.cumsum(np.bincount(exits, minlength=n))
+        curve = realized[closed]
+        in_pos = opened > closed
+        k = opened[in_pos] - 1
+        curve[in_pos] = realized[k] + (prices[in_pos] - entry_px[k]) * qty[k]
+        return entry_px, qty, realized, curve
+
+    @staticmethod
+    def _entry_exit_bars(
+        price_index: pd.Index,
+        target_positions: pd.Series,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bar positions (into price_index) of executed entries and exits.
+
+        BUY / SELL candidates follow BaseStrategy.generate_signals; a BUY while
+        already long or a SELL while flat is ignored, like in run.
+        """
+        buy, sell = TradeSimulator._transitions(target_positions.to_numpy())
+
+        if not target_positions.index.equals(price_index):
+            buy = price_index.get_indexer(target_positions.index[buy])
+            sell = price_index.get_indexer(target_positions.index[sell])
+            buy = buy[buy >= 0]
+            sell = sell[sell >= 0]
+
+        return TradeSimulator._executed(buy, sell)
+
+    @staticmethod
+    def _transitions(target: np.ndarray, prev_target: float = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """Bars where the target goes 0 -> 1 (BUY candidates) and 1 -> 0 (SELL candidates)."""
+        # same as positions.shift(1).fillna(prev_target)
+        prev = np.concatenate([np.full(1, prev_target, dtype=target.dtype), target[:-1]])
+        if prev.dtype.kind == "f":
+            prev = np.nan_to_num(prev, nan=0.0)
+
+        buy = np.flatnonzero((target == 1) & (prev == 0))
+        sell = np.flatnonzero((target == 0) & (prev == 1))
+        return buy, sell
+
+    @staticmethod
+    def _executed(
+        buy: np.ndarray,
+        sell: np.ndarray,
+        long: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Entry and exit bars that flip the position, starting flat (or long)."""
+        bars = np.concatenate([buy, sell])
+        side = np.concatenate([np.ones(len(buy), np.int8), -np.ones(len(sell), np.int8)])
+        order = np.argsort(bars, kind="stable")
+        bars, side = bars[order], side[order]
+
+        # state machine in array form: keep an event only if it flips the state
+        prev_side = np.empty_like(side)
+        if len(side):
+            prev_side[0] = 1 if long else -1
+            prev_side[1:] = side[:-1]
+        keep = side != prev_side
+        bars, side = bars[keep], side[keep]
+        return bars[side == 1], bars[side == -1]
+
+
+class StreamingTradeSimulator(TradeSimulator):
+    """
+    Incremental TradeSimulator: feed one bar at a time with on_bar.
+
+    Uses the same fill model and the same floating-point operations as
+    TradeSimulator.run, so the per-bar equity values and closed trades are
+    identical to a batch run over the same bars.
+    """
+
+    def __init__(self, initial_cash: float, risk_per_trade: float = 0.1):
+        super().__init__(initial_cash, risk_per_trade)
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = SimulatorState(equity=self.initial_cash)
+        self.trades: List[Trade] = []
+
+    def on_bar(self, timestamp: pd.Timestamp, price: float, target_position: float) -> float:
+        """
+        Apply this bar's target position and return the marked-to-market equity.
+
+        A 0 -> 1 transition of the target opens a position at `price`, a
+        1 -> 0 transition closes it (appending to self.trades).
+        """
+        state = self.state
+        prev = state.prev_target
+        if target_position == 1 and prev == 0 and state.position_qty == 0:
+            alloc = state.equity * self.risk_per_trade
+            state.position_qty = alloc / price
+            state.entry_price = price
+            state.entry_time = timestamp
+        elif target_position == 0 and prev == 1 and state.position_qty > 0:
+            pnl = (price - state.entry_price) * state.position_qty
+            state.equity += pnl
+            self.trades.append(
+                Trade(
+                    entry_time=state.entry_time,
+                    exit_time=timestamp,
+                    entry_price=state.entry_price,
+                    exit_price=price,
+                    qty=state.position_qty,
+                )
+            )
+            state.position_qty = 0.0
+            state.entry_price = None
+            state.entry_time = None
+
+        # NaN targets count as flat for the next transition, like shift().fillna(0)
+        state.prev_target = 0 if target_position != target_position else target_position
 
-        return trades, equity_series
+        if state.position_qty > 0:
+            return state.equity + (price - state.entry_price) * state.position_qty
+        return state.equity
@@ -0,0 +1,314 @@
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+import backtest
+from backtest.indicators import fingerprint
+
+# modules whose source decides what a stored result means
+_VERSIONED_MODULES = ("strategy", "simulator", "pnl", "indicators", "sweep")
+
+# summary fields stored as real columns, so they can be filtered and sorted on
+INDEXED_METRICS = ("total_return_pct", "max_drawdown_pct", "num_trades", "win_rate_pct", "end_equity")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data_fp TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    params TEXT NOT NULL,
+    initial_cash REAL NOT NULL,
+    risk_per_trade REAL NOT NULL,
+    code_version TEXT NOT NULL,
+    strategy_version TEXT,
+    created REAL NOT NULL,
+    {", ".join(f"{name} REAL" for name in INDEXED_METRICS)},
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_return ON results (data_fp, code_version, total_return_pct);
+CREATE INDEX IF NOT EXISTS results_drawdown ON results (data_fp, code_version, max_drawdown_pct);
+CREATE INDEX IF NOT EXISTS results_config ON results (data_fp, strategy, params);
+CREATE TABLE IF NOT EXISTS equity (
+    key TEXT PRIMARY KEY REFERENCES results (key),
+    curve BLOB NOT NULL
+);
+"""
+
+
+def code_version() -> str:
+    """
+    Package version plus a digest of the modules that compute results.
+
+    Any edit to the strategy, simulator, PnL, indicator or sweep code
+    changes it, so results computed by older code are never reused by
+    mistake. Strategy classes defined elsewhere are covered per class by
+    strategy_version().
+    """
+    h = hashlib.blake2b(digest_size=8)
+    package_dir = Path(backtest.__file__).parent
+    for name in _VERSIONED_MODULES:
+        h.update((package_dir / f"{name}.py").read_bytes())
+    return f"{backtest.__version__}+{h.hexdigest()}"
+
+
+@functools.lru_cache(maxsize=None)
+def strategy_version(strategy_cls) -> str:
+    """
+    Digest of the source of the modules defining strategy_cls and its bases.
+
+    Catches edits to strategies outside the package (user code,
+    backtest.expr). A class whose module has no source file, e.g. one
+    defined in a notebook, contributes its own source if inspect can
+    find it and only its name otherwise.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    seen = set()
+    for cls in strategy_cls.__mro__:
+        module = inspect.getmodule(cls)
+        if module is None or module.__name__ == "builtins" or module.__name__ in seen:
+            continue
+        seen.add(module.__name__)
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            try:
+                source = inspect.getsource(cls)
+            except (OSError, TypeError):
+                source = _strategy_name(cls)
+        h.update(source.encode())
+    return h.hexdigest()
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Digest of a frame's index, column names and values."""
+    h = hashlib.blake2b(digest_size=16)
+    index = df.index
+    h.update(fingerprint(index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()).encode())
+    for name in df.columns:
+        h.update(str(name).encode())
+        h.update(fingerprint(df[name].to_numpy()).encode())
+    return h.hexdigest()
+
+
+def config_key(data_fp: str, config, version: str, extended: bool = False) -> str:
+    """
+    Store key of one SweepConfig evaluated on data `data_fp` by code `version`.
+
+    extended=True marks summaries that include the PnLCalculator.metrics fields.
+    """
+    payload = {
+        "data": data_fp,
+        "strategy": _strategy_name(config.strategy_cls),
+        "params": config.strategy_params,
+        "initial_cash": float(config.initial_cash),
+        "risk_per_trade": float(config.risk_per_trade),
+        "code": version,
+        "strategy_code": strategy_version(config.strategy_cls),
+    }
+    if extended:
+        payload["extended"] = True
+    blob = json.dumps(payload, sort_keys=True, default=_json_default).encode()
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+class ResultStore:
+    """
+    SQLite store of sweep results keyed by (data, strategy, params, simulator settings, code version).
+
+    Each row holds the PnLCalculator summary of one configuration (the
+    headline metrics as indexed columns, everything as JSON) and optionally
+    its equity curve. SweepRunner(store=...) looks up every configuration
+    first and only evaluates the missing ones, committing after each
+    finished chunk, so an interrupted sweep resumes where it stopped.
+    Storing a configuration again after its strategy's source changed
+    replaces the results computed by the old source.
+
+    Usage:
+        with ResultStore("runs/sweeps.sqlite") as store:
+            rows = list(SweepRunner(store=store).run(df, configs))
+            best = store.top(10, data_fp=data_fingerprint(df), max_drawdown=20)
+    """
+
+    def __init__(self, path: str, version: Optional[str] = None):
+        """
+        Parameters:
+            path: SQLite file (created if missing)
+            version: code version mixed into every key (default: code_version())
+        """
+        self.path = path
+        self.version = version or code_version()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        if "strategy_version" not in columns:
+            # files written before strategy sources were versioned
+            self._conn.execute("ALTER TABLE results ADD COLUMN strategy_version TEXT")
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def key(self, data_fp: str, config, extended: bool = False) -> str:
+        return config_key(data_fp, config, self.version, extended)
+
+    def existing(self, keys: Iterable[str]) -> Set[str]:
+        """The subset of `keys` already stored."""
+        keys = list(keys)
+        found: Set[str] = set()
+        with self._lock:
+            for lo in range(0, len(keys), 500):
+                batch = keys[lo:lo + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT key FROM results WHERE key IN ({marks})", batch)
+                found.update(row[0] for row in rows)
+        return found
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Stored summary of `key`, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, entries: List[Dict]) -> None:
+        """
+        Store results in one transaction.
+
+        Each entry has key, data_fp, config (SweepConfig), summary and
+        optionally equity (array of the curve values).
+        """
+        now = time.time()
+        rows, curves = [], []
+        for entry in entries:
+            config, summary = entry["config"], _jsonable(entry["summary"])
+            rows.append((
+                entry["key"], entry["data_fp"], _strategy_name(config.strategy_cls),
+                json.dumps(config.strategy_params, sort_keys=True, default=_json_default),
+                float(config.initial_cash), float(config.risk_per_trade), self.version,
+                strategy_version(config.strategy_cls), now,
+                *(summary.get(name) for name in INDEXED_METRICS),
+                json.dumps(summary),
+            ))
+            if entry.get("equity") is not None:
+                curve = np.ascontiguousarray(entry["equity"], dtype=np.float64)
+                curves.append((entry["key"], curve.tobytes()))
+
+        names = (
+            "key", "data_fp", "strategy", "params", "initial_cash", "risk_per_trade",
+            "code_version", "strategy_version", "created", *INDEXED_METRICS, "summary",
+        )
+        superseded = [row[1:8] for row in rows]
+        with self._lock, self._conn:
+            # drop results of the same configuration computed by an older strategy source
+            self._conn.executemany(
+                "DELETE FROM equity WHERE key IN (SELECT key FROM results WHERE data_fp = ? AND strategy = ? "
+                "AND params = ? AND initial_cash = ? AND risk_per_trade = ? AND code_version = ? "
+                "AND strategy_version IS NOT ?)",
+                superseded,
+            )
+            self._conn.executemany(
+                "DELETE FROM results WHERE data_fp = ? AND strategy = ? AND params = ? AND initial_cash = ? "
+                "AND risk_per_trade = ? AND code_version = ? AND strategy_version IS NOT ?",
+                superseded,
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(names)}) VALUES ({','.join('?' * len(names))})",
+                rows,
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO equity VALUES (?, ?)", curves)
+
+    def equity(self, key: str) -> Optional[np.ndarray]:
+        """Stored equity curve values of `key` (aligned with the swept frame's index), or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT curve FROM equity WHERE key = ?", (key,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.float64) if row else None
+
+    def top(
+        self,
+        n: int = 10,
+        by: str = "total_return_pct",
+        data_fp: Optional[str] = None,
+        max_drawdown: Optional[float] = None,
+        min_trades: Optional[int] = None,
+        ascending: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Best `n` results by an indexed metric.
+
+        Parameters:
+            data_fp: only results on this data (see data_fingerprint)
+            max_drawdown: only results whose drawdown is at most this many
+                percent (max_drawdown=20 keeps max_drawdown_pct >= -20)
+            min_trades: only results with at least this many trades
+
+        Only results of the current code version are returned.
+        """
+        if by not in INDEXED_METRICS:
+            raise ValueError(f"by must be one of {INDEXED_METRICS}")
+        where, args = ["code_version = ?"], [self.version]
+        if data_fp is not None:
+            where.append("data_fp = ?")
+            args.append(data_fp)
+        if max_drawdown is not None:
+            where.append("max_drawdown_pct >= ?")
+            args.append(-abs(max_drawdown))
+        if min_trades is not None:
+            where.append("num_trades >= ?")
+            args.append(min_trades)
+
+        query = (
+            f"SELECT key, strategy, params, initial_cash, risk_per_trade, "
+            f"{', '.join(INDEXED_METRICS)} FROM results WHERE {' AND '.join(where)} "
+            f"ORDER BY {by} {'ASC' if ascending else 'DESC'} LIMIT ?"
+        )
+        with self._lock:
+            table = pd.read_sql_query(query, self._conn, params=(*args, n))
+        params = pd.DataFrame([json.loads(p) for p in table.pop("params")], index=table.index)
+        return pd.concat([table.iloc[:, :2], params, table.iloc[:, 2:]], axis=1)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _strategy_name(cls) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _json_default(value):
+    # numpy scalars hash like the equivalent Python numbers
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _jsonable(summary: Dict) -> Dict:
+    """Summary without the trade list, as plain JSON numbers (NaN / inf as None)."""
+    out = {}
+    for key, value in summary.items():
+        if key == "trades":
+            continue
+        if isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            value = None
+        out[key] = value
+    return out
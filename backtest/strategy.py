@@ -1,9 +1,19 @@
+import inspect
+import math
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Mapping, Optional
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pandas as pd
 
+from backtest.indicators import IndicatorEngine, sma
+from backtest.profiling import profiled
+
+# codes of the int8 signal array returned by BaseStrategy.generate_signal_array
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
 
 @dataclass
 class Signal:
@@ -11,14 +21,194 @@ class Signal:
     side: str  # "BUY" or "SELL"
 
 
+class RollingMean:
+    """
+    O(1)-per-update rolling mean over the last `window` values.
+
+    Values live in a fixed-size ring buffer and the window sum is updated
+    with the same Kahan-compensated add/remove steps pandas uses, so the
+    stream of results is bit-for-bit equal to Series.rolling(window).mean()
+    (NaN until the window is full, NaN inputs skipped).
+    """
+
+    __slots__ = (
+        "window", "_buf", "_pos", "_count", "_sum", "_comp_add", "_comp_remove",
+        "_nobs", "_neg_ct", "_same_ct", "_prev",
+    )
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._buf = [math.nan] * window
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._nobs = 0
+        self._neg_ct = 0
+        self._same_ct = 0
+        self._prev = math.nan
+
+    def update(self, value: float) -> float:
+        """Push one value and return the mean of the current window."""
+        if self._count >= self.window:
+            self._remove(self._buf[self._pos])
+        elif self._count == 0:
+            self._prev = value
+        self._buf[self._pos] = value
+        self._pos = (self._pos + 1) % self.window
+        self._count += 1
+        self._add(value)
+        return self.value
+
+    def update_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        update() every value in order and return all the means.
+
+        The same recurrence as update, with the state held in local
+        variables for the length of the block; several times faster than
+        calling update per value.
+        """
+        window = self.window
+        buf, pos, count = self._buf, self._pos, self._count
+        total, comp_add, comp_remove = self._sum, self._comp_add, self._comp_remove
+        nobs, neg_ct, same_ct, prev = self._nobs, self._neg_ct, self._same_ct, self._prev
+        copysign, nan = math.copysign, math.nan
+
+        out = []
+        append = out.append
+        for value in np.asarray(values, dtype=np.float64).tolist():
+            if count >= window:
+                old = buf[pos]
+                if old == old:
+                    nobs -= 1
+                    y = -old - comp_remove
+                    t = total + y
+                    comp_remove = t - total - y
+                    total = t
+                    if copysign(1.0, old) < 0:
+                        neg_ct -= 1
+            elif count == 0:
+                prev = value
+            buf[pos] = value
+            pos += 1
+            if pos == window:
+                pos = 0
+            count += 1
+
+            if value == value:
+                nobs += 1
+                y = value - comp_add
+                t = total + y
+                comp_add = t - total - y
+                total = t
+                if copysign(1.0, value) < 0:
+                    neg_ct += 1
+                if value == prev:
+                    same_ct += 1
+                else:
+                    same_ct = 1
+                prev = value
+
+            if nobs < window or nobs == 0:
+                append(nan)
+                continue
+            result = total / nobs
+            if same_ct >= nobs:
+                result = prev
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            append(result)
+
+        self._pos, self._count = pos, count
+        self._sum, self._comp_add, self._comp_remove = total, comp_add, comp_remove
+        self._nobs, self._neg_ct, self._same_ct, self._prev = nobs, neg_ct, same_ct, prev
+        return np.array(out, dtype=np.float64)
+
+    def get_state(self) -> Dict:
+        """Plain-Python snapshot (ring buffer and compensated sums) that set_state restores exactly."""
+        return {name: (list(getattr(self, name)) if name == "_buf" else getattr(self, name))
+                for name in self.__slots__}
+
+    def set_state(self, state: Dict) -> None:
+        if state["window"] != self.window:
+            raise ValueError(f"state is for window {state['window']}, not {self.window}")
+        for name in self.__slots__:
+            setattr(self, name, list(state[name]) if name == "_buf" else state[name])
+
+    @property
+    def value(self) -> float:
+        if self._nobs < self.window or self._nobs == 0:
+            return math.nan
+        result = self._sum / self._nobs
+        if self._same_ct >= self._nobs:
+            return self._prev
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == self._nobs and result > 0:
+            return 0.0
+        return result
+
+    def _add(self, value: float) -> None:
+        if value != value:
+            return
+        self._nobs += 1
+        y = value - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct += 1
+        if value == self._prev:
+            self._same_ct += 1
+        else:
+            self._same_ct = 1
+        self._prev = value
+
+    def _remove(self, value: float) -> None:
+        if value != value:
+            return
+        self._nobs -= 1
+        y = -value - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct -= 1
+
+
+def _data_arg(func) -> Optional[str]:
+    """Name of the parameter after self, the frame a strategy method receives."""
+    try:
+        params = list(inspect.signature(func).parameters.values())[1:2]
+    except (TypeError, ValueError):
+        return None
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    return params[0].name if params and params[0].kind in positional else None
+
+
 class BaseStrategy(ABC):
     """
     Vectorized strategy base:
     - input: price DataFrame (with at least 'close')
     - core output: target_position Series indexed like df.index (e.g. -1, 0, +1)
     - optional: discrete entry/exit signals derived from position changes
+    - optional: streaming on_bar interface for bar-by-bar feeds
+
+    Every subclass's generate_target_positions is recorded as the
+    "strategy.positions" stage while a backtest.profiling.Profiler is active.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "generate_target_positions" in cls.__dict__:
+            func = cls.generate_target_positions
+            cls.generate_target_positions = profiled("strategy.positions", bars_arg=_data_arg(func))(func)
+
     @abstractmethod
     def generate_target_positions(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -27,11 +217,13 @@ class BaseStrategy(ABC):
         """
         raise NotImplementedError
 
-    def generate_signals(self, df: pd.DataFrame) -> List[Signal]:
+    @profiled("strategy.signals", bars_arg="df")
+    def generate_signal_array(self, df: pd.DataFrame) -> pd.Series:
         """
         Generic implementation:
         - Compute target positions
-        - Turn position changes into BUY/SELL signals
+        - Turn position changes into an int8 Series aligned to df.index:
+          SIGNAL_BUY (1) on 0 -> 1, SIGNAL_SELL (-1) on 1 -> 0, 0 elsewhere
         """
         positions = self.generate_target_positions(df)
 
@@ -40,23 +232,106 @@ class BaseStrategy(ABC):
         buy_mask = (positions == 1) & (prev_positions == 0)
         sell_mask = (positions == 0) & (prev_positions == 1)
 
-        signals: List[Signal] = []
+        codes = np.zeros(len(positions), dtype=np.int8)
+        codes[buy_mask.to_numpy()] = SIGNAL_BUY
+        codes[sell_mask.to_numpy()] = SIGNAL_SELL
+        return pd.Series(codes, index=positions.index, name="signal")
+
+    def generate_signals(self, df: pd.DataFrame) -> List[Signal]:
+        """
+        BUY/SELL signals as Signal objects, in chronological order.
+
+        Compatibility view of generate_signal_array; prefer the array in
+        sweeps, as it avoids one object per crossover.
+        """
+        codes = self.generate_signal_array(df)
+        bars = np.flatnonzero(codes.to_numpy())
+        sides = codes.to_numpy()[bars]
+        return [
+            Signal(timestamp=ts, side="BUY" if side == SIGNAL_BUY else "SELL")
+            for ts, side in zip(codes.index[bars], sides)
+        ]
+
+    def reset(self) -> None:
+        """Clear streaming state before feeding a new series through on_bar."""
+
+    def on_bar(self, timestamp: pd.Timestamp, bar: Mapping[str, float]) -> int:
+        """
+        Streaming counterpart of generate_target_positions.
+
+        Called once per bar in time order with the bar's fields (at least
+        'close'); returns the target position for that bar. Implementations
+        must keep O(1) state per bar so that feeding a DataFrame row by row
+        yields exactly generate_target_positions(df).
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support streaming")
+
+    def on_chunk(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Target positions for the next block of bars, continuing the on_bar state.
+
+        Feeding consecutive blocks of a frame gives exactly
+        generate_target_positions of the whole frame, while only the
+        streaming state is kept between blocks. The generic version calls
+        on_bar per row; subclasses can override it with a block-wise pass.
+        """
+        columns = list(df.columns)
+        rows = zip(*(df[c].tolist() for c in columns))
+        return np.array(
+            [self.on_bar(ts, dict(zip(columns, values))) for ts, values in zip(df.index, rows)],
+            dtype=np.int64,
+        )
+
+    def get_state(self) -> Dict:
+        """
+        Snapshot of the streaming state after the last on_bar / on_chunk call.
 
-        for ts in positions.index[buy_mask]:
-            signals.append(Signal(timestamp=ts, side="BUY"))
+        The dict holds only plain Python values (JSON-serializable), and
+        set_state on a strategy with the same parameters continues exactly
+        where this one stopped. Used by backtest.checkpoint.Checkpoint.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support checkpoints")
 
-        for ts in positions.index[sell_mask]:
-            signals.append(Signal(timestamp=ts, side="SELL"))
+    def set_state(self, state: Dict) -> None:
+        """Restore a get_state snapshot."""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support checkpoints")
 
-        return signals
+    def generate_target_panel(self, close_panel: pd.DataFrame) -> pd.DataFrame:
+        """
+        Target positions for many symbols at once.
+
+        Input: (bars x symbols) close prices, NaN where a symbol has no data.
+        Output: DataFrame of the same shape with one target_position column
+        per symbol. The generic version calls generate_target_positions per
+        column; subclasses can override it with a single vectorized pass.
+        """
+        columns = {}
+        for symbol in close_panel.columns:
+            close = close_panel[symbol].dropna()
+            positions = self.generate_target_positions(close.to_frame("close"))
+            columns[symbol] = positions.reindex(close_panel.index, fill_value=0)
+        return pd.DataFrame(columns, index=close_panel.index)
 
 
 class SimpleMovingAverageStrategy(BaseStrategy):
-    def __init__(self, fast_window: int, slow_window: int):
+    def __init__(
+        self,
+        fast_window: int,
+        slow_window: int,
+        indicators: Optional[IndicatorEngine] = None,
+    ):
+        """
+        Parameters:
+            indicators: engine the moving averages are cached in, e.g.
+                backtest.indicators.default_engine(); None computes them
+                on every call
+        """
         if fast_window >= slow_window:
             raise ValueError("fast_window must be < slow_window")
         self.fast_window = fast_window
         self.slow_window = slow_window
+        self.indicators = indicators
+        self.reset()
 
     def generate_target_positions(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -64,18 +339,71 @@ class SimpleMovingAverageStrategy(BaseStrategy):
         - Go long (1) when fast SMA > slow SMA
         - Go flat (0) otherwise
         - Ignore periods where SMAs are not yet fully defined
+
+        With an indicator engine, strategies sharing a window on the same
+        data reuse one computation.
         """
         close = df["close"]
+        if self.indicators is not None:
+            fast = self.indicators.sma(close, self.fast_window)
+            slow = self.indicators.sma(close, self.slow_window)
+        else:
+            fast = sma(close, self.fast_window)
+            slow = sma(close, self.slow_window)
 
-        fast = close.rolling(self.fast_window).mean()
-        slow = close.rolling(self.slow_window).mean()
-
+        # NaN compares False, so bars before either SMA is defined stay flat
         fast_above = fast > slow
 
-        positions = fast_above.astype(int)
+        return pd.Series(fast_above.astype(int), index=df.index, name="target_position")
+
+    def reset(self) -> None:
+        self._fast = RollingMean(self.fast_window)
+        self._slow = RollingMean(self.slow_window)
+
+    def on_bar(self, timestamp: pd.Timestamp, bar: Mapping[str, float]) -> int:
+        """Update both running window sums with this bar's close and return the target."""
+        close = float(bar["close"])
+        fast = self._fast.update(close)
+        slow = self._slow.update(close)
+        if fast != fast or slow != slow:
+            return 0
+        return 1 if fast > slow else 0
+
+    def on_chunk(self, df: pd.DataFrame) -> np.ndarray:
+        """Advance both running window sums over the block and compare the averages."""
+        close = df["close"].to_numpy(dtype=np.float64)
+        fast = self._fast.update_many(close)
+        slow = self._slow.update_many(close)
+        return (fast > slow).astype(np.int64)
+
+    def get_state(self) -> Dict:
+        return {"fast": self._fast.get_state(), "slow": self._slow.get_state()}
+
+    def set_state(self, state: Dict) -> None:
+        self._fast.set_state(state["fast"])
+        self._slow.set_state(state["slow"])
+
+    def generate_target_panel(self, close_panel: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized SMA crossover over a (bars x symbols) close panel.
+
+        pandas computes the rolling means of every column in one call; NaN
+        prices (symbol not yet listed) leave the position flat. Symbols with
+        missing bars after their first price go through the generic
+        per-symbol version instead, which skips the gap rather than letting
+        it blank both averages for a full slow window.
+        """
+        valid = close_panel.notna()
+        contiguous = (valid == valid.cummax()).all()
+        block = close_panel.loc[:, contiguous]
+
+        fast = block.rolling(self.fast_window).mean()
+        slow = block.rolling(self.slow_window).mean()
 
-        invalid = fast.isna() | slow.isna()
-        positions[invalid] = 0
+        positions = (fast > slow).astype(int)
+        positions[fast.isna() | slow.isna()] = 0
+        if contiguous.all():
+            return positions
 
-        positions.name = "target_position"
-        return positions
+        gapped = super().generate_target_panel(close_panel.loc[:, ~contiguous])
+        return pd.concat([positions, gapped], axis=1)[close_panel.columns]
@@ -0,0 +1,290 @@
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from backtest.pnl import PnLCalculator
+from backtest.simulator import TradeSimulator
+from backtest.store import ResultStore, data_fingerprint
+from backtest.strategy import BaseStrategy
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """One point of a parameter sweep: a strategy class, its kwargs and simulator settings."""
+    strategy_cls: Type[BaseStrategy]
+    strategy_params: Dict = field(default_factory=dict)
+    initial_cash: float = 10000.0
+    risk_per_trade: float = 0.1
+
+    def describe(self) -> Dict:
+        return {
+            "strategy": self.strategy_cls.__name__,
+            **self.strategy_params,
+            "initial_cash": self.initial_cash,
+            "risk_per_trade": self.risk_per_trade,
+        }
+
+
+class SharedOHLCV:
+    """
+    OHLCV DataFrame copied once into a multiprocessing.shared_memory block.
+
+    Values are stored column-major (one contiguous float64 row per column)
+    followed by the int64 index, so workers can rebuild the DataFrame as a
+    zero-copy view instead of unpickling it for every task.
+
+    Usage:
+        with SharedOHLCV(df) as shared:
+            descriptor = shared.descriptor   # small, picklable
+            ...
+            shm, df_view = SharedOHLCV.attach(descriptor)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        values = df.to_numpy(dtype=np.float64).T
+        index = df.index
+        if isinstance(index, pd.DatetimeIndex):
+            index_kind, tz = "datetime", (str(index.tz) if index.tz is not None else None)
+            index_values = index.asi8
+        else:
+            index_kind, tz = "int", None
+            index_values = np.asarray(index, dtype=np.int64)
+
+        nbytes = max(values.nbytes + index_values.nbytes, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+        buf = np.ndarray(values.shape, dtype=np.float64, buffer=self._shm.buf)
+        buf[:] = values
+        idx = np.ndarray(
+            index_values.shape, dtype=np.int64, buffer=self._shm.buf, offset=values.nbytes
+        )
+        idx[:] = index_values
+
+        self.descriptor = {
+            "name": self._shm.name,
+            "columns": list(df.columns),
+            "rows": len(df),
+            "index_kind": index_kind,
+            "index_name": index.name,
+            "tz": tz,
+        }
+
+    @staticmethod
+    def attach(descriptor: Dict) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        """
+        Map the block described by `descriptor` and wrap it in a read-only DataFrame.
+
+        The returned SharedMemory handle must stay referenced for as long as
+        the DataFrame is used.
+        """
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+
+        cols, rows = len(descriptor["columns"]), descriptor["rows"]
+        values = np.ndarray((cols, rows), dtype=np.float64, buffer=shm.buf)
+        index_values = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf, offset=values.nbytes)
+        values.flags.writeable = False
+        index_values.flags.writeable = False
+
+        if descriptor["index_kind"] == "datetime":
+            index = pd.DatetimeIndex(index_values.view("M8[ns]"), name=descriptor["index_name"])
+            if descriptor["tz"] is not None:
+                index = index.tz_localize("UTC").tz_convert(descriptor["tz"])
+        else:
+            index = pd.Index(index_values, name=descriptor["index_name"])
+
+        df = pd.DataFrame(values.T, index=index, columns=descriptor["columns"], copy=False)
+        return shm, df
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedOHLCV":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# per-process state set up by _init_worker
+_WORKER: Dict = {}
+
+
+def _init_worker(descriptor: Dict, engine: str, keep_equity: bool = False, extended: bool = False) -> None:
+    shm, df = SharedOHLCV.attach(descriptor)
+    _WORKER.update(shm=shm, df=df, engine=engine, keep_equity=keep_equity, extended=extended)
+
+
+def _run_config(
+    df: pd.DataFrame,
+    config: SweepConfig,
+    engine: str,
+    keep_equity: bool = False,
+    extended: bool = False,
+) -> Tuple[Dict, Optional[np.ndarray]]:
+    strategy = config.strategy_cls(**config.strategy_params)
+    simulator = TradeSimulator(
+        initial_cash=config.initial_cash,
+        risk_per_trade=config.risk_per_trade,
+    )
+
+    if engine == "loop":
+        signals = strategy.generate_signal_array(df)
+        trades, equity = simulator.run(df["close"], signals)
+    else:
+        positions = strategy.generate_target_positions(df)
+        trades, equity = simulator.run_vectorized(df["close"], positions)
+
+    summary = PnLCalculator().summarize(trades, equity, extended=extended)
+    summary.pop("trades", None)
+    return summary, (equity.to_numpy() if keep_equity else None)
+
+
+def _run_chunk(chunk: List[Tuple[int, SweepConfig]]) -> List[Tuple[int, Dict, Optional[np.ndarray]]]:
+    df, engine = _WORKER["df"], _WORKER["engine"]
+    keep_equity, extended = _WORKER["keep_equity"], _WORKER["extended"]
+    return [(i, *_run_config(df, config, engine, keep_equity, extended)) for i, config in chunk]
+
+
+class SweepRunner:
+    """
+    Run arbitrary BaseStrategy configurations across a ProcessPoolExecutor.
+
+    The OHLCV frame is placed in shared memory once; each worker maps it at
+    start-up. Configurations are submitted in chunks with a bounded number of
+    chunks in flight, and results are yielded as soon as their chunk finishes
+    (so in completion order, not submission order).
+
+    Each result is a flat dict: the config description (strategy name,
+    params, simulator settings), its position in the input under "config_id",
+    and the PnLCalculator.summarize output without the trade list.
+
+    With a ResultStore, configurations already stored for the same data and
+    code version are yielded from the store first (with "cached": True) and
+    only the rest are evaluated; every finished chunk is committed, so an
+    interrupted sweep picks up where it stopped when run again.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = 8,
+        engine: str = "vectorized",
+        progress: Optional[Callable[[int, int], None]] = None,
+        store: Optional[ResultStore] = None,
+        store_equity: bool = False,
+        extended: bool = False,
+    ):
+        """
+        Parameters:
+            workers: worker processes (default: os.cpu_count()); 1 runs in-process
+            chunk_size: configurations per submitted task
+            engine: "vectorized" (TradeSimulator.run_vectorized) or "loop"
+                (generate_signal_array + TradeSimulator.run); both give identical results
+            progress: called as progress(done, total) after every finished chunk
+            store: optional backtest.store.ResultStore for deduplication and resume
+            store_equity: also keep each evaluated equity curve in the store
+            extended: summarize with extended=True (Sharpe, CAGR, profit factor, ...)
+        """
+        if engine not in ("vectorized", "loop"):
+            raise ValueError("engine must be 'vectorized' or 'loop'")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.engine = engine
+        self.progress = progress
+        self.store = store
+        self.store_equity = store_equity and store is not None
+        self.extended = extended
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def run(self, df: pd.DataFrame, configs: Iterable[SweepConfig]) -> Iterator[Dict]:
+        configs = list(configs)
+        total = len(configs)
+        todo = list(range(total))
+        done = 0
+
+        keys: List[str] = []
+        if self.store is not None:
+            data_fp = data_fingerprint(df)
+            keys = [self.store.key(data_fp, config, self.extended) for config in configs]
+            stored = self.store.existing(keys)
+            todo = [i for i in todo if keys[i] not in stored]
+            for i in range(total):
+                if keys[i] in stored:
+                    yield {**self._row(i, configs[i], self.store.get(keys[i])), "cached": True}
+            done = total - len(todo)
+            if done:
+                self.logger.info(f"{done} of {total} configs already in {self.store.path}")
+                self._report(done, total)
+
+        chunks = [todo[lo:lo + self.chunk_size] for lo in range(0, len(todo), self.chunk_size)]
+        self.logger.info(
+            f"Sweeping {len(todo)} configs in {len(chunks)} chunks on {self.workers} workers"
+        )
+
+        for results in self._evaluate(df, configs, chunks):
+            if self.store is not None:
+                self.store.put_many([
+                    {"key": keys[i], "data_fp": data_fp, "config": configs[i],
+                     "summary": summary, "equity": equity}
+                    for i, summary, equity in results
+                ])
+            for i, summary, _ in results:
+                yield self._row(i, configs[i], summary)
+            done += len(results)
+            self._report(done, total)
+
+    def _evaluate(
+        self,
+        df: pd.DataFrame,
+        configs: List[SweepConfig],
+        chunks: List[List[int]],
+    ) -> Iterator[List[Tuple[int, Dict, Optional[np.ndarray]]]]:
+        """Results of each chunk of config positions, as chunks finish."""
+        if not chunks:
+            return
+        if self.workers == 1:
+            for chunk in chunks:
+                yield [
+                    (i, *_run_config(df, configs[i], self.engine, self.store_equity, self.extended))
+                    for i in chunk
+                ]
+            return
+
+        with SharedOHLCV(df) as shared:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.descriptor, self.engine, self.store_equity, self.extended),
+            ) as pool:
+                max_pending = self.workers * 2
+                pending = set()
+                queue = iter(chunks)
+
+                while True:
+                    while len(pending) < max_pending:
+                        chunk = next(queue, None)
+                        if chunk is None:
+                            break
+                        pending.add(pool.submit(_run_chunk, [(i, configs[i]) for i in chunk]))
+                    if not pending:
+                        break
+
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        yield future.result()
+
+    def _row(self, i: int, config: SweepConfig, summary: Dict) -> Dict:
+        return {"config_id": i, **config.describe(), **summary}
+
+    def _report(self, done: int, total: int) -> None:
+        if self.progress is not None:
+            self.progress(done, total)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import pytest
@@ -16,3 +17,20 @@ def sample_ohlcv_df():
     }
     df = pd.DataFrame(data).set_index("timestamp")
     return df
+
+
+@pytest.fixture(scope="session")
+def random_walk():
+    """
+    Factory of seeded random-walk frames: random_walk(num_bars, seed=..., freq=..., columns=...).
+
+    close is 100 * exp(cumsum(N(0, 0.01))) on a UTC DatetimeIndex named
+    'timestamp' starting 2024-01-01; every other requested column is a
+    copy of close.
+    """
+    def make(num_bars: int = 2000, seed: int = 0, freq: str = "h", columns=("close",)) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, num_bars)))
+        index = pd.date_range("2024-01-01", periods=num_bars, freq=freq, tz="UTC", name="timestamp")
+        return pd.DataFrame({name: close for name in columns}, index=index)
+    return make
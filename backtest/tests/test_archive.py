@@ -0,0 +1,78 @@
+import csv
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.archive import KLINE_CSV_COLUMNS, ArchiveLoader, parse_kline_csv
+from backtest.cache import OHLCVCache
+from benchmarks.synthetic import generate_ohlcv, ohlcv_to_klines
+
+
+def _write_archive(directory, name, rows, header=False, micros=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(KLINE_CSV_COLUMNS)
+    for row in rows:
+        row = list(row)
+        if micros:
+            row[0], row[6] = row[0] * 1000, row[6] * 1000
+        writer.writerow(row)
+    with zipfile.ZipFile(directory / f"{name}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{name}.csv", buffer.getvalue())
+
+
+@pytest.fixture
+def hourly():
+    return generate_ohlcv(24 * 3, interval="1h", start="2024-03-01", seed=7)
+
+
+def test_load_daily_archives_into_cache(tmp_path, hourly):
+    klines = ohlcv_to_klines(hourly, "1h")
+    archives = tmp_path / "archives"
+    archives.mkdir()
+    _write_archive(archives, "BTCUSDT-1h-2024-03-01", klines[:24])
+    _write_archive(archives, "BTCUSDT-1h-2024-03-02", klines[24:48], header=True)
+    # newer dumps use microsecond timestamps; repeat one bar of the previous day
+    _write_archive(archives, "BTCUSDT-1h-2024-03-03", klines[47:], micros=True)
+    _write_archive(archives, "ETHUSDT-1h-2024-03-01", klines[:24])
+
+    cache = OHLCVCache(str(tmp_path / "cache"))
+    report = ArchiveLoader(cache, workers=2).load(str(archives), "BTCUSDT", "1h")
+
+    assert report.files == 3 and report.rows == 72
+    assert report.duplicates == 1 and report.conflicting_duplicates == 0
+    assert report.gaps == []
+
+    start_ms, end_ms = int(hourly.index[0].value // 10 ** 6), int(hourly.index[-1].value // 10 ** 6)
+    columns = cache.read("BTCUSDT", "1h", start_ms, end_ms)
+    np.testing.assert_array_equal(columns["open_time"], hourly.index.asi8 // 10 ** 6)
+    np.testing.assert_allclose(columns["close"], hourly["close"].round(2))
+    assert columns["num_trades"].dtype == np.int64
+    assert cache.missing_ranges("BTCUSDT", "1h", start_ms, end_ms + 3_600_000 - 1) == []
+
+
+def test_gaps_are_reported_and_strict_mode_refuses(tmp_path, hourly):
+    klines = ohlcv_to_klines(hourly, "1h")
+    _write_archive(tmp_path, "BTCUSDT-1h-2024-03-01", klines[:10] + klines[13:24])
+    loader = ArchiveLoader(OHLCVCache(str(tmp_path / "cache")), workers=1)
+
+    report = loader.load(str(tmp_path), "BTCUSDT", "1h")
+    assert report.gaps == [(klines[10][0], klines[12][0])]
+    assert report.missing_bars == 3
+
+    with pytest.raises(ValueError, match="1 gaps"):
+        loader.load(str(tmp_path), "BTCUSDT", "1h", strict=True)
+
+
+def test_parse_kline_csv_types():
+    data = b"1709251200000,1.5,2,1,1.75,10,1709254799999,17.5,42,5,8.75,0\n"
+    columns = parse_kline_csv(data)
+    assert columns["open_time"].tolist() == [1709251200000]
+    assert columns["close"].dtype == np.float64 and columns["close"][0] == 1.75
+    assert columns["num_trades"].tolist() == [42]
+    assert "close_time" not in columns and "ignore" not in columns
+    assert pd.Timestamp(columns["open_time"][0], unit="ms") == pd.Timestamp("2024-03-01")
@@ -0,0 +1,47 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backtest.fetcher import MarketDataFetcher
+from benchmarks.suite import BenchmarkSuite, compare
+from benchmarks.synthetic import MockKlineSource, generate_ohlcv
+
+
+def test_generator_is_seeded_and_consistent():
+    df = generate_ohlcv(5000, interval="1m", seed=42)
+    again = generate_ohlcv(3000, interval="1m", seed=42)
+
+    pd.testing.assert_frame_equal(df.iloc[:3000], again)
+    assert df.index.tz is not None and (np.diff(df.index.asi8) == 60_000_000_000).all()
+    assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+    assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+    assert not generate_ohlcv(100, seed=1)["close"].equals(generate_ohlcv(100, seed=2)["close"])
+
+
+def test_mock_kline_source_drives_fetcher():
+    df = generate_ohlcv(2500, interval="1m", seed=0)
+    source = MockKlineSource(df, "1m")
+
+    with mock.patch("backtest.fetcher.requests.get", source.get):
+        fetched = MarketDataFetcher().get_historical_ohlcv(
+            "BTCUSDT", "1m", df.index[0].isoformat(), df.index[-1].isoformat()
+        )
+
+    assert fetched.index.equals(df.index)
+    np.testing.assert_allclose(fetched["close"], df["close"], atol=0.006)
+    assert source.request_count >= 3
+
+
+def test_suite_report_and_regression_check():
+    suite = BenchmarkSuite(bars=2000, kline_bars=500, repeat=1, warmup=0)
+    report = suite.run(["generate_signals", "simulator_loop"])
+
+    assert set(report["results"]) == {"generate_signals", "simulator_loop"}
+    assert report["results"]["simulator_loop"]["bars"] == 2000
+
+    slower = {"results": {k: dict(v) for k, v in report["results"].items()}}
+    slower["results"]["simulator_loop"]["median_s"] *= 2
+    rows = {r["stage"]: r for r in compare(slower, report, threshold=0.25)}
+    assert rows["simulator_loop"]["regressed"]
+    assert not rows["generate_signals"]["regressed"]
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+import requests
+
+from backtest.cache import OHLCVCache
+from backtest.fetcher import MarketDataFetcher
+
+HOUR_MS = 3_600_000
+
+
+def _fake_klines(symbol, interval, start_ms, end_ms, limit):
+    first = -(-start_ms // HOUR_MS) * HOUR_MS
+    rows = []
+    for ts in range(first, end_ms + 1, HOUR_MS)[:limit]:
+        price = str(100 + (ts // HOUR_MS) % 50)
+        rows.append([ts, price, price, price, price, "1.0", ts + HOUR_MS - 1])
+    return rows
+
+
+def test_cache_missing_ranges(tmp_path):
+    cache = OHLCVCache(tmp_path)
+    cache.write("BTCUSDT", "1h", {"open_time": []}, covered=(100, 200))
+    cache.write("BTCUSDT", "1h", {"open_time": []}, covered=(301, 400))
+
+    assert cache.missing_ranges("BTCUSDT", "1h", 0, 500) == [(0, 99), (201, 300), (401, 500)]
+    assert cache.missing_ranges("BTCUSDT", "1h", 120, 180) == []
+
+
+def test_fetcher_only_downloads_missing_gaps(tmp_path, mocker):
+    fetch = mocker.patch.object(
+        MarketDataFetcher, "_fetch_klines", side_effect=_fake_klines
+    )
+    cache = OHLCVCache(tmp_path)
+    fetcher = MarketDataFetcher(cache=cache)
+
+    first = fetcher.get_historical_ohlcv("BTCUSDT", "1h", "2024-01-02", "2024-01-03")
+    assert len(first) == 25
+    assert cache.stats.misses == 1
+
+    fetch.reset_mock()
+    again = fetcher.get_historical_ohlcv("BTCUSDT", "1h", "2024-01-02", "2024-01-03")
+    fetch.assert_not_called()
+    pd.testing.assert_frame_equal(first, again)
+    assert cache.stats.hits == 1
+
+    wider = fetcher.get_historical_ohlcv("BTCUSDT", "1h", "2024-01-01", "2024-01-04")
+    requested = [call.kwargs["start_ms"] for call in fetch.call_args_list]
+    cached_lo, cached_hi = fetcher._to_ms("2024-01-02"), fetcher._to_ms("2024-01-03")
+    assert requested[0] == fetcher._to_ms("2024-01-01")
+    assert cached_hi + 1 in requested
+    assert not any(cached_lo <= ts <= cached_hi for ts in requested)
+    assert len(wider) == 73
+    assert cache.stats.partial_hits == 1
+    assert cache.stats.bars_from_cache == 25 + 25
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_exhausted_rate_limit_retries_leave_the_gap_missing(tmp_path, mocker, concurrency):
+    fetcher = MarketDataFetcher(cache=OHLCVCache(tmp_path), max_retries=2, backoff_factor=0, concurrency=concurrency)
+    start, end = fetcher._to_ms("2024-01-02"), fetcher._to_ms("2024-01-03")
+    blocked = start + 10 * HOUR_MS  # first bar of the second page of ten
+
+    def get(url, timeout=None):
+        query = dict(part.split("=") for part in url.split("?")[1].split("&"))
+        if blocked - HOUR_MS < int(query["startTime"]) <= blocked:
+            return mocker.Mock(status_code=429, headers={"Retry-After": "0"})
+        rows = _fake_klines(None, None, int(query["startTime"]), int(query["endTime"]), int(query["limit"]))
+        return mocker.Mock(status_code=200, headers={}, json=mocker.Mock(return_value=rows))
+
+    mocker.patch("backtest.fetcher.requests.get", side_effect=get)
+    mocker.patch("backtest.fetcher.requests.Session.get", side_effect=get)
+
+    with pytest.raises(requests.HTTPError):
+        fetcher.get_historical_ohlcv("BTCUSDT", "1h", "2024-01-02", "2024-01-03", limit=10)
+
+    missing = fetcher.cache.missing_ranges("BTCUSDT", "1h", start, end)
+    assert any(lo <= blocked <= hi for lo, hi in missing)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from backtest.cache import OHLCVCache, OHLCV_COLUMNS
+from backtest.checkpoint import Checkpoint
+from backtest.chunked import ChunkedBacktest
+from backtest.simulator import TradeLog, TradeSimulator
+from backtest.strategy import RollingMean, SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv
+
+
+def _runner(**kwargs):
+    return ChunkedBacktest(
+        SimpleMovingAverageStrategy(6, 35), TradeSimulator(10_000, risk_per_trade=0.5), **kwargs
+    )
+
+
+def test_resumed_runs_match_full_rerun(tmp_path):
+    df = generate_ohlcv(6_000, interval="1m", start="2024-01-01", seed=21)
+    full = _runner().run_frame(df)
+
+    # nightly-style: each run only sees the bars appended since the last checkpoint
+    splits = [0, 1_000, 1_001, 2_750, 4_200, 6_000]
+    logs, curves, carried = [], [], 0
+    checkpoint = None
+    for lo, hi in zip(splits, splits[1:]):
+        result = _runner(chunk_bars=333).run_frame(df.iloc[:hi], checkpoint=checkpoint)
+        assert result.checkpoint.bars == hi and len(result.equity) == hi - lo
+        logs.append(result.trades)
+        curves.append(result.equity)
+        carried += result.state.position_qty > 0
+        result.checkpoint.save(str(tmp_path / "ckpt.json"))
+        checkpoint = Checkpoint.load(str(tmp_path / "ckpt.json"))
+
+    assert carried  # some checkpoint held an open position
+    assert TradeLog.concat([log for log in logs if len(log)]) == full.trades
+    np.testing.assert_array_equal(np.concatenate(curves), full.equity)
+
+
+def test_resume_from_cache_reads_only_new_bars(tmp_path):
+    df = generate_ohlcv(3_000, interval="1m", start="2024-01-01", seed=2)
+    columns = {"open_time": df.index.asi8 // 10 ** 6, **{c: df[c].to_numpy() for c in OHLCV_COLUMNS}}
+    cache = OHLCVCache(str(tmp_path / "cache"))
+    cache.write("BTCUSDT", "1m", {name: values[:2_000] for name, values in columns.items()})
+
+    first = _runner().run(cache, "BTCUSDT", "1m", "2024-01-01", "2024-12-31")
+    cache.write("BTCUSDT", "1m", {name: values[2_000:] for name, values in columns.items()})
+    tail = _runner().run(cache, "BTCUSDT", "1m", "2024-01-01", "2024-12-31", checkpoint=first.checkpoint)
+
+    full = _runner().run_frame(df)
+    assert len(tail.equity) == 1_000
+    np.testing.assert_array_equal(tail.equity, full.equity[2_000:])
+    assert tail.checkpoint.bars == 3_000
+
+
+def test_checkpoint_mismatches_are_rejected():
+    df = generate_ohlcv(500, interval="1m", start="2024-01-01", seed=4)
+    checkpoint = _runner().run_frame(df.iloc[:300]).checkpoint
+
+    other_risk = ChunkedBacktest(SimpleMovingAverageStrategy(6, 35), TradeSimulator(10_000, 0.1))
+    with pytest.raises(ValueError, match="risk_per_trade"):
+        other_risk.run_frame(df, checkpoint=checkpoint)
+    other_window = ChunkedBacktest(SimpleMovingAverageStrategy(6, 40), TradeSimulator(10_000, 0.5))
+    with pytest.raises(ValueError, match="window"):
+        other_window.run_frame(df, checkpoint=checkpoint)
+    with pytest.raises(ValueError, match="overlap"):
+        _runner().run_columns(
+            {"open_time": df.index.asi8[:10] // 10 ** 6, "close": df["close"].to_numpy()[:10]},
+            checkpoint=checkpoint,
+        )
+
+    rolling = RollingMean(5)
+    rolling.update_many(np.array([1.0, np.nan, 3.0]))
+    with pytest.raises(ValueError, match="window"):
+        RollingMean(6).set_state(rolling.get_state())
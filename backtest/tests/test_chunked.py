@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from backtest.cache import OHLCVCache, OHLCV_COLUMNS
+from backtest.chunked import ChunkedBacktest
+from backtest.simulator import TradeSimulator
+from backtest.strategy import BaseStrategy, RollingMean, SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv
+
+
+def _cached(tmp_path, bars):
+    df = generate_ohlcv(bars, interval="1m", start="2024-01-01", seed=11)
+    columns = {"open_time": df.index.asi8 // 10 ** 6, **{c: df[c].to_numpy() for c in OHLCV_COLUMNS}}
+    cache = OHLCVCache(str(tmp_path / "cache"))
+    cache.write("BTCUSDT", "1m", columns)
+    return cache, df
+
+
+def test_chunked_run_matches_in_memory_run(tmp_path):
+    cache, df = _cached(tmp_path, 20_000)
+    strategy = SimpleMovingAverageStrategy(7, 40)
+    simulator = TradeSimulator(initial_cash=10_000, risk_per_trade=0.5)
+    trades, equity = simulator.run_vectorized(df["close"], strategy.generate_target_positions(df))
+
+    chunk_bars = 997
+    runner = ChunkedBacktest(strategy, simulator, chunk_bars=chunk_bars)
+    path = tmp_path / "equity.npy"
+    result = runner.run(cache, "BTCUSDT", "1m", "2023-12-31", "2024-12-31", equity_path=str(path))
+
+    assert result.trades == trades
+    np.testing.assert_array_equal(result.equity_series().to_numpy(), equity.to_numpy())
+    assert result.equity_series().index.equals(equity.index.rename("timestamp"))
+    np.testing.assert_array_equal(np.load(path, mmap_mode="r"), equity.to_numpy())
+
+    # some trades were open across a block boundary
+    entry_bar = df.index.get_indexer(trades.entry_time)
+    exit_bar = df.index.get_indexer(trades.exit_time)
+    assert (entry_bar // chunk_bars != exit_bar // chunk_bars).any()
+
+
+def test_generic_on_chunk_and_start_end_window(tmp_path):
+    cache, df = _cached(tmp_path, 3_000)
+
+    class StreamingOnly(SimpleMovingAverageStrategy):
+        on_chunk = BaseStrategy.on_chunk
+
+    window = df.loc["2024-01-01 10:00":"2024-01-02 12:00"]
+    simulator = TradeSimulator(initial_cash=1_000)
+    trades, equity = simulator.run_vectorized(
+        window["close"], SimpleMovingAverageStrategy(5, 20).generate_target_positions(window)
+    )
+
+    result = ChunkedBacktest(StreamingOnly(5, 20), simulator, chunk_bars=128).run(
+        cache, "BTCUSDT", "1m", "2024-01-01 10:00", "2024-01-02 12:00"
+    )
+    assert result.trades == trades
+    np.testing.assert_array_equal(result.equity, equity.to_numpy())
+
+
+def test_rolling_mean_update_many_matches_pandas():
+    values = np.random.default_rng(3).normal(50, 5, 5_000)
+    values[10:15] = np.nan
+    values[100:200] = 42.0
+    rolling = RollingMean(30)
+    blocks = [rolling.update_many(values[lo:lo + 333]) for lo in range(0, len(values), 333)]
+    expected = pd.Series(values).rolling(30).mean().to_numpy()
+    np.testing.assert_array_equal(np.concatenate(blocks), expected)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.fetcher import MarketDataFetcher, to_epoch_ms
+from backtest.indicators import IndicatorEngine
+from backtest.pnl import PnLCalculator
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv, ohlcv_to_klines
+
+
+@pytest.fixture
+def frames():
+    klines = ohlcv_to_klines(generate_ohlcv(5_000, interval="1h", start="2024-01-01", seed=9), "1h")
+    fetcher = MarketDataFetcher()
+    columns = fetcher._klines_to_columns(klines)
+    return fetcher._columns_to_frame(columns), fetcher._columns_to_frame(columns, compact=True)
+
+
+def test_compact_frame_layout(frames):
+    full, compact = frames
+    assert (compact.dtypes == np.float32).all()
+    assert compact.index.dtype == np.int64 and compact.index.name == "open_time"
+    np.testing.assert_array_equal(compact.index.to_numpy(), full.index.asi8 // 10 ** 6)
+    assert compact.memory_usage(deep=True).sum() < 0.6 * full.memory_usage(deep=True).sum()
+    np.testing.assert_allclose(compact["close"], full["close"], rtol=2 ** -24)
+
+
+def test_pipeline_runs_on_compact_frames(frames):
+    full, compact = frames
+    results = []
+    for df in (full, compact):
+        strategy = SimpleMovingAverageStrategy(10, 30, indicators=IndicatorEngine())
+        trades, equity = TradeSimulator(10_000).run_vectorized(
+            df["close"], strategy.generate_target_positions(df)
+        )
+        results.append((trades, PnLCalculator().summarize(trades, equity, extended=True)))
+
+    (full_trades, full_summary), (compact_trades, compact_summary) = results
+    assert compact_trades.index_kind == "int"
+    np.testing.assert_array_equal(
+        compact_trades.entry_time.to_numpy(), full_trades.entry_time.asi8 // 10 ** 6
+    )
+    for key in ("end_equity", "sharpe", "cagr_pct", "exposure_pct"):
+        assert compact_summary[key] == pytest.approx(full_summary[key], rel=1e-5)
+
+
+def test_to_epoch_ms_is_utc():
+    assert to_epoch_ms("2024-01-01") == 1704067200000
+    assert to_epoch_ms("2024-01-01 10:30") == 1704067200000 + 630 * 60_000
+    assert to_epoch_ms("2024-01-01T12:30:00+02:00") == to_epoch_ms("2024-01-01T10:30")
+    assert to_epoch_ms("2024-01-01T10:30:00Z") == to_epoch_ms("2024-01-01 10:30")
+    assert to_epoch_ms(pd.Timestamp("2024-01-01", tz="UTC")) == 1704067200000
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from backtest.fetcher import MarketDataFetcher
+from backtest.kline_server import LocalKlineServer
+from backtest.ratelimit import WeightRateLimiter
+
+
+def test_concurrent_download_matches_sequential():
+    with LocalKlineServer() as server:
+        sequential = MarketDataFetcher(base_url=server.url).get_historical_ohlcv(
+            "BTCUSDT", "1m", "2024-01-01", "2024-01-03", limit=500
+        )
+        concurrent = MarketDataFetcher(base_url=server.url, concurrency=4).get_historical_ohlcv(
+            "BTCUSDT", "1m", "2024-01-01", "2024-01-03", limit=500
+        )
+
+    assert len(concurrent) == 2 * 24 * 60 + 1
+    assert concurrent.index.is_unique and concurrent.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(sequential, concurrent)
+
+
+def test_rate_limiter_follows_server_weight_and_pauses():
+    limiter = WeightRateLimiter(capacity=100, window_s=60.0, headroom=1.0)
+    limiter.update_from_headers({WeightRateLimiter.USED_WEIGHT_HEADER: "99"})
+    assert limiter._tokens <= 1.01
+
+    limiter.pause(0.05)
+    waited = limiter.acquire(1)
+    assert waited >= 0.04
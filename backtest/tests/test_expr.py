@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.expr import (
+    ExpressionStrategy, Program, close, diff, ema, low, rolling_std, shift, sma, sma_crossover, where,
+)
+from backtest.indicators import IndicatorEngine
+from backtest.strategy import SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv
+
+
+@pytest.fixture(scope="module")
+def df():
+    return generate_ohlcv(5_000, interval="1h", start="2024-01-01", seed=8)
+
+
+def test_sma_strategy_is_re_expressible(df):
+    engine = IndicatorEngine()
+    expected = SimpleMovingAverageStrategy(8, 21, indicators=engine).generate_target_positions(df)
+    strategy = ExpressionStrategy(sma_crossover(8, 21), indicators=engine)
+
+    pd.testing.assert_series_equal(strategy.generate_target_positions(df), expected)
+    assert engine.stats.hits == 2  # both averages shared with the hand-written strategy
+    assert repr(strategy) == "ExpressionStrategy((sma(close, 8) > sma(close, 21)))"
+
+
+def test_common_subexpressions_are_evaluated_once_into_reused_buffers(df):
+    trend = sma(close, 10) > sma(close, 30)
+    calm = abs(diff(close)) / rolling_std(close, 20) < 2
+    outputs = [trend & calm | (ema(close, 5) > shift(close, 3)), where(trend, close - low, 0) * 2 + 1]
+    program = Program(outputs + [sma(close, 30) < sma(close, 10)], indicators=IndicatorEngine())
+
+    ops = [node.op for node in program.nodes]
+    assert ops.count("sma") == 2 and ops.count("gt") == 2  # `a < b` is not rewritten to `b > a`
+    assert len(program.nodes) == 21
+
+    first = program.evaluate(df)
+    allocated = program.allocations
+    second = program.evaluate(df)
+    assert program.allocations == allocated < 8
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+
+    c = df["close"]
+    sma10, sma30 = c.rolling(10).mean(), c.rolling(30).mean()
+    expected = ((sma10 > sma30) & (c.diff().abs() / c.rolling(20).std() < 2)) | (
+        c.ewm(span=5, adjust=False).mean() > c.shift(3)
+    )
+    np.testing.assert_array_equal(first[0], expected.to_numpy())
+    np.testing.assert_array_equal(first[1], np.where(sma10 > sma30, c - df["low"], 0) * 2 + 1)
+    np.testing.assert_array_equal(first[2], (sma30 < sma10).to_numpy())
+
+
+def test_numeric_positions_and_misuse(df):
+    # NaN on the first bar (no previous close) must come out flat
+    positions = ExpressionStrategy(where(close > sma(close, 50), 1.0, 0.0) + shift(close, 1) * 0)
+    targets = positions.generate_target_positions(df)
+    assert targets.dtype == int and set(targets.unique()) <= {0, 1}
+    assert targets.iloc[:49].eq(0).all()
+
+    with pytest.raises(ValueError, match="0 or 1"):
+        ExpressionStrategy(where(close > sma(close, 50), 0.7, 0.0)).generate_target_positions(df)
+
+    with pytest.raises(TypeError, match="truth value"):
+        bool(close > 1)
+    with pytest.raises(ValueError, match="look ahead"):
+        shift(close, 0)
+    with pytest.raises(TypeError, match="str"):
+        close + "1"
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from backtest.grid import SMAGridSweep, rolling_means
+from backtest.pnl import PnLCalculator
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+@pytest.fixture
+def random_walk_df(random_walk):
+    return random_walk(3000, seed=3)
+
+
+def test_rolling_means_match_pandas(random_walk_df):
+    close = random_walk_df["close"]
+    means = rolling_means(close.to_numpy(), [1, 7, 50])
+    for j, w in enumerate([1, 7, 50]):
+        np.testing.assert_allclose(means[:, j], close.rolling(w).mean().to_numpy(), rtol=1e-12)
+
+
+def test_grid_sweep_matches_single_backtests(random_walk_df):
+    sweep = SMAGridSweep([3, 5, 20], [10, 20, 40], initial_cash=10_000, risk_per_trade=0.5)
+    table = sweep.run(random_walk_df)
+
+    assert (20, 10) not in table.index and (20, 20) not in table.index
+    assert len(table) == len(sweep.combos) == 7
+
+    sim = TradeSimulator(initial_cash=10_000, risk_per_trade=0.5)
+    for fast, slow in sweep.combos:
+        positions = SimpleMovingAverageStrategy(fast, slow).generate_target_positions(random_walk_df)
+        trades, equity = sim.run_vectorized(random_walk_df["close"], positions)
+        expected = PnLCalculator().summarize(trades, equity)
+
+        row = table.loc[(fast, slow)]
+        assert row["num_trades"] == expected["num_trades"]
+        for key in ("total_return_pct", "max_drawdown_pct", "win_rate_pct"):
+            assert row[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-9)
+
+
+def test_position_matrix_matches_strategy_on_flat_stretch(random_walk_df):
+    # a repeated price makes pandas return the exact value for every window,
+    # so the grid must not flip fast > slow on cumulative-sum rounding
+    close = random_walk_df["close"].to_numpy().copy()
+    close[1000:1200] = close[1000]
+    df = random_walk_df.assign(close=close)
+
+    means = rolling_means(close, [3, 60])
+    assert (means[1059:1200] == close[1000]).all()
+
+    sweep = SMAGridSweep([3, 5, 10], [20, 40, 60])
+    positions, combos = sweep.position_matrix(df)
+    for j, (fast, slow) in enumerate(combos):
+        expected = SimpleMovingAverageStrategy(fast, slow).generate_target_positions(df)
+        np.testing.assert_array_equal(positions[:, j], np.asarray(expected))
+
+
+def test_rolling_means_recover_after_nan(random_walk_df):
+    close = random_walk_df["close"].copy()
+    close.iloc[[0, 500]] = np.nan
+    means = rolling_means(close.to_numpy(), [1, 7, 50])
+    for j, w in enumerate([1, 7, 50]):
+        np.testing.assert_allclose(means[:, j], close.rolling(w).mean().to_numpy(), rtol=1e-12)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.indicators import IndicatorEngine
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+@pytest.fixture
+def close_df(random_walk):
+    return random_walk(1000, seed=8)
+
+
+def test_strategies_share_cached_smas(close_df):
+    engine = IndicatorEngine()
+    a = SimpleMovingAverageStrategy(10, 50, indicators=engine).generate_target_positions(close_df)
+    b = SimpleMovingAverageStrategy(10, 30, indicators=engine).generate_target_positions(close_df)
+
+    # sma(10) is computed once and reused, also for an equal copy of the data
+    assert (engine.stats.misses, engine.stats.hits) == (3, 1)
+    engine.sma(close_df["close"].copy(), 30)
+    assert engine.stats.hits == 2
+
+    fast = close_df["close"].rolling(10).mean()
+    slow = close_df["close"].rolling(50).mean()
+    expected = ((fast > slow) & slow.notna()).astype(int)
+    pd.testing.assert_series_equal(a, expected, check_names=False)
+    assert a.name == b.name == "target_position"
+
+    with pytest.raises(ValueError):
+        engine.sma(close_df["close"], 10)[0] = 1.0
+
+
+def test_lru_evicts_by_bytes(close_df):
+    close = close_df["close"]
+    engine = IndicatorEngine(max_bytes=2 * close.to_numpy().nbytes)
+
+    engine.sma(close, 5)
+    engine.sma(close, 6)
+    engine.sma(close, 5)      # refreshes 5, so 6 is the least recently used
+    engine.sma(close, 7)
+
+    assert engine.stats.evictions == 1
+    assert engine.stats.bytes == 2 * close.to_numpy().nbytes
+    engine.sma(close, 5)
+    engine.sma(close, 6)
+    assert (engine.stats.hits, engine.stats.misses) == (2, 4)
+
+
+def test_disk_tier_survives_new_engine(close_df, tmp_path):
+    first = IndicatorEngine(disk_dir=str(tmp_path))
+    expected = first.sma(close_df["close"], 20)
+
+    second = IndicatorEngine(disk_dir=str(tmp_path))
+    loaded = second.sma(close_df["close"], 20)
+
+    np.testing.assert_array_equal(loaded, expected)
+    assert (second.stats.disk_hits, second.stats.misses) == (1, 0)
+    second.clear(disk=True)
+    assert not list(tmp_path.glob("*.npy"))
+
+
+def test_strategy_without_engine_sees_in_place_changes(close_df):
+    strategy = SimpleMovingAverageStrategy(10, 30)
+    before = strategy.generate_target_positions(close_df)
+
+    values = close_df["close"].to_numpy()
+    values[:] = values[::-1].copy()
+
+    after = strategy.generate_target_positions(close_df)
+    pd.testing.assert_series_equal(after, strategy.generate_target_positions(close_df.copy()))
+    assert not after.equals(before)
+
+
+def test_engine_misses_when_a_reused_buffer_holds_new_data(close_df):
+    engine = IndicatorEngine()
+    values = close_df["close"].to_numpy().copy()
+    first = engine.sma(values, 10).copy()
+
+    # Same owner id, address, shape and strides: what a recycled array looks like to the memo.
+    values[:] = values[::-1].copy()
+
+    np.testing.assert_array_equal(engine.sma(values, 10), IndicatorEngine().sma(values.copy(), 10))
+    assert not np.array_equal(engine.sma(values, 10), first, equal_nan=True)
+    assert engine.stats.misses == 2
@@ -0,0 +1,28 @@
+from backtest.fetcher import MarketDataFetcher
+
+
+def test_normalize_builds_typed_utc_columns():
+    raw = [
+        [1704067200000, "100", "105", "95", "102", "1.5", 1704070799999, "153.0", 12, "0.5", "51.0", "0"],
+        [1704070800000, "102", "108", "98", "105", "2.5", 1704074399999, "262.5", 20, "1.0", "105.0", "0"],
+    ]
+
+    df = MarketDataFetcher()._normalize_ohlcv_binance(raw, extended=True)
+
+    assert str(df.index.tz) == "UTC"
+    assert df.index[0].value == 1704067200000 * 1_000_000
+    assert (df.dtypes[["open", "high", "low", "close", "volume"]] == "float64").all()
+    assert df["num_trades"].dtype == "int64"
+    assert list(df.columns[5:]) == [
+        "quote_volume", "num_trades", "taker_buy_base_volume", "taker_buy_quote_volume"
+    ]
+
+
+def test_normalize_default_keeps_ohlcv_only():
+    raw = [[1704067200000, "100", "105", "95", "102", "1.5", 1704070799999, "153.0", 12, "0.5", "51.0", "0"]]
+
+    df = MarketDataFetcher()._normalize_ohlcv_binance(raw)
+
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df["close"].iloc[0] == 102.0
+    assert df.index.name == "timestamp"
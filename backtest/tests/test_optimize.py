@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.optimize import ChoiceParam, FloatParam, IntParam, SuccessiveHalvingOptimizer
+from backtest.strategy import SimpleMovingAverageStrategy
+from backtest.sweep import SweepConfig, SweepRunner
+
+SPACE = {"fast_window": IntParam(2, 60), "slow_window": IntParam(10, 200, step=5)}
+
+
+def _fast_below_slow(params):
+    return params["fast_window"] < params["slow_window"]
+
+
+@pytest.fixture(scope="module")
+def cyclic():
+    # a 240-bar cycle plus noise: the best windows stay the best on every slice
+    n = 6_000
+    rng = np.random.default_rng(0)
+    close = 100 + 10 * np.sin(2 * np.pi * np.arange(n) / 240) + np.cumsum(rng.normal(0, 0.3, n))
+    index = pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC", name="timestamp")
+    return pd.DataFrame({"open": close, "close": close}, index=index)
+
+
+def test_parameters_are_routed_by_signature():
+    opt = SuccessiveHalvingOptimizer(
+        SimpleMovingAverageStrategy,
+        {**SPACE, "risk_per_trade": FloatParam(0.05, 0.5, log=True)},
+        fixed={"initial_cash": 5_000.0},
+    )
+    config = opt.config({"fast_window": 5, "slow_window": 30, "risk_per_trade": 0.2})
+    assert config == SweepConfig(
+        SimpleMovingAverageStrategy, {"fast_window": 5, "slow_window": 30}, 5_000.0, 0.2
+    )
+    with pytest.raises(ValueError, match="lookback"):
+        SuccessiveHalvingOptimizer(SimpleMovingAverageStrategy, {"lookback": ChoiceParam((1, 2))})
+
+
+def test_successive_halving_reaches_top_of_full_grid(cyclic):
+    grid = [
+        SweepConfig(SimpleMovingAverageStrategy, {"fast_window": f, "slow_window": s})
+        for f in range(2, 61) for s in range(10, 201, 5) if f < s
+    ]
+    returns = np.array([row["total_return_pct"] for row in SweepRunner(workers=1).run(cyclic, grid)])
+
+    result = SuccessiveHalvingOptimizer(
+        SimpleMovingAverageStrategy, SPACE, constraint=_fast_below_slow, min_fraction=1 / 9, seed=0
+    ).run(cyclic)
+
+    assert result.full_equivalents == pytest.approx(27, abs=0.01)  # vs 2015 full backtests
+    assert (returns <= result.best_summary["total_return_pct"]).mean() > 0.98
+    assert result.trials.groupby("rung")["bars"].agg(["size", "first"]).values.tolist() == [
+        [81, 667], [27, 2000], [9, 6000]
+    ]
+
+
+def test_tpe_hyperband_focuses_on_good_region_and_is_seeded(cyclic):
+    def run():
+        return SuccessiveHalvingOptimizer(
+            SimpleMovingAverageStrategy, SPACE, metric="sharpe", num_candidates=27, min_fraction=1 / 9,
+            hyperband=True, sampler="tpe", rounds=2, constraint=_fast_below_slow, seed=3,
+        ).run(cyclic)
+
+    result = run()
+    trials = result.trials
+    assert (trials["fast_window"] < trials["slow_window"]).all()
+    assert trials["bracket"].nunique() == 6 and "sharpe" in trials
+
+    widest = trials[trials["bars"] == trials["bars"].min()]
+    first, later = widest[widest["bracket"] == 0], widest[widest["bracket"] > 0]
+    assert later["sharpe"].median() > first["sharpe"].median()
+    assert run().best_params == result.best_params
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.pnl import PnLCalculator, infer_periods_per_year
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+@pytest.fixture
+def backtest_result(random_walk):
+    df = random_walk(2000, seed=11)
+    positions = SimpleMovingAverageStrategy(10, 40).generate_target_positions(df)
+    trades, equity = TradeSimulator(10000, 0.5).run_vectorized(df["close"], positions)
+    return trades, equity, positions
+
+
+def test_extended_metrics_match_reference(backtest_result):
+    trades, equity, positions = backtest_result
+    summary = PnLCalculator().summarize(trades, equity, extended=True)
+
+    ppy = 365 * 24
+    assert infer_periods_per_year(equity.index) == pytest.approx(ppy)
+
+    returns = equity.pct_change().dropna()
+    assert summary["sharpe"] == pytest.approx(returns.mean() / returns.std() * np.sqrt(ppy))
+
+    pnl = np.array([(t.exit_price - t.entry_price) * t.qty for t in trades])
+    assert summary["profit_factor"] == pytest.approx(pnl[pnl > 0].sum() / -pnl[pnl < 0].sum())
+    assert summary["avg_loss"] == pytest.approx(pnl[pnl < 0].mean())
+
+    # a trade entered at bar i and closed at bar j is exposed for j - i bars;
+    # a position still open at the end is not a closed trade
+    held = (positions == 1).to_numpy()
+    last_exit = equity.index.get_loc(trades[-1].exit_time)
+    assert summary["exposure_pct"] == pytest.approx(held[:last_exit].sum() / len(held) * 100.0)
+
+    # longest run of bars below the running peak
+    underwater = (equity < equity.cummax()).to_numpy()
+    runs = np.diff(np.flatnonzero(np.diff(np.r_[0, underwater, 0])))[::2]
+    assert summary["longest_drawdown_bars"] == runs.max()
+    assert summary["max_drawdown_pct"] < 0
+
+
+def test_batch_metrics_match_single_curve(backtest_result):
+    trades, equity, _ = backtest_result
+    calc = PnLCalculator()
+    matrix = pd.DataFrame({"a": equity, "b": equity * 2.0, "c": equity.iloc[::-1].to_numpy()})
+
+    batch = calc.batch_metrics(matrix)
+    single = calc.metrics(trades, equity)
+
+    assert list(batch.index) == ["a", "b", "c"]
+    for key in ("sharpe", "sortino", "calmar", "max_drawdown_pct", "longest_drawdown_bars"):
+        assert batch.loc["a", key] == pytest.approx(single[key])
+        assert batch.loc["b", key] == pytest.approx(single[key])
+
+    # a bare array has no index to infer the bar spacing from
+    with pytest.raises(ValueError, match="periods_per_year"):
+        calc.batch_metrics(matrix.to_numpy())
+    hourly = calc.batch_metrics(matrix.to_numpy(), periods_per_year=365 * 24)
+    assert hourly.loc[0, "sharpe"] == pytest.approx(single["sharpe"])
+
+
+def test_rolling_metrics(backtest_result):
+    _, equity, _ = backtest_result
+    rolling = PnLCalculator().rolling_metrics(equity, window=100)
+
+    assert rolling.index.equals(equity.index)
+    assert rolling["rolling_return_pct"].iloc[:100].isna().all()
+    assert rolling["rolling_return_pct"].iloc[150] == pytest.approx(
+        (equity.iloc[150] / equity.iloc[50] - 1) * 100
+    )
+    assert (rolling["rolling_drawdown_pct"] <= 0).all()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from backtest.portfolio import PortfolioSimulator
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+def _panel(num_symbols=5, n=1500, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, num_symbols)), axis=0))
+    if num_symbols > 1:
+        close[:300, 1] = np.nan  # listed later
+    index = pd.date_range("2024-01-01", periods=n, freq="h", name="timestamp")
+    return pd.DataFrame(close, index=index, columns=[f"SYM{i}" for i in range(num_symbols)])
+
+
+def test_sma_target_panel_matches_per_symbol_targets():
+    panel = _panel()
+    panel.iloc[700:703, 2] = np.nan  # a few missing candles
+    strat = SimpleMovingAverageStrategy(5, 20)
+    targets = strat.generate_target_panel(panel)
+
+    for symbol in panel.columns:
+        close = panel[symbol].dropna().to_frame("close")
+        expected = strat.generate_target_positions(close).reindex(panel.index, fill_value=0)
+        np.testing.assert_array_equal(targets[symbol].to_numpy(), expected.to_numpy())
+
+
+def test_single_symbol_portfolio_matches_trade_simulator():
+    panel = _panel(num_symbols=1)
+    targets = SimpleMovingAverageStrategy(5, 20).generate_target_panel(panel)
+
+    result = PortfolioSimulator(initial_cash=10_000, weight=0.4).run(panel, targets)
+    trades, equity = TradeSimulator(10_000, 0.4).run_vectorized(panel["SYM0"], targets["SYM0"])
+
+    np.testing.assert_allclose(result.equity.to_numpy(), equity.to_numpy(), rtol=1e-12)
+    assert len(result.trades) == len(trades)
+
+
+def test_portfolio_equity_is_sum_of_symbol_pnl():
+    panel = _panel()
+    targets = SimpleMovingAverageStrategy(5, 20).generate_target_panel(panel)
+
+    result = PortfolioSimulator(initial_cash=10_000).run(panel, targets)
+
+    np.testing.assert_allclose(
+        result.equity.to_numpy(), 10_000 + result.symbol_pnl.sum(axis=1).to_numpy(), rtol=1e-9
+    )
+    assert (result.quantities["SYM1"].iloc[:300] == 0).all()
+    assert set(result.trades["symbol"]) == set(panel.columns)
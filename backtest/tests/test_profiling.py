@@ -0,0 +1,82 @@
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from backtest import profiling
+from backtest.fetcher import MarketDataFetcher
+from backtest.pnl import PnLCalculator
+from backtest.profiling import Profiler
+from backtest.simulator import TradeSimulator
+from backtest.strategy import BaseStrategy, SimpleMovingAverageStrategy
+
+
+def test_profiler_records_pipeline_stages(tmp_path, random_walk):
+    df = random_walk(3000, seed=5)
+    strategy = SimpleMovingAverageStrategy(5, 20)
+    simulator = TradeSimulator(10_000, 0.2)
+
+    with Profiler(cprofile=True) as prof:
+        trades, equity = simulator.run(df["close"], strategy.generate_signal_array(df))
+        PnLCalculator().summarize(trades, equity)
+
+    stats = prof.stats
+    assert {"strategy.positions", "strategy.signals", "simulator.run", "pnl.summarize"} <= set(stats)
+    assert stats["simulator.run"].bars == len(df) and stats["simulator.run"].calls == 1
+    assert stats["strategy.signals"].wall_s >= stats["strategy.positions"].wall_s
+    assert stats["strategy.signals"].peak_bytes > 0
+    assert list(prof.report().index) == list(stats)
+
+    prof.dump_stats(str(tmp_path / "run.pstats"))
+    assert (tmp_path / "run.pstats").stat().st_size > 0
+    assert profiling.active_profiler() is None
+
+
+def test_fetch_counts_requests_and_rate_limits(mocker):
+    limited = mock.Mock(status_code=429, headers={"Retry-After": "0"})
+    page = [[1704067200000 + i * 60_000, "1", "2", "0.5", "1.5", "10", 0, "0", 0, "0", "0", "0"] for i in range(3)]
+    ok = mock.Mock(status_code=200, headers={})
+    ok.json.return_value = page
+    empty = mock.Mock(status_code=200, headers={})
+    empty.json.return_value = []
+    mocker.patch("backtest.fetcher.requests.get", side_effect=[limited, ok, empty])
+
+    with Profiler(track_memory=False) as prof:
+        df = MarketDataFetcher(backoff_factor=0).get_historical_ohlcv(
+            "BTCUSDT", "1m", "2024-01-01", "2024-01-01 00:10"
+        )
+
+    http = prof.stats["fetch.http"]
+    assert (http.requests, http.retries, http.rate_limited) == (3, 1, 1)
+    assert http.bars == 3 and prof.stats["fetch.normalize"].bars == 3
+    assert prof.stats["fetch"].bars == len(df) == 3
+
+
+def test_hooks_are_noops_without_profiler():
+    assert profiling.active_profiler() is None
+    with profiling.stage("anything", bars=10) as stage:
+        stage.add_bars(5)
+    profiling.count("anything", requests=1)
+
+    with Profiler(track_memory=False):
+        with pytest.raises(RuntimeError):
+            Profiler().__enter__()
+
+
+def test_strategies_with_any_signature_are_profiled(random_walk):
+    class RenamedArg(BaseStrategy):
+        def generate_target_positions(self, data):
+            return pd.Series(1, index=data.index)
+
+    class VarArgs(BaseStrategy):
+        def generate_target_positions(self, *args, **kwargs):
+            return pd.Series(0, index=args[0].index)
+
+    df = random_walk(100, seed=1)
+    with Profiler(track_memory=False) as prof:
+        RenamedArg().generate_target_positions(df)
+        RenamedArg().generate_target_positions(data=df)
+        VarArgs().generate_target_positions(df)
+
+    stage = prof.stats["strategy.positions"]
+    assert stage.calls == 3 and stage.bars == 200
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from backtest.replay import replay
+from backtest.simulator import StreamingTradeSimulator, TradeSimulator
+from backtest.strategy import RollingMean, SimpleMovingAverageStrategy
+
+
+@pytest.fixture
+def minute_bars(random_walk):
+    df = random_walk(3000, seed=9, freq="min", columns=("open", "close"))
+    df.iloc[1000:1030] = df.iloc[1000]  # flat stretch
+    return df
+
+
+def test_rolling_mean_is_bit_identical_to_pandas(minute_bars):
+    close = minute_bars["close"]
+    for window in (1, 3, 20, 250):
+        rolling = RollingMean(window)
+        streamed = np.array([rolling.update(x) for x in close.tolist()])
+        np.testing.assert_array_equal(streamed, close.rolling(window).mean().to_numpy())
+
+
+def test_replay_matches_batch_bar_for_bar(minute_bars, sample_ohlcv_df):
+    for df, (fast, slow) in ((minute_bars, (5, 40)), (sample_ohlcv_df, (2, 3))):
+        strat = SimpleMovingAverageStrategy(fast_window=fast, slow_window=slow)
+        updates = list(replay(df, strat, StreamingTradeSimulator(10_000, 0.25)))
+
+        positions = strat.generate_target_positions(df)
+        trades, equity = TradeSimulator(10_000, 0.25).run_vectorized(df["close"], positions)
+
+        assert [u.target_position for u in updates] == positions.tolist()
+        assert [u.equity for u in updates] == equity.tolist()
+        assert [u.trade for u in updates if u.trade is not None] == trades
@@ -0,0 +1,84 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.fetcher import MarketDataFetcher
+from backtest.resample import MultiTimeframeData, bar_open_times, resample_ohlcv
+from benchmarks.synthetic import generate_ohlcv
+
+
+@pytest.fixture
+def minute_bars():
+    # starts mid-week and mid-hour, spans a month boundary
+    return generate_ohlcv(60 * 24 * 20, interval="1m", start="2024-01-24 13:37", seed=4)
+
+
+def test_resample_matches_pandas_and_binance_boundaries(minute_bars):
+    hourly = resample_ohlcv(minute_bars, "1h")
+    expected = minute_bars.resample("1h").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    pd.testing.assert_frame_equal(hourly, expected, check_freq=False)
+
+    weekly = resample_ohlcv(minute_bars, "1w")
+    assert (weekly.index.dayofweek == 0).all() and (weekly.index.hour == 0).all()
+    assert weekly.index[0] == pd.Timestamp("2024-01-22", tz="UTC")
+
+    monthly = resample_ohlcv(minute_bars, "1M")
+    assert list(monthly.index.strftime("%Y-%m-%d")) == ["2024-01-01", "2024-02-01"]
+    assert monthly["volume"].sum() == pytest.approx(minute_bars["volume"].sum())
+
+    three_day = bar_open_times(minute_bars.index.as_unit("ms").asi8, "3d")
+    assert (three_day % (3 * 86_400_000) == 0).all()
+
+    complete = resample_ohlcv(minute_bars, "1d", source_interval="1m", drop_partial=True)
+    assert complete.index[-1] < resample_ohlcv(minute_bars, "1d").index[-1]
+
+
+def test_aligned_frames_have_no_lookahead(minute_bars):
+    data = MultiTimeframeData(minute_bars, "1m")
+    aligned = data.aligned("1h", ["close"])["close"]
+    hourly = data.get("1h")
+
+    # the first hourly bar opens at 13:00 and is only visible from the bar closing at 14:00
+    assert aligned.loc[:"2024-01-24 13:58"].isna().all()
+    assert aligned.loc["2024-01-24 13:59"] == hourly["close"].iloc[0] == minute_bars["close"].loc["2024-01-24 13:59"]
+    assert aligned.loc["2024-01-24 14:30"] == hourly["close"].iloc[0]
+
+    # every visible value is an hourly close that was already final
+    frame = data.frame_with(["1h", "1d"])
+    assert {"close_1h", "close_1d"} <= set(frame.columns)
+    assert data.get("1h") is hourly
+    with pytest.raises(ValueError):
+        MultiTimeframeData(data.get("1h"), "1h").get("1m")
+
+
+def test_fetch_downloads_only_the_finest_interval(minute_bars):
+    fetcher = MarketDataFetcher()
+    with mock.patch.object(fetcher, "get_historical_ohlcv", return_value=minute_bars) as get:
+        data = MultiTimeframeData.fetch(fetcher, "BTCUSDT", ["1h", "1m", "1d"], "2024-01-24", "2024-02-13")
+        data.get("1d")
+        data.get("1h")
+
+    get.assert_called_once()
+    assert get.call_args.args[1] == "1m"
+    assert set(data.intervals) == {"1m", "1h", "1d"}
+
+
+def test_compact_frames_resample_and_align(minute_bars):
+    open_ms = minute_bars.index.as_unit("ms").asi8
+    compact = minute_bars.astype("float32").set_axis(pd.Index(open_ms, name="open_time"))
+
+    hourly = resample_ohlcv(compact, "1h")
+    expected = resample_ohlcv(minute_bars, "1h")
+    assert hourly.index.name == "open_time"
+    assert list(hourly.index) == list(expected.index.as_unit("ms").asi8)
+    assert (hourly.dtypes == "float32").all()
+    assert (hourly["close"].to_numpy() == expected["close"].to_numpy(dtype="float32")).all()
+
+    frame = MultiTimeframeData(compact, "1m").frame_with(["1h"])
+    full = MultiTimeframeData(minute_bars, "1m").frame_with(["1h"])
+    assert frame.index.equals(compact.index)
+    np.testing.assert_allclose(frame["close_1h"], full["close_1h"], rtol=2 ** -24)
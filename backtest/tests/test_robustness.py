@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.pnl import PnLCalculator, equity_metrics
+from backtest.robustness import BAR_METRICS, RobustnessAnalyzer
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv
+
+
+@pytest.fixture(scope="module")
+def backtest():
+    df = generate_ohlcv(6_000, interval="1h", start="2024-01-01", seed=12)
+    trades, equity = TradeSimulator(10_000, 0.5).run_vectorized(
+        df["close"], SimpleMovingAverageStrategy(10, 40).generate_target_positions(df)
+    )
+    return df, trades, equity
+
+
+def test_trade_resamples(backtest):
+    df, trades, equity = backtest
+    summary = PnLCalculator().summarize(trades, equity)
+    results = RobustnessAnalyzer(2_000, workers=1, seed=1).run(trades, equity, df["close"])
+
+    shuffle = results["trade_shuffle"]
+    assert shuffle.samples["total_return_pct"].to_numpy() == pytest.approx(shuffle.observed["total_return_pct"])
+    assert (shuffle.samples["win_rate_pct"] == summary["win_rate_pct"]).all()
+    assert shuffle.samples["max_drawdown_pct"].min() <= shuffle.observed["max_drawdown_pct"]
+
+    table = results["trade_bootstrap"].interval(0.9)
+    assert list(table.index) == ["total_return_pct", "max_drawdown_pct", "win_rate_pct"]
+    assert (table["lower"] < table["upper"]).all()
+    assert table.loc["win_rate_pct", "observed"] == pytest.approx(summary["win_rate_pct"])
+    assert len(results["entry_delays"].samples) == 2_000
+
+
+def test_block_bootstrap_matches_scoring_full_paths(backtest):
+    _, _, equity = backtest
+    values = equity.to_numpy()
+    returns = values[1:] / values[:-1] - 1.0
+    m, block, resamples = len(returns), 25, 50
+
+    result = RobustnessAnalyzer(resamples, workers=1, seed=7).block_bootstrap(equity, block_bars=block)
+
+    # the same draws, scored on explicitly concatenated bar returns
+    rng = np.random.default_rng(np.random.SeedSequence(7).spawn(1)[0])
+    starts = rng.integers(0, m, size=(resamples, -(-m // block)))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(resamples, -1)[:, :m] % m
+    paths = np.hstack([np.ones((resamples, 1)), np.cumprod(1.0 + returns[idx], axis=1)])
+    expected = equity_metrics(paths.T, 24 * 365)
+    for name in BAR_METRICS:
+        np.testing.assert_allclose(result.samples[name], expected[name], rtol=1e-9)
+    assert result.observed["max_drawdown_pct"] == pytest.approx(
+        PnLCalculator().summarize([], equity)["max_drawdown_pct"]
+    )
+
+
+def test_entry_delays_and_worker_independence(backtest):
+    df, trades, equity = backtest
+    no_delay = RobustnessAnalyzer(100, workers=1, seed=3).entry_delays(trades, equity, df["close"], max_delay=0)
+    for name, value in no_delay.observed.items():
+        np.testing.assert_allclose(no_delay.samples[name], value, rtol=1e-12)
+
+    small_batches = dict(resamples=300, seed=5, max_batch_elements=20_000)
+    serial = RobustnessAnalyzer(workers=1, **small_batches).entry_delays(trades, equity, df["close"])
+    parallel = RobustnessAnalyzer(workers=2, **small_batches).entry_delays(trades, equity, df["close"])
+    pd.testing.assert_frame_equal(serial.samples, parallel.samples)
+    assert serial.samples["total_return_pct"].std() > 0
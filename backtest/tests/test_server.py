@@ -0,0 +1,86 @@
+from unittest import mock
+
+import pytest
+
+from backtest.client import BacktestClient
+from backtest.fetcher import MarketDataFetcher
+from backtest.pnl import PnLCalculator
+from backtest.server import BacktestServer, BacktestService
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv
+
+DATA = dict(symbol="BTCUSDT", interval="1h", start="2024-01-01", end="2024-04-01")
+
+
+@pytest.fixture
+def server():
+    df = generate_ohlcv(2_000, interval="1h", start="2024-01-01", seed=5)
+    fetcher = mock.Mock(spec=MarketDataFetcher)
+    fetcher.get_historical_ohlcv.return_value = df
+    with BacktestServer(BacktestService(fetcher, workers=2), port=0) as running:
+        running.df = df
+        yield running
+
+
+def test_backtest_over_http_matches_direct_run_and_stays_warm(server):
+    client = BacktestClient(server.url)
+    summary = client.backtest(**DATA, fast_window=8, slow_window=21, risk_per_trade=0.2)
+
+    df = server.df
+    trades, equity = TradeSimulator(10_000, 0.2).run_vectorized(
+        df["close"], SimpleMovingAverageStrategy(8, 21).generate_target_positions(df)
+    )
+    expected = PnLCalculator().summarize(trades, equity, extended=True)
+    assert summary["bars"] == len(df)
+    assert summary["num_trades"] == expected["num_trades"]
+    assert summary["end_equity"] == expected["end_equity"]
+    assert summary["sharpe"] == pytest.approx(expected["sharpe"])
+
+    client.backtest(**DATA, fast_window=8, slow_window=50)
+    status = client.status()
+    assert server.service.fetcher.get_historical_ohlcv.call_count == 1
+    assert status["jobs"] == {"done": 2}
+    assert status["datasets"][0]["bars"] == len(df)
+    assert status["indicators"]["hits"] >= 1
+
+
+def test_sweep_job_is_ranked(server):
+    client = BacktestClient(server.url)
+    job_id = client.submit(
+        {"type": "sweep", **DATA, "fast_windows": [5, 10, 40], "slow_windows": [20, 40], "top": 3}
+    )
+    result = client.result(job_id)
+    returns = [row["total_return_pct"] for row in result["rows"]]
+    assert len(returns) == 3 and returns == sorted(returns, reverse=True)
+    assert all(row["fast_window"] < row["slow_window"] for row in result["rows"])
+
+
+def test_sweep_on_process_pool_matches_in_thread_sweep(server):
+    request = {"type": "sweep", **DATA, "fast_windows": [5, 10, 40], "slow_windows": [20, 40],
+               "risk_per_trade": [0.1, 0.3]}
+    in_thread = server.service.run(request)
+
+    fetcher = mock.Mock(spec=MarketDataFetcher)
+    fetcher.get_historical_ohlcv.return_value = server.df
+    pooled = BacktestService(fetcher, workers=1, sweep_workers=2)
+    try:
+        assert pooled.run(request) == in_thread
+    finally:
+        pooled.shutdown()
+
+
+def test_invalid_and_failing_jobs(server):
+    client = BacktestClient(server.url)
+    with pytest.raises(ValueError, match="400"):
+        client.submit({"type": "optimize", **DATA})
+    with pytest.raises(ValueError, match="fast_window"):
+        client.backtest(**DATA, fast_window=30, slow_window=10)
+
+    job_id = client.submit({"type": "backtest", **DATA})
+    resp = client.session.get(f"{server.url}/jobs/{job_id}?wait=abc", timeout=30)
+    assert resp.status_code == 400 and "wait" in resp.json()["error"]
+
+    server.service.fetcher.get_historical_ohlcv.side_effect = RuntimeError("exchange down")
+    with pytest.raises(RuntimeError, match="exchange down"):
+        client.backtest(**{**DATA, "symbol": "ETHUSDT"})
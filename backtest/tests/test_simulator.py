@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+def test_vectorized_engine_matches_loop(random_walk):
+    df = random_walk(2000, seed=7)
+    strat = SimpleMovingAverageStrategy(fast_window=5, slow_window=20)
+    sim = TradeSimulator(initial_cash=10_000, risk_per_trade=0.3)
+
+    loop_trades, loop_equity = sim.run(df["close"], strat.generate_signals(df))
+    vec_trades, vec_equity = sim.run_vectorized(df["close"], strat.generate_target_positions(df))
+
+    assert len(loop_trades) > 10
+    assert vec_trades == loop_trades
+    np.testing.assert_array_equal(vec_equity.to_numpy(), loop_equity.to_numpy())
+    assert (vec_equity.index == loop_equity.index).all()
+
+
+def test_vectorized_engine_ignores_redundant_targets():
+    index = pd.date_range("2024-01-01", periods=6, freq="D")
+    close = pd.Series([10.0, 11.0, 12.0, 13.0, 12.0, 14.0], index=index)
+    # 1 -> -1 emits no SELL, so the position stays open until the final bar
+    target = pd.Series([0, 1, -1, 0, 1, 0], index=index)
+
+    trades, equity = TradeSimulator(initial_cash=100, risk_per_trade=1.0).run_vectorized(close, target)
+
+    assert [(t.entry_price, t.exit_price) for t in trades] == [(11.0, 14.0)]
+    assert equity.iloc[-1] == 100 + (14.0 - 11.0) * (100 / 11.0)
+
+
+def test_signal_array_and_trade_log(random_walk):
+    df = random_walk(2000, seed=3)
+    strat = SimpleMovingAverageStrategy(fast_window=5, slow_window=20)
+    sim = TradeSimulator(initial_cash=10_000, risk_per_trade=0.3)
+
+    codes = strat.generate_signal_array(df)
+    signals = strat.generate_signals(df)
+    assert codes.dtype == np.int8 and codes.index.equals(df.index)
+    assert [s.timestamp for s in signals] == sorted(s.timestamp for s in signals)
+    assert signals[0].side == "BUY" and signals[1].side == "SELL"
+
+    trades, equity = sim.run(df["close"], codes)
+    list_trades, list_equity = sim.run(df["close"], signals)
+    assert trades == list_trades
+    np.testing.assert_array_equal(equity.to_numpy(), list_equity.to_numpy())
+
+    # columns and row views describe the same trades
+    assert trades.entry_time.tz is not None
+    np.testing.assert_array_equal(trades.pnl, [t.pnl for t in trades])
+    assert trades[-1].exit_time == trades.exit_time[-1]
+    assert trades.to_list() == trades
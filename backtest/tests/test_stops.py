@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.simulator import EXIT_REASONS, TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from benchmarks.synthetic import generate_ohlcv
+
+
+def _reference(df, target, cash, risk, stop_loss, take_profit, trailing_stop):
+    """Straightforward per-bar loop with the same fill rules as run_with_stops."""
+    prev = target.shift(1).fillna(0).to_numpy()
+    target = target.to_numpy()
+    equity, qty, entry, peak = cash, 0.0, None, None
+    trades, curve = [], []
+    for i, (o, h, l, c) in enumerate(df[["open", "high", "low", "close"]].itertuples(index=False)):
+        if qty > 0:
+            levels = []
+            if stop_loss is not None:
+                levels.append((entry * (1 - stop_loss), "stop_loss"))
+            if trailing_stop is not None:
+                levels.append((peak * (1 - trailing_stop), "trailing_stop"))
+            stop = max(levels, key=lambda x: x[0]) if levels else None
+            exit_px = reason = None
+            if stop is not None and l <= stop[0]:
+                exit_px, reason = min(stop[0], o), stop[1]
+            elif take_profit is not None and h >= entry * (1 + take_profit):
+                exit_px, reason = max(entry * (1 + take_profit), o), "take_profit"
+            elif target[i] == 0 and prev[i] == 1:
+                exit_px, reason = c, "signal"
+            if exit_px is not None:
+                equity += (exit_px - entry) * qty
+                trades.append((entry, exit_px, reason))
+                qty = 0.0
+            else:
+                peak = max(peak, h)
+        elif target[i] == 1 and prev[i] == 0:
+            qty, entry, peak = equity * risk / c, c, c
+        curve.append(equity + ((c - entry) * qty if qty > 0 else 0.0))
+    return trades, np.array(curve)
+
+
+@pytest.mark.parametrize(
+    "stops",
+    [
+        dict(stop_loss=0.01),
+        dict(take_profit=0.015),
+        dict(trailing_stop=0.008),
+        dict(stop_loss=0.01, take_profit=0.02, trailing_stop=0.006),
+    ],
+)
+def test_stops_match_reference_loop(stops):
+    df = generate_ohlcv(20_000, interval="5m", seed=9)
+    target = SimpleMovingAverageStrategy(12, 60).generate_target_positions(df)
+    sim = TradeSimulator(10_000, 0.5)
+
+    trades, equity = sim.run_with_stops(df, target, **stops)
+    expected_trades, expected_curve = _reference(
+        df, target, 10_000, 0.5,
+        stops.get("stop_loss"), stops.get("take_profit"), stops.get("trailing_stop"),
+    )
+
+    assert len(trades) == len(expected_trades) > 20
+    assert [t.exit_reason for t in trades] == [r for _, _, r in expected_trades]
+    np.testing.assert_allclose(trades.exit_price, [p for _, p, _ in expected_trades])
+    np.testing.assert_allclose(equity.to_numpy(), expected_curve, rtol=1e-12)
+    assert set(trades.to_frame()["exit_reason"]) <= set(EXIT_REASONS)
+
+
+def test_without_stops_equals_run_vectorized():
+    df = generate_ohlcv(5000, interval="1h", seed=2)
+    target = SimpleMovingAverageStrategy(5, 30).generate_target_positions(df)
+    sim = TradeSimulator(10_000, 0.3)
+
+    trades, equity = sim.run_with_stops(df, target)
+    vec_trades, vec_equity = sim.run_vectorized(df["close"], target)
+
+    assert trades == vec_trades
+    np.testing.assert_array_equal(equity.to_numpy(), vec_equity.to_numpy())
+    assert set(trades.to_frame()["exit_reason"]) == {"signal"}
+
+
+def test_gap_through_stop_fills_at_open():
+    index = pd.date_range("2024-01-01", periods=4, freq="D", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "open": [100.0, 100.0, 90.0, 91.0],
+            "high": [101.0, 101.0, 92.0, 93.0],
+            "low": [99.0, 99.5, 88.0, 90.0],
+            "close": [100.0, 100.0, 91.0, 92.0],
+        },
+        index=index,
+    )
+    target = pd.Series([1, 1, 1, 1], index=index)
+
+    trades, equity = TradeSimulator(1000, 1.0).run_with_stops(df, target, stop_loss=0.05)
+
+    assert [(t.exit_time, t.exit_price, t.exit_reason) for t in trades] == [(index[2], 90.0, "stop_loss")]
+    assert equity.iloc[-1] == equity.iloc[2] == 1000 + (90.0 - 100.0) * 10
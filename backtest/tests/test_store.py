@@ -0,0 +1,99 @@
+import importlib
+import sys
+import textwrap
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from backtest import sweep
+from backtest.store import ResultStore, data_fingerprint
+from backtest.strategy import SimpleMovingAverageStrategy
+from backtest.sweep import SweepConfig, SweepRunner
+from benchmarks.synthetic import generate_ohlcv
+
+
+def _configs(fasts=(3, 5, 8), slows=(20, 40)):
+    return [
+        SweepConfig(SimpleMovingAverageStrategy, {"fast_window": f, "slow_window": s})
+        for f in fasts for s in slows
+    ]
+
+
+@pytest.fixture
+def df():
+    return generate_ohlcv(1_500, interval="1h", start="2024-01-01", seed=4)
+
+
+def test_rerun_is_served_from_store(tmp_path, df):
+    path = str(tmp_path / "sweeps.sqlite")
+    with ResultStore(path) as store:
+        first = {r["config_id"]: r for r in SweepRunner(workers=1, store=store, store_equity=True).run(df, _configs((3, 5)))}
+        assert len(store) == 4
+
+    with ResultStore(path) as store, mock.patch.object(sweep, "_run_config", wraps=sweep._run_config) as run:
+        rows = list(SweepRunner(workers=1, store=store).run(df, _configs()))
+        assert run.call_count == 2  # only the fast_window=8 configs were new
+        assert len(store) == 6
+
+        for row in rows:
+            if row["config_id"] in first:
+                assert row["cached"]
+                assert row["end_equity"] == first[row["config_id"]]["end_equity"]
+
+        curve = store.equity(store.key(data_fingerprint(df), _configs()[0]))
+        assert curve is not None and len(curve) == len(df)
+
+
+def test_top_filters_by_drawdown(tmp_path, df):
+    with ResultStore(str(tmp_path / "sweeps.sqlite")) as store:
+        rows = list(SweepRunner(workers=1, store=store).run(df, _configs((2, 3, 5, 8, 13), (20, 40, 80))))
+        limit = float(np.median([-r["max_drawdown_pct"] for r in rows]))
+
+        best = store.top(3, data_fp=data_fingerprint(df), max_drawdown=limit)
+        eligible = sorted(
+            (r["total_return_pct"] for r in rows if r["max_drawdown_pct"] >= -limit), reverse=True
+        )
+        assert best["total_return_pct"].tolist() == pytest.approx(eligible[:3])
+        assert {"fast_window", "slow_window"} <= set(best.columns)
+        assert store.top(3, data_fp="other").empty
+
+
+def test_key_depends_on_params_data_and_code_version(tmp_path, df):
+    a, b = _configs((3,), (20, 40))
+    with ResultStore(str(tmp_path / "a.sqlite")) as store, ResultStore(str(tmp_path / "b.sqlite"), version="other") as old:
+        fp = data_fingerprint(df)
+        assert store.key(fp, a) == store.key(fp, SweepConfig(SimpleMovingAverageStrategy, {"slow_window": 20, "fast_window": 3}))
+        assert store.key(fp, a) != store.key(fp, b)
+        assert store.key(fp, a) != old.key(fp, a)
+        assert store.key(fp, a) != store.key(data_fingerprint(df.iloc[:-1]), a)
+
+
+def test_editing_an_outside_strategy_invalidates_its_results(tmp_path, df, monkeypatch):
+    source = textwrap.dedent("""
+        from backtest.strategy import SimpleMovingAverageStrategy
+
+        class MyStrategy(SimpleMovingAverageStrategy):
+            def generate_target_positions(self, df):
+                return super().generate_target_positions(df)
+    """)
+    module_path = tmp_path / "my_strategies.py"
+    module_path.write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("my_strategies")
+    monkeypatch.setitem(sys.modules, "my_strategies", module)  # removed again after the test
+
+    def configs():
+        return [SweepConfig(module.MyStrategy, {"fast_window": 5, "slow_window": 20})]
+
+    with ResultStore(str(tmp_path / "sweeps.sqlite")) as store:
+        (first,) = SweepRunner(workers=1, store=store).run(df, configs())
+        assert next(iter(SweepRunner(workers=1, store=store).run(df, configs())))["cached"]
+
+        module_path.write_text(source.replace("return super()", "return 1 - super()"))
+        module = importlib.reload(module)
+        (edited,) = SweepRunner(workers=1, store=store).run(df, configs())
+
+        assert not edited.get("cached")
+        assert edited["num_trades"] != first["num_trades"] or edited["end_equity"] != first["end_equity"]
+        assert len(store) == 1  # the result of the old source was replaced
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from backtest.sweep import SharedOHLCV, SweepConfig, SweepRunner
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+def test_shared_ohlcv_roundtrip(random_walk):
+    df = random_walk(50, seed=11, columns=("open", "close"))
+    with SharedOHLCV(df) as shared:
+        shm, view = SharedOHLCV.attach(shared.descriptor)
+        pd.testing.assert_frame_equal(view, df, check_freq=False)
+        shm.close()
+
+
+def test_parallel_sweep_matches_in_process(random_walk):
+    df = random_walk(1500, seed=11, columns=("open", "close"))
+    configs = [
+        SweepConfig(SimpleMovingAverageStrategy, {"fast_window": f, "slow_window": s})
+        for f in (3, 5, 8) for s in (20, 40)
+    ]
+    seen = []
+
+    serial = {r["config_id"]: r for r in SweepRunner(workers=1).run(df, configs)}
+    parallel = list(
+        SweepRunner(workers=2, chunk_size=2, progress=lambda d, t: seen.append((d, t))).run(df, configs)
+    )
+
+    assert sorted(r["config_id"] for r in parallel) == list(range(len(configs)))
+    for row in parallel:
+        assert row == serial[row["config_id"]]
+    assert seen[-1] == (len(configs), len(configs))
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from backtest.walkforward import WalkForwardOptimizer
+
+
+@pytest.fixture
+def random_walk_df(random_walk):
+    return random_walk(2500, seed=5)
+
+
+@pytest.mark.parametrize("flat", [False, True])
+def test_walk_forward_stitches_out_of_sample_folds(random_walk_df, flat):
+    if flat:
+        # repeated prices inside a test fold must not flip the crossover
+        close = random_walk_df["close"].to_numpy().copy()
+        close[1200:1400] = close[1200]
+        random_walk_df = random_walk_df.assign(close=close)
+    wf = WalkForwardOptimizer(
+        [3, 5, 10], [20, 40], train_bars=1000, test_bars=400, risk_per_trade=0.5
+    )
+    result = wf.run(random_walk_df)
+
+    assert len(result.folds) == 4
+    assert len(result.equity) == len(random_walk_df) - 1000
+    assert result.equity.iloc[0] == pytest.approx(10_000)
+
+    sim_equity = 10_000.0
+    for fold in result.folds.itertuples():
+        positions = SimpleMovingAverageStrategy(
+            fold.fast_window, fold.slow_window
+        ).generate_target_positions(random_walk_df)
+        window = slice(fold.test_start, fold.test_end)
+        trades, equity = TradeSimulator(sim_equity, 0.5).run_vectorized(
+            random_walk_df["close"][window], positions[window]
+        )
+        assert fold.test_num_trades == len(trades)
+        np.testing.assert_allclose(result.equity[window].to_numpy(), equity.to_numpy(), rtol=1e-10)
+        sim_equity = equity.iloc[-1]
+
+
+def test_walk_forward_parallel_matches_serial(random_walk_df):
+    kwargs = dict(fast_windows=[3, 5, 10], slow_windows=[20, 40], train_bars=800, test_bars=300)
+    serial = WalkForwardOptimizer(**kwargs).run(random_walk_df)
+    parallel = WalkForwardOptimizer(**kwargs, workers=3).run(random_walk_df)
+
+    pd.testing.assert_frame_equal(serial.folds, parallel.folds)
+    pd.testing.assert_series_equal(serial.equity, parallel.equity)
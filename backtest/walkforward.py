@@ -0,0 +1,167 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.grid import SMAGridSweep, evaluate_positions
+
+
+@dataclass
+class WalkForwardResult:
+    """
+    folds: one row per fold with its bar ranges, the chosen (fast_window,
+        slow_window), the in-sample score and the out-of-sample metrics
+    equity: out-of-sample equity curves of all folds chained together, each
+        fold starting from the previous fold's final equity
+    """
+    folds: pd.DataFrame
+    equity: pd.Series
+
+
+class WalkForwardOptimizer:
+    """
+    Rolling (or anchored) walk-forward optimization of SimpleMovingAverageStrategy windows.
+
+    The bars are cut into consecutive folds of `train_bars` in-sample bars
+    followed by `test_bars` out-of-sample bars; folds advance by `test_bars`
+    so the out-of-sample segments tile the history without overlap.
+
+    Every moving average is computed once over the whole DataFrame and then
+    sliced per fold, so overlapping training windows share the same indicator
+    arrays. A consequence is that indicators are already warmed up at the
+    start of each fold (they only ever look at past bars, so there is no
+    look-ahead). Positions still start flat at the first bar of each window.
+    """
+
+    def __init__(
+        self,
+        fast_windows: Iterable[int],
+        slow_windows: Iterable[int],
+        train_bars: int,
+        test_bars: int,
+        metric: str = "total_return_pct",
+        anchored: bool = False,
+        initial_cash: float = 10000.0,
+        risk_per_trade: float = 0.1,
+        workers: int = 1,
+    ):
+        """
+        Parameters:
+            metric: column of evaluate_positions to maximize in-sample
+                (total_return_pct, max_drawdown_pct, win_rate_pct, end_equity)
+            anchored: grow the training window from the first bar instead of
+                rolling a fixed-size window
+            workers: folds optimized in parallel; NumPy releases the GIL in
+                the heavy kernels, so a thread pool is used
+        """
+        if train_bars < 1 or test_bars < 1:
+            raise ValueError("train_bars and test_bars must be >= 1")
+        self.grid = SMAGridSweep(
+            fast_windows, slow_windows, initial_cash=initial_cash, risk_per_trade=risk_per_trade
+        )
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.metric = metric
+        self.anchored = anchored
+        self.initial_cash = initial_cash
+        self.risk_per_trade = risk_per_trade
+        self.workers = workers
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def folds(self, num_bars: int) -> List[Tuple[int, int, int]]:
+        """(train_start, test_start, test_end) bar offsets of every fold."""
+        folds = []
+        test_start = self.train_bars
+        while test_start < num_bars:
+            train_start = 0 if self.anchored else test_start - self.train_bars
+            folds.append((train_start, test_start, min(test_start + self.test_bars, num_bars)))
+            test_start += self.test_bars
+        return folds
+
+    def run(self, df: pd.DataFrame) -> WalkForwardResult:
+        close = df["close"].to_numpy(dtype=np.float64)
+        folds = self.folds(len(close))
+        combos = self.grid.combos
+        if not folds or not combos:
+            raise ValueError("not enough bars or no valid (fast_window, slow_window) pairs")
+
+        means, col = self.grid.means(close)
+        self.logger.info(
+            f"Walk-forward over {len(folds)} folds x {len(combos)} combos "
+            f"on {len(close)} bars with {self.workers} workers"
+        )
+
+        def run_fold(fold):
+            return self._run_fold(close, means, col, combos, *fold)
+
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                outcomes = list(pool.map(run_fold, folds))
+        else:
+            outcomes = [run_fold(fold) for fold in folds]
+
+        # out-of-sample curves were simulated from 1.0; chain them in order
+        rows, segments = [], []
+        equity = self.initial_cash
+        for (train_start, test_start, test_end), (combo, score, test) in zip(folds, outcomes):
+            segment = equity * test["equity"][:, 0]
+            segments.append(segment)
+            equity = float(segment[-1])
+            rows.append({
+                "train_start": df.index[train_start],
+                "test_start": df.index[test_start],
+                "test_end": df.index[test_end - 1],
+                "fast_window": combo[0],
+                "slow_window": combo[1],
+                f"train_{self.metric}": score,
+                "test_return_pct": float(test["total_return_pct"][0]),
+                "test_max_drawdown_pct": float(test["max_drawdown_pct"][0]),
+                "test_num_trades": int(test["num_trades"][0]),
+                "test_end_equity": equity,
+            })
+
+        oos_index = df.index[folds[0][1]:folds[-1][2]]
+        return WalkForwardResult(
+            folds=pd.DataFrame(rows).rename_axis("fold"),
+            equity=pd.Series(np.concatenate(segments), index=oos_index, name="equity"),
+        )
+
+    def _run_fold(
+        self,
+        close: np.ndarray,
+        means: np.ndarray,
+        col: Dict[int, int],
+        combos: List[Tuple[int, int]],
+        train_start: int,
+        test_start: int,
+        test_end: int,
+    ):
+        train_close = close[train_start:test_start]
+        train_means = means[:, train_start:test_start]
+        batch = max(1, SMAGridSweep.MAX_CELLS // len(train_close))
+
+        scores = []
+        for lo in range(0, len(combos), batch):
+            chunk = combos[lo:lo + batch]
+            result = evaluate_positions(
+                train_close,
+                SMAGridSweep.positions(train_means, col, chunk),
+                self.initial_cash,
+                self.risk_per_trade,
+            )
+            scores.append(result[self.metric])
+        scores = np.concatenate(scores)
+        best = int(np.argmax(scores))
+        combo = combos[best]
+
+        test = evaluate_positions(
+            close[test_start:test_end],
+            SMAGridSweep.positions(means[:, test_start:test_end], col, [combo]),
+            1.0,
+            self.risk_per_trade,
+            return_equity=True,
+        )
+        return combo, float(scores[best]), test
@@ -0,0 +1,19 @@
+"""
+Benchmarks for the backtest pipeline on seeded synthetic data.
+
+Run from the repository root:
+
+    python -m benchmarks --bars 1000000 --output results.json
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.25
+"""
+from .synthetic import MockKlineSource, generate_ohlcv, ohlcv_to_klines
+from .suite import BenchmarkResult, BenchmarkSuite, compare
+
+__all__ = [
+    "MockKlineSource",
+    "generate_ohlcv",
+    "ohlcv_to_klines",
+    "BenchmarkResult",
+    "BenchmarkSuite",
+    "compare",
+]
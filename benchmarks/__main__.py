@@ -0,0 +1,92 @@
+import argparse
+import json
+import logging
+import sys
+
+from benchmarks.suite import BenchmarkSuite, compare, load_report, save_report
+
+
+def configure_logging(level: str = "INFO") -> None:
+    numeric_level = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(
+        level=numeric_level,
+        format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time the backtest pipeline stages on seeded synthetic OHLCV data"
+    )
+    parser.add_argument("--bars", type=int, default=1_000_000, help="Synthetic bars for in-memory stages")
+    parser.add_argument(
+        "--kline-bars",
+        type=int,
+        default=200_000,
+        help="Bars for the stages that start from raw klines (normalize, fetch, end-to-end)",
+    )
+    parser.add_argument("--interval", type=str, default="1m", help="Bar interval of the synthetic data")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generator")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per stage")
+    parser.add_argument(
+        "--stages",
+        type=str,
+        nargs="+",
+        choices=BenchmarkSuite.STAGES,
+        default=None,
+        help="Stages to run (default: all)",
+    )
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON report here")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Compare against this stored report and exit with status 1 on regressions",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown per stage before it counts as a regression (0.25 = 25%%)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging()
+    # one line per mocked fetch would drown the stage timings
+    logging.getLogger("MarketDataFetcher").setLevel(logging.WARNING)
+
+    suite = BenchmarkSuite(
+        bars=args.bars,
+        interval=args.interval,
+        seed=args.seed,
+        kline_bars=args.kline_bars,
+        repeat=args.repeat,
+        warmup=args.warmup,
+    )
+    report = suite.run(args.stages)
+
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report["results"], indent=2))
+
+    if not args.baseline:
+        return 0
+
+    rows = compare(report, load_report(args.baseline), args.threshold)
+    print(f"\n{'stage':<22} {'baseline bars/s':>16} {'bars/s':>16} {'ratio':>7}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['stage']:<22} {row['baseline_bars_per_s']:>16,.0f} "
+            f"{row['bars_per_s']:>16,.0f} {row['ratio']:>7.2f}{flag}"
+        )
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+import gc
+import json
+import logging
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backtest.fetcher import MarketDataFetcher
+from backtest.pnl import PnLCalculator
+from backtest.ratelimit import WeightRateLimiter
+from backtest.simulator import TradeSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+from benchmarks.synthetic import MockKlineSource, generate_ohlcv, ohlcv_to_klines
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one stage; all derived numbers use the median run."""
+    name: str
+    bars: int
+    times_s: List[float] = field(default_factory=list)
+
+    @property
+    def median_s(self) -> float:
+        return statistics.median(self.times_s)
+
+    @property
+    def min_s(self) -> float:
+        return min(self.times_s)
+
+    @property
+    def bars_per_s(self) -> float:
+        return self.bars / self.median_s if self.median_s > 0 else float("inf")
+
+    def as_dict(self) -> Dict:
+        return {
+            "bars": self.bars,
+            "times_s": self.times_s,
+            "median_s": self.median_s,
+            "min_s": self.min_s,
+            "bars_per_s": self.bars_per_s,
+        }
+
+
+class BenchmarkSuite:
+    """
+    Per-stage and end-to-end timings of the backtest pipeline on synthetic data.
+
+    Stages (each timed separately, inputs prepared outside the timer):
+        normalize            MarketDataFetcher._normalize_ohlcv_binance on raw klines
+        fetch_mocked         get_historical_ohlcv paging through a MockKlineSource
+        strategy_positions   SimpleMovingAverageStrategy.generate_target_positions
+        signal_array         BaseStrategy.generate_signal_array
+        generate_signals     BaseStrategy.generate_signals (Signal objects)
+        simulator_loop       TradeSimulator.run over the Signal list
+        simulator_vectorized TradeSimulator.run_vectorized over target positions
+        pnl_summary          PnLCalculator.summarize(extended=True)
+        end_to_end           fetch_mocked -> positions -> run_vectorized -> summarize
+
+    The kline-based stages (normalize, fetch_mocked, end_to_end) run on the
+    first `kline_bars` bars, since raw JSON-style rows cost a few hundred
+    bytes each.
+    """
+
+    STAGES = (
+        "normalize",
+        "fetch_mocked",
+        "strategy_positions",
+        "signal_array",
+        "generate_signals",
+        "simulator_loop",
+        "simulator_vectorized",
+        "pnl_summary",
+        "end_to_end",
+    )
+
+    def __init__(
+        self,
+        bars: int = 1_000_000,
+        interval: str = "1m",
+        seed: int = 0,
+        fast_window: int = 20,
+        slow_window: int = 100,
+        kline_bars: int = 200_000,
+        repeat: int = 5,
+        warmup: int = 1,
+    ):
+        """
+        Parameters:
+            bars: synthetic bars for the in-memory stages
+            kline_bars: bars for the stages that start from raw klines
+            repeat: timed runs per stage (the median is reported)
+            warmup: untimed runs per stage before timing
+        """
+        if repeat < 1:
+            raise ValueError("repeat must be >= 1")
+        self.bars = bars
+        self.interval = interval
+        self.seed = seed
+        self.fast_window = fast_window
+        self.slow_window = slow_window
+        self.kline_bars = min(kline_bars, bars)
+        self.repeat = repeat
+        self.warmup = warmup
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def run(self, stages: Optional[Iterable[str]] = None) -> Dict:
+        """Run the selected stages (default: all) and return the JSON-ready report."""
+        stages = list(stages or self.STAGES)
+        unknown = sorted(set(stages) - set(self.STAGES))
+        if unknown:
+            raise ValueError(f"unknown stages: {unknown}")
+
+        self.logger.info(f"Generating {self.bars} synthetic {self.interval} bars (seed={self.seed})")
+        df = generate_ohlcv(self.bars, self.interval, seed=self.seed)
+
+        results = {}
+        for name in stages:
+            bars, func = getattr(self, f"_stage_{name}")(df)
+            result = self._time(name, bars, func)
+            self.logger.info(
+                f"{name:<22} median {result.median_s:8.4f}s | {result.bars_per_s:>14,.0f} bars/s"
+            )
+            results[name] = result.as_dict()
+            del func
+            gc.collect()
+
+        return {"meta": self.meta(), "results": results}
+
+    def meta(self) -> Dict:
+        return {
+            "bars": self.bars,
+            "kline_bars": self.kline_bars,
+            "interval": self.interval,
+            "seed": self.seed,
+            "fast_window": self.fast_window,
+            "slow_window": self.slow_window,
+            "repeat": self.repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        }
+
+    def _time(self, name: str, bars: int, func: Callable[[], object]) -> BenchmarkResult:
+        for _ in range(self.warmup):
+            func()
+        result = BenchmarkResult(name=name, bars=bars)
+        for _ in range(self.repeat):
+            gc.collect()
+            t0 = time.perf_counter()
+            func()
+            result.times_s.append(time.perf_counter() - t0)
+        return result
+
+    # stage factories: prepare inputs, return (bars, timed callable)
+
+    def _strategy(self) -> SimpleMovingAverageStrategy:
+        return SimpleMovingAverageStrategy(self.fast_window, self.slow_window)
+
+    def _simulator(self) -> TradeSimulator:
+        return TradeSimulator(initial_cash=10_000, risk_per_trade=0.1)
+
+    def _mocked_fetch(self, df: pd.DataFrame) -> Callable[[], pd.DataFrame]:
+        head = df.iloc[:self.kline_bars]
+        source = MockKlineSource(head, self.interval, klines=ohlcv_to_klines(head, self.interval))
+        # no throttling: the benchmark measures the client, not Binance's limits
+        fetcher = MarketDataFetcher(rate_limiter=WeightRateLimiter(capacity=10 ** 12))
+        start = head.index[0].isoformat()
+        end = head.index[-1].isoformat()
+
+        def fetch() -> pd.DataFrame:
+            with mock.patch("backtest.fetcher.requests.get", source.get):
+                return fetcher.get_historical_ohlcv("BTCUSDT", self.interval, start, end)
+
+        return fetch
+
+    def _stage_normalize(self, df: pd.DataFrame):
+        raw = ohlcv_to_klines(df.iloc[:self.kline_bars], self.interval)
+        fetcher = MarketDataFetcher()
+        return len(raw), lambda: fetcher._normalize_ohlcv_binance(raw)
+
+    def _stage_fetch_mocked(self, df: pd.DataFrame):
+        return self.kline_bars, self._mocked_fetch(df)
+
+    def _stage_strategy_positions(self, df: pd.DataFrame):
+        strategy = self._strategy()
+        return len(df), lambda: strategy.generate_target_positions(df)
+
+    def _stage_signal_array(self, df: pd.DataFrame):
+        strategy = self._strategy()
+        return len(df), lambda: strategy.generate_signal_array(df)
+
+    def _stage_generate_signals(self, df: pd.DataFrame):
+        strategy = self._strategy()
+        return len(df), lambda: strategy.generate_signals(df)
+
+    def _stage_simulator_loop(self, df: pd.DataFrame):
+        signals = self._strategy().generate_signals(df)
+        simulator = self._simulator()
+        return len(df), lambda: simulator.run(df["close"], signals)
+
+    def _stage_simulator_vectorized(self, df: pd.DataFrame):
+        positions = self._strategy().generate_target_positions(df)
+        simulator = self._simulator()
+        return len(df), lambda: simulator.run_vectorized(df["close"], positions)
+
+    def _stage_pnl_summary(self, df: pd.DataFrame):
+        positions = self._strategy().generate_target_positions(df)
+        trades, equity = self._simulator().run_vectorized(df["close"], positions)
+        calc = PnLCalculator()
+        return len(df), lambda: calc.summarize(trades, equity, extended=True)
+
+    def _stage_end_to_end(self, df: pd.DataFrame):
+        fetch = self._mocked_fetch(df)
+        strategy, simulator = self._strategy(), self._simulator()
+
+        def pipeline() -> Dict:
+            data = fetch()
+            positions = strategy.generate_target_positions(data)
+            trades, equity = simulator.run_vectorized(data["close"], positions)
+            return PnLCalculator().summarize(trades, equity, extended=True)
+
+        return self.kline_bars, pipeline
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = 0.25) -> List[Dict]:
+    """
+    Compare two reports stage by stage.
+
+    Stages are compared on median seconds per bar, so runs with different
+    bar counts stay comparable (all stages are linear in bars). A stage is
+    flagged as a regression when it is more than `threshold` (0.25 = 25%)
+    slower than the baseline. Stages missing from either report are skipped.
+    """
+    rows = []
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        current_per_bar = current["median_s"] / max(current["bars"], 1)
+        base_per_bar = base["median_s"] / max(base["bars"], 1)
+        ratio = current_per_bar / base_per_bar if base_per_bar > 0 else float("inf")
+        rows.append({
+            "stage": name,
+            "baseline_bars_per_s": base["bars_per_s"],
+            "bars_per_s": current["bars_per_s"],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def load_report(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report: Dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
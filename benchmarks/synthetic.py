@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from backtest.fetcher import interval_to_ms
+
+MS_PER_YEAR = 365 * 24 * 3600 * 1000
+
+# rows generated per step; the random streams are independent of it
+CHUNK_BARS = 1_000_000
+
+
+def generate_ohlcv(
+    num_bars: int,
+    interval: str = "1m",
+    start: str = "2020-01-01",
+    seed: int = 0,
+    start_price: float = 30000.0,
+    drift: float = 0.0,
+    volatility: float = 0.8,
+) -> pd.DataFrame:
+    """
+    Seeded geometric Brownian motion OHLCV bars in MarketDataFetcher's output format.
+
+    Parameters:
+        num_bars: number of bars (tens of millions are fine; memory is
+            5 x 8 bytes per bar plus the index)
+        interval: Binance interval of the bars, sets the time step
+        drift, volatility: annualized GBM parameters (365-day year)
+
+    Close prices follow the GBM; each bar opens at the previous close, and
+    high / low extend past the body by a half-sized random wick. Price,
+    wick and volume noise come from separate seeded streams drawn in order,
+    so the same seed always gives the same bars for any num_bars prefix.
+    """
+    step_ms = interval_to_ms(interval)
+    dt = step_ms / MS_PER_YEAR
+    price_rng, wick_rng, volume_rng = (
+        np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3)
+    )
+
+    close = np.empty(num_bars)
+    high = np.empty(num_bars)
+    low = np.empty(num_bars)
+    volume = np.empty(num_bars)
+
+    log_price = np.log(start_price)
+    mean = (drift - 0.5 * volatility ** 2) * dt
+    scale = volatility * np.sqrt(dt)
+    for lo in range(0, num_bars, CHUNK_BARS):
+        hi = min(lo + CHUNK_BARS, num_bars)
+        steps = price_rng.normal(mean, scale, hi - lo)
+        np.cumsum(steps, out=steps)
+        steps += log_price
+        np.exp(steps, out=close[lo:hi])
+        log_price = steps[-1]
+
+        wicks = np.abs(wick_rng.normal(0.0, scale / 2, (hi - lo, 2)))
+        high[lo:hi] = np.exp(wicks[:, 0])
+        low[lo:hi] = np.exp(-wicks[:, 1])
+        volume[lo:hi] = volume_rng.lognormal(2.0, 0.5, hi - lo)
+
+    open_ = np.empty(num_bars)
+    if num_bars:
+        open_[0] = start_price
+        open_[1:] = close[:-1]
+    high *= np.maximum(open_, close)
+    low *= np.minimum(open_, close)
+
+    start_ms = int(pd.Timestamp(start, tz="UTC").value // 1_000_000)
+    open_time = start_ms + step_ms * np.arange(num_bars, dtype=np.int64)
+    index = pd.DatetimeIndex(pd.to_datetime(open_time, unit="ms", utc=True), name="timestamp")
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+        index=index,
+        copy=False,
+    )
+
+
+def ohlcv_to_klines(df: pd.DataFrame, interval: str) -> List[list]:
+    """
+    Binance /api/v3/klines rows for the bars of `df`.
+
+    Prices and volumes are decimal strings as in the real API, so this is
+    the input MarketDataFetcher normalizes.
+    """
+    step_ms = interval_to_ms(interval)
+    open_time = (df.index.asi8 // 1_000_000).tolist()
+    fields = [np.char.mod("%.2f", df[c].to_numpy()).tolist() for c in ("open", "high", "low", "close")]
+    volume = np.char.mod("%.5f", df["volume"].to_numpy()).tolist()
+    quote = np.char.mod("%.5f", (df["volume"] * df["close"]).to_numpy()).tolist()
+    return [
+        [t, o, h, l, c, v, t + step_ms - 1, q, 100, "0", "0", "0"]
+        for t, o, h, l, c, v, q in zip(open_time, *fields, volume, quote)
+    ]
+
+
+class MockResponse:
+    """Minimal stand-in for requests.Response as used by MarketDataFetcher."""
+
+    def __init__(self, payload: list, status_code: int = 200):
+        self.status_code = status_code
+        self.headers: Dict[str, str] = {}
+        self._payload = payload
+
+    def json(self) -> list:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class MockKlineSource:
+    """
+    In-process kline endpoint over a synthetic OHLCV frame.
+
+    `get` has the signature of requests.get, so it can replace it (or a
+    Session's get) to drive MarketDataFetcher without a network. Pages are
+    formatted on request, which keeps memory flat for long histories; pass
+    pre-built `klines` (ohlcv_to_klines(df, interval)) to serve slices of
+    them instead, so that formatting is not part of a timed fetch.
+    """
+
+    def __init__(self, df: pd.DataFrame, interval: str, klines: Optional[List[list]] = None):
+        self.df = df
+        self.interval = interval
+        self.klines = klines
+        self.open_time = df.index.asi8 // 1_000_000
+        self.request_count = 0
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> MockResponse:
+        self.request_count += 1
+        query = {k: v[0] for k, v in parse_qs(urlparse(url).query).items()}
+        start_ms = int(query.get("startTime", self.open_time[0] if len(self.open_time) else 0))
+        end_ms = int(query.get("endTime", np.iinfo(np.int64).max))
+        limit = int(query.get("limit", 500))
+
+        lo = int(np.searchsorted(self.open_time, start_ms, side="left"))
+        hi = int(np.searchsorted(self.open_time, end_ms, side="right"))
+        hi = min(hi, lo + limit)
+        if self.klines is not None:
+            return MockResponse(self.klines[lo:hi])
+        return MockResponse(ohlcv_to_klines(self.df.iloc[lo:hi], self.interval))
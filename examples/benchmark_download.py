@@ -0,0 +1,56 @@
+import argparse
+import logging
+import time
+
+from backtest.fetcher import MarketDataFetcher
+from backtest.kline_server import LocalKlineServer
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark sequential vs concurrent kline download against a local stand-in server"
+    )
+    parser.add_argument("--interval", type=str, default="1m", help="Candle interval")
+    parser.add_argument("--start", type=str, default="2024-01-01", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, default="2024-01-15", help="End date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Simulated round-trip latency per request in seconds",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 4, 8, 16],
+        help="Concurrency levels to compare",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with LocalKlineServer(latency=args.latency) as server:
+        baseline = None
+        for workers in args.concurrency:
+            fetcher = MarketDataFetcher(base_url=server.url, concurrency=workers)
+            requests_before = server.request_count
+
+            t0 = time.perf_counter()
+            df = fetcher.get_historical_ohlcv("BTCUSDT", args.interval, args.start, args.end)
+            elapsed = time.perf_counter() - t0
+
+            baseline = baseline or elapsed
+            print(
+                f"concurrency={workers:>3} | bars={len(df):>8} | "
+                f"requests={server.request_count - requests_before:>5} | "
+                f"{elapsed:7.2f}s | {len(df) / elapsed:>10.0f} bars/s | "
+                f"speedup x{baseline / elapsed:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import sys
+
+from backtest.client import BacktestClient
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run a backtest or sweep on a running backtest server (see examples/serve.py)"
+    )
+    parser.add_argument("--server", type=str, default="http://127.0.0.1:8765", help="Server URL")
+    parser.add_argument("--symbol", type=str, default="BTCUSDT", help="Trading symbol, e.g. BTCUSDT")
+    parser.add_argument("--interval", type=str, default="1h", help="Candle interval, e.g. 1m, 5m, 1h, 1d")
+    parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--fast-window", type=int, nargs="+", default=[10], help="Fast moving average window(s)")
+    parser.add_argument("--slow-window", type=int, nargs="+", default=[30], help="Slow moving average window(s)")
+    parser.add_argument("--initial-cash", type=float, default=10000.0, help="Initial cash in quote currency")
+    parser.add_argument(
+        "--risk-per-trade",
+        type=float,
+        default=0.1,
+        help="Fraction of equity to allocate per trade (0–1)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Sweep rows to print")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    client = BacktestClient(args.server)
+    data = dict(symbol=args.symbol, interval=args.interval, start=args.start, end=args.end)
+
+    # several windows turn the call into a sweep
+    if len(args.fast_window) == 1 and len(args.slow_window) == 1:
+        summary = client.backtest(
+            **data,
+            fast_window=args.fast_window[0],
+            slow_window=args.slow_window[0],
+            initial_cash=args.initial_cash,
+            risk_per_trade=args.risk_per_trade,
+        )
+        print(f"========== {args.symbol} {args.interval} SMA({args.fast_window[0]}, {args.slow_window[0]}) ==========")
+        for key, value in summary.items():
+            print(f"{key:<22}: {value:.4f}" if isinstance(value, float) else f"{key:<22}: {value}")
+        return 0
+
+    result = client.sweep(
+        **data,
+        fast_windows=args.fast_window,
+        slow_windows=args.slow_window,
+        initial_cash=args.initial_cash,
+        risk_per_trade=args.risk_per_trade,
+        top=args.top,
+    )
+    print(f"Top {len(result['rows'])} configs by {result['sort_by']} over {result['bars']} bars:")
+    for row in result["rows"]:
+        print(
+            f"SMA({row['fast_window']:>3}, {row['slow_window']:>3}) | "
+            f"return {row['total_return_pct']:8.2f}% | max DD {row['max_drawdown_pct']:7.2f}% | "
+            f"trades {row['num_trades']:>5}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,13 @@ from datetime import datetime
 
 import pandas as pd
 
+from backtest.cache import OHLCVCache
 from backtest.fetcher import MarketDataFetcher
 from backtest.strategy import SimpleMovingAverageStrategy
 from backtest.simulator import TradeSimulator
-from backtest.pnl import PnLCalculator
+from backtest.pnl import PnLCalculator, print_extended_metrics, print_trade_table
+from backtest.profiling import Profiler
+from backtest.robustness import RobustnessAnalyzer
 
 
 def configure_logging(level: str = "INFO") -> None:
@@ -72,6 +75,47 @@ def parse_args() -> argparse.Namespace:
         default=0.1,
         help="Fraction of equity to allocate per trade (0–1)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the local OHLCV cache (disabled if omitted)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of kline pages downloaded in parallel",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=["vectorized", "loop"],
+        default="vectorized",
+        help="Simulator engine: NumPy on target positions, or the reference per-bar loop",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use float32 prices and an int64 epoch-ms index (about 40%% less memory per bar)",
+    )
+    parser.add_argument(
+        "--robustness",
+        type=int,
+        default=0,
+        help="Resamples per Monte Carlo / bootstrap robustness check (0 disables)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-stage breakdown of wall time, throughput, memory and requests",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        default=None,
+        help="Also write a cProfile dump (pstats format) to this file",
+    )
 
     return parser.parse_args()
 
@@ -79,14 +123,23 @@ def parse_args() -> argparse.Namespace:
 def run_backtest(args: argparse.Namespace) -> None:
     logger = logging.getLogger("Main")
 
-    fetcher = MarketDataFetcher()
+    cache = OHLCVCache(args.cache_dir) if args.cache_dir else None
+    fetcher = MarketDataFetcher(cache=cache, concurrency=args.concurrency)
     df = fetcher.get_historical_ohlcv(
         symbol=args.symbol,
         interval=args.interval,
         start=args.start,
         end=args.end,
+        compact=args.compact,
     )
 
+    if cache is not None:
+        stats = cache.stats
+        logger.info(
+            f"Cache: {stats.bars_from_cache} bars from disk, {stats.bars_fetched} fetched, "
+            f"~{stats.requests_saved()} requests saved, {cache.nbytes()} bytes on disk"
+        )
+
     if df.empty:
         logger.error("No data returned. Aborting.")
         return
@@ -98,26 +151,40 @@ def run_backtest(args: argparse.Namespace) -> None:
         slow_window=args.slow_window,
     )
 
-    signals = strategy.generate_signals(df)
-    logger.info(f"Generated {len(signals)} signals")
-
     simulator = TradeSimulator(
         initial_cash=args.initial_cash,
         risk_per_trade=args.risk_per_trade,
     )
 
-    trades, equity_curve = simulator.run(
-        price_series=df["close"],
-        signals=signals,
-    )
+    if args.engine == "loop":
+        signals = strategy.generate_signal_array(df)
+        logger.info(f"Generated {int((signals != 0).sum())} signals")
+
+        trades, equity_curve = simulator.run(
+            price_series=df["close"],
+            signals=signals,
+        )
+    else:
+        positions = strategy.generate_target_positions(df)
+        logger.info(f"Generated {len(positions)} target positions")
+
+        trades, equity_curve = simulator.run_vectorized(
+            price_series=df["close"],
+            target_positions=positions,
+        )
 
     logger.info(f"Executed {len(trades)} trades")
 
     pnl_calc = PnLCalculator()
-    summary = pnl_calc.summarize(trades, equity_curve)
+    summary = pnl_calc.summarize(trades, equity_curve, extended=True)
 
     print_summary(args, summary)
 
+    if args.robustness > 0 and len(trades):
+        analyzer = RobustnessAnalyzer(resamples=args.robustness)
+        results = analyzer.run(trades, equity_curve, prices=df["close"])
+        print_robustness(results)
+
 
 def print_summary(args: argparse.Namespace, summary: dict) -> None:
     """
@@ -132,15 +199,9 @@ def print_summary(args: argparse.Namespace, summary: dict) -> None:
     """
     print("======================================\n")
     trades = summary.get("trades", [])
-    if trades:
+    if len(trades):
         print("Trades:")
-        for t in trades:
-            pnl = (t.exit_price - t.entry_price) * t.qty
-            print(
-                f"{t.entry_time} → {t.exit_time} | "
-                f"entry={t.entry_price:.2f}, exit={t.exit_price:.2f}, "
-                f"qty={t.qty:.5f}, pnl={pnl:.2f}"
-            )
+        print_trade_table(trades)
     else:
         print("No trades executed.")
         
@@ -156,12 +217,33 @@ def print_summary(args: argparse.Namespace, summary: dict) -> None:
     print(f"Max drawdown     : {summary.get('max_drawdown_pct'):.2f}%")
     print(f"# of trades      : {summary.get('num_trades')}")
     print(f"Win rate         : {summary.get('win_rate_pct'):.2f}%")
+    print_extended_metrics(summary)
     print("======================================")
 
+def print_robustness(results: dict) -> None:
+    """90% intervals of every robustness check, next to the observed values."""
+    print("\n========== ROBUSTNESS (90% intervals) ==========")
+    for method, result in results.items():
+        print(f"{method}:")
+        print(result.interval(0.9).to_string(float_format=lambda x: f"{x:.2f}"))
+    print("================================================")
+
 def main() -> None:
     args = parse_args()
     configure_logging()
-    run_backtest(args)
+    if not (args.profile or args.profile_output):
+        run_backtest(args)
+        return
+
+    profiler = Profiler(cprofile=args.profile_output is not None)
+    with profiler:
+        run_backtest(args)
+
+    print("\n========== PROFILE ==========")
+    print(profiler.format_report())
+    if args.profile_output:
+        profiler.dump_stats(args.profile_output)
+        print(f"cProfile stats written to {args.profile_output} (inspect with python -m pstats)")
 
 if __name__ == "__main__":
     main()
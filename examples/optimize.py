@@ -0,0 +1,120 @@
+import argparse
+import logging
+
+from backtest.cache import OHLCVCache
+from backtest.fetcher import MarketDataFetcher
+from backtest.optimize import FloatParam, IntParam, SuccessiveHalvingOptimizer
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+def configure_logging(level: str = "INFO") -> None:
+    numeric_level = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(
+        level=numeric_level,
+        format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Successive-halving / Hyperband search of SMA parameters"
+    )
+
+    parser.add_argument("--symbol", type=str, default="BTCUSDT", help="Trading symbol, e.g. BTCUSDT")
+    parser.add_argument("--interval", type=str, default="1h", help="Candle interval, e.g. 1m, 5m, 1h, 1d")
+    parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--max-fast", type=int, default=60, help="Largest fast window to try")
+    parser.add_argument("--max-slow", type=int, default=300, help="Largest slow window to try")
+    parser.add_argument(
+        "--metric",
+        type=str,
+        default="sharpe",
+        help="PnLCalculator metric to maximize, e.g. total_return_pct, sharpe, calmar",
+    )
+    parser.add_argument("--candidates", type=int, default=81, help="Candidates of the widest bracket")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the candidates per rung")
+    parser.add_argument(
+        "--min-fraction",
+        type=float,
+        default=1 / 27,
+        help="Share of the history used by the first rung",
+    )
+    parser.add_argument("--hyperband", action="store_true", help="Run every bracket, not only the widest")
+    parser.add_argument("--sampler", choices=["random", "tpe"], default="random", help="Candidate proposal")
+    parser.add_argument("--rounds", type=int, default=1, help="Repeat the bracket schedule")
+    parser.add_argument("--min-trades", type=int, default=0, help="Rank configs with fewer trades last")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes per rung")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for candidate proposal")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the local OHLCV cache (disabled if omitted)",
+    )
+
+    return parser.parse_args()
+
+
+def run_optimizer(args: argparse.Namespace) -> None:
+    logger = logging.getLogger("Optimize")
+
+    cache = OHLCVCache(args.cache_dir) if args.cache_dir else None
+    df = MarketDataFetcher(cache=cache).get_historical_ohlcv(
+        symbol=args.symbol,
+        interval=args.interval,
+        start=args.start,
+        end=args.end,
+    )
+
+    if df.empty:
+        logger.error("No data returned. Aborting.")
+        return
+
+    logger.info(f"Fetched {len(df)} candles for {args.symbol} @ {args.interval}")
+
+    optimizer = SuccessiveHalvingOptimizer(
+        SimpleMovingAverageStrategy,
+        {
+            "fast_window": IntParam(2, args.max_fast),
+            "slow_window": IntParam(10, args.max_slow, log=True),
+            "risk_per_trade": FloatParam(0.05, 1.0, log=True),
+        },
+        metric=args.metric,
+        num_candidates=args.candidates,
+        eta=args.eta,
+        min_fraction=args.min_fraction,
+        hyperband=args.hyperband,
+        rounds=args.rounds,
+        sampler=args.sampler,
+        constraint=lambda p: p["fast_window"] < p["slow_window"],
+        min_trades=args.min_trades,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    result = optimizer.run(df)
+    summary = result.best_summary
+
+    print("\n========== OPTIMIZATION RESULT ==========")
+    print(f"Symbol           : {args.symbol}")
+    print(f"Interval         : {args.interval}")
+    print(f"Period           : {args.start} → {args.end}")
+    print(f"Evaluations      : {len(result.trials)} ({result.full_equivalents:.1f} full backtests)")
+    print("-----------------------------------------")
+    for name, value in result.best_params.items():
+        print(f"{name:<17}: {value:.4g}")
+    print(f"{args.metric:<17}: {summary.get(args.metric)}")
+    print(f"Total return     : {summary.get('total_return_pct'):.2f}%")
+    print(f"Max drawdown     : {summary.get('max_drawdown_pct'):.2f}%")
+    print(f"# of trades      : {summary.get('num_trades')}")
+    print("=========================================")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging()
+    run_optimizer(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import logging
+
+from backtest.cache import OHLCVCache
+from backtest.fetcher import MarketDataFetcher
+from backtest.portfolio import PortfolioSimulator
+from backtest.strategy import SimpleMovingAverageStrategy
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Multi-symbol SMA portfolio backtest"
+    )
+    parser.add_argument(
+        "--symbols",
+        type=str,
+        nargs="+",
+        default=["BTCUSDT", "ETHUSDT", "BNBUSDT"],
+        help="Trading symbols, e.g. BTCUSDT ETHUSDT",
+    )
+    parser.add_argument("--interval", type=str, default="1h", help="Candle interval, e.g. 1m, 5m, 1h, 1d")
+    parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--fast-window", type=int, default=10, help="Fast moving average window")
+    parser.add_argument("--slow-window", type=int, default=30, help="Slow moving average window")
+    parser.add_argument("--initial-cash", type=float, default=10000.0, help="Initial cash in quote currency")
+    parser.add_argument(
+        "--weight",
+        type=float,
+        default=None,
+        help="Fraction of portfolio equity per new position (default: 1 / #symbols)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the local OHLCV cache (disabled if omitted)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(name)s | %(levelname)s | %(message)s")
+    logger = logging.getLogger("Portfolio")
+
+    cache = OHLCVCache(args.cache_dir) if args.cache_dir else None
+    panel = MarketDataFetcher(cache=cache).get_price_panel(
+        args.symbols, args.interval, args.start, args.end
+    )
+    if panel.empty:
+        logger.error("No data returned. Aborting.")
+        return
+
+    strategy = SimpleMovingAverageStrategy(args.fast_window, args.slow_window)
+    targets = strategy.generate_target_panel(panel)
+    result = PortfolioSimulator(args.initial_cash, weight=args.weight).run(panel, targets)
+
+    start_equity, end_equity = result.equity.iloc[0], result.equity.iloc[-1]
+    drawdown = (result.equity / result.equity.cummax() - 1.0).min() * 100.0
+
+    print("\n========== PORTFOLIO SUMMARY ==========")
+    print(f"Symbols          : {len(panel.columns)}")
+    print(f"Period           : {args.start} → {args.end}")
+    print(f"Strategy         : SMA({args.fast_window}, {args.slow_window})")
+    print("---------------------------------------")
+    print(f"Start equity     : {start_equity:.2f}")
+    print(f"End equity       : {end_equity:.2f}")
+    print(f"Total return     : {(end_equity / start_equity - 1.0) * 100.0:.2f}%")
+    print(f"Max drawdown     : {drawdown:.2f}%")
+    print(f"# of trades      : {len(result.trades)}")
+    print("---------------------------------------")
+    print("PnL by symbol:")
+    for symbol, pnl in result.symbol_pnl.iloc[-1].sort_values(ascending=False).items():
+        print(f"  {symbol:<14} : {pnl:.2f}")
+    print("=======================================")
+
+
+if __name__ == "__main__":
+    main()
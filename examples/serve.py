@@ -0,0 +1,70 @@
+import argparse
+import logging
+
+from backtest.cache import OHLCVCache
+from backtest.fetcher import MarketDataFetcher
+from backtest.indicators import IndicatorEngine
+from backtest.server import BacktestServer, BacktestService
+
+
+def configure_logging(level: str = "INFO") -> None:
+    numeric_level = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(
+        level=numeric_level,
+        format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Long-running backtest server keeping OHLCV data and indicators in memory"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=4, help="Jobs executed concurrently")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the local OHLCV cache (disabled if omitted)",
+    )
+    parser.add_argument(
+        "--indicator-dir",
+        type=str,
+        default=None,
+        help="Directory for the on-disk indicator tier (disabled if omitted)",
+    )
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of kline pages downloaded in parallel")
+    parser.add_argument("--max-datasets", type=int, default=16, help="OHLCV frames kept in memory")
+    parser.add_argument(
+        "--sweep-workers",
+        type=int,
+        default=1,
+        help="Processes per sweep job (1 evaluates in the job thread with the shared indicator cache)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging()
+
+    cache = OHLCVCache(args.cache_dir) if args.cache_dir else None
+    service = BacktestService(
+        MarketDataFetcher(cache=cache, concurrency=args.concurrency),
+        workers=args.workers,
+        indicators=IndicatorEngine(disk_dir=args.indicator_dir),
+        max_datasets=args.max_datasets,
+        sweep_workers=args.sweep_workers,
+    )
+    server = BacktestServer(service, host=args.host, port=args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import itertools
+import logging
+import sys
+
+import pandas as pd
+
+from backtest.cache import OHLCVCache
+from backtest.fetcher import MarketDataFetcher
+from backtest.store import ResultStore
+from backtest.strategy import SimpleMovingAverageStrategy
+from backtest.sweep import SweepConfig, SweepRunner
+
+
+def configure_logging(level: str = "INFO") -> None:
+    numeric_level = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(
+        level=numeric_level,
+        format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Parallel SMA parameter sweep"
+    )
+
+    parser.add_argument("--symbol", type=str, default="BTCUSDT", help="Trading symbol, e.g. BTCUSDT")
+    parser.add_argument("--interval", type=str, default="1h", help="Candle interval, e.g. 1m, 5m, 1h, 1d")
+    parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--fast-windows",
+        type=int,
+        nargs="+",
+        default=[5, 10, 20],
+        help="Fast moving average windows to try",
+    )
+    parser.add_argument(
+        "--slow-windows",
+        type=int,
+        nargs="+",
+        default=[30, 50, 100],
+        help="Slow moving average windows to try",
+    )
+    parser.add_argument(
+        "--risk-per-trade",
+        type=float,
+        nargs="+",
+        default=[0.1],
+        help="Fractions of equity to allocate per trade (0–1)",
+    )
+    parser.add_argument(
+        "--initial-cash",
+        type=float,
+        default=10000.0,
+        help="Initial cash in quote currency",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=8,
+        help="Configurations per submitted task",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of best configurations to print",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the local OHLCV cache (disabled if omitted)",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="SQLite result store; configs already evaluated on the same data are skipped",
+    )
+    parser.add_argument(
+        "--max-drawdown",
+        type=float,
+        default=None,
+        help="Only rank configurations whose max drawdown is at most this many percent",
+    )
+
+    return parser.parse_args()
+
+
+def build_configs(args: argparse.Namespace):
+    for fast, slow, risk in itertools.product(
+        args.fast_windows, args.slow_windows, args.risk_per_trade
+    ):
+        if fast >= slow:
+            continue
+        yield SweepConfig(
+            strategy_cls=SimpleMovingAverageStrategy,
+            strategy_params={"fast_window": fast, "slow_window": slow},
+            initial_cash=args.initial_cash,
+            risk_per_trade=risk,
+        )
+
+
+def print_progress(done: int, total: int) -> None:
+    sys.stderr.write(f"\r{done}/{total} configs ({done / total:.0%})")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def run_sweep(args: argparse.Namespace) -> None:
+    logger = logging.getLogger("Sweep")
+
+    cache = OHLCVCache(args.cache_dir) if args.cache_dir else None
+    df = MarketDataFetcher(cache=cache).get_historical_ohlcv(
+        symbol=args.symbol,
+        interval=args.interval,
+        start=args.start,
+        end=args.end,
+    )
+
+    if df.empty:
+        logger.error("No data returned. Aborting.")
+        return
+
+    logger.info(f"Fetched {len(df)} candles for {args.symbol} @ {args.interval}")
+
+    store = ResultStore(args.store) if args.store else None
+    runner = SweepRunner(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        progress=print_progress,
+        store=store,
+    )
+    try:
+        results = pd.DataFrame(list(runner.run(df, build_configs(args))))
+    finally:
+        if store is not None:
+            store.close()
+    if results.empty:
+        logger.error("No valid configurations (fast window must be < slow window).")
+        return
+
+    columns = [
+        "fast_window", "slow_window", "risk_per_trade",
+        "total_return_pct", "max_drawdown_pct", "num_trades", "win_rate_pct",
+    ]
+    if args.max_drawdown is not None:
+        results = results[results["max_drawdown_pct"] >= -abs(args.max_drawdown)]
+    best = results.sort_values("total_return_pct", ascending=False).head(args.top)
+
+    print("\n========== SWEEP RESULTS ==========")
+    print(f"Symbol           : {args.symbol}")
+    print(f"Interval         : {args.interval}")
+    print(f"Period           : {args.start} → {args.end}")
+    print(f"Configurations   : {len(results)}")
+    if "cached" in results:
+        print(f"From store       : {int(results['cached'].fillna(False).sum())}")
+    print("-----------------------------------")
+    print(best[columns].to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print("===================================")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging()
+    run_sweep(args)
+
+
+if __name__ == "__main__":
+    main()